@@ -0,0 +1,432 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Session-replay performance harness for the map tools.
+#
+# It needs a QGIS Python environment (qgis and PyQt4 importable, ui files compiled with make) but no QGIS GUI:
+#
+#   python -m intersectit.benchmarks.replay --features 100000 --events 500 -o replay.json
+#   python -m intersectit.benchmarks.replay --trace recorded.json
+#
+# The five map tools are driven with a fake iface and a real (hidden) map canvas over large synthetic layers.
+# Mouse-event traces are either generated (random walk with clicks) or recorded in a running QGIS session with
+# TraceRecorder. For each event, the latency is reported per stage:
+# snapping, fetching, visibility checks, intersections and rubber band updates.
+# Modal dialogs opened by the tools are replaced by stubs which are immediately rejected.
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from math import pi, sin, cos
+
+import numpy as np
+
+from PyQt4.QtCore import Qt, QObject, QEvent, QPoint, QSize
+from PyQt4.QtGui import QApplication, QMouseEvent, QLabel, QWidget
+from qgis.core import QgsApplication, QgsVectorLayer, QgsMapLayerRegistry, QgsFeature, QgsGeometry, QgsPoint, \
+    QgsRectangle, QgsCoordinateReferenceSystem
+from qgis.gui import QgsMapCanvas, QgsMapCanvasLayer, QgsRubberBand, QgsMapCanvasSnapper
+from qgis.core import QgsSnapper
+
+from ..core.mysettings import MySettings
+from ..core.memorylayers import MemoryLayers
+from ..core import featurefetcher
+from ..gui import distancemaptool, orientationmaptool, simpleintersectionmaptool, advancedintersectionmaptool, \
+    dimensioneditmaptool
+
+toolModules = (distancemaptool, orientationmaptool, simpleintersectionmaptool, advancedintersectionmaptool,
+               dimensioneditmaptool)
+stages = ("snapping", "fetching", "visibility", "intersection", "rubberband")
+
+
+class StageTimer():
+    # accumulates the time spent in each stage during the current event
+    def __init__(self):
+        self.current = None
+
+    def start(self):
+        self.current = dict((stage, 0.) for stage in stages)
+
+    def add(self, stage, elapsed):
+        if self.current is not None:
+            self.current[stage] += elapsed
+
+    def stop(self):
+        current = self.current
+        self.current = None
+        return current
+
+timer = StageTimer()
+
+
+def timed(stage, function):
+    def wrapper(*args, **kwargs):
+        start = time.time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            timer.add(stage, 1000*(time.time() - start))
+    return wrapper
+
+
+class TimedSnapper(QgsSnapper):
+    def snapPoint(self, *args):
+        return timed("snapping", QgsSnapper.snapPoint)(self, *args)
+
+
+class TimedCanvasSnapper(QgsMapCanvasSnapper):
+    def snapToBackgroundLayers(self, *args):
+        return timed("snapping", QgsMapCanvasSnapper.snapToBackgroundLayers)(self, *args)
+
+
+class TimedRubberBand(QgsRubberBand):
+    def reset(self, *args):
+        return timed("rubberband", QgsRubberBand.reset)(self, *args)
+
+    def addGeometry(self, *args):
+        return timed("rubberband", QgsRubberBand.addGeometry)(self, *args)
+
+    def setToGeometry(self, *args):
+        return timed("rubberband", QgsRubberBand.setToGeometry)(self, *args)
+
+
+class RejectedDialog():
+    # replaces the modal dialogs opened by the tools
+    solution = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def exec_(self):
+        return 0
+
+
+class Patches():
+    # replace the hot-path functions and classes in the tool modules by timed versions
+    def __init__(self):
+        self.saved = []
+
+    def patch(self, module, name, value):
+        if hasattr(module, name):
+            self.saved.append((module, name, getattr(module, name)))
+            setattr(module, name, value)
+
+    def apply(self):
+        for module in toolModules:
+            self.patch(module, "QgsSnapper", TimedSnapper)
+            self.patch(module, "QgsMapCanvasSnapper", TimedCanvasSnapper)
+            self.patch(module, "QgsRubberBand", TimedRubberBand)
+            self.patch(module, "fetchSnappedFeatures", timed("fetching", featurefetcher.fetchSnappedFeatures))
+            if hasattr(module, "isFeatureRendered"):
+                self.patch(module, "isFeatureRendered", timed("visibility", module.isFeatureRendered))
+            if hasattr(module, "intersectionPoints"):
+                self.patch(module, "intersectionPoints", timed("intersection", module.intersectionPoints))
+            for dialog in ("DistanceDialog", "OrientationDialog", "IntersectionDialog"):
+                self.patch(module, dialog, RejectedDialog)
+
+    def restore(self):
+        for module, name, value in reversed(self.saved):
+            setattr(module, name, value)
+        self.saved = []
+
+
+class FakeMessageBar():
+    def pushMessage(self, *args):
+        pass
+
+    def createMessage(self, *args):
+        return QLabel()
+
+    def pushWidget(self, *args):
+        pass
+
+    def popWidget(self, *args):
+        pass
+
+
+class FakeLegendInterface():
+    def setLayerVisible(self, layer, visible):
+        pass
+
+
+class FakeIface():
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.bar = FakeMessageBar()
+        self.legend = FakeLegendInterface()
+        self.window = QWidget()
+
+    def mapCanvas(self):
+        return self.canvas
+
+    def messageBar(self):
+        return self.bar
+
+    def legendInterface(self):
+        return self.legend
+
+    def mainWindow(self):
+        return self.window
+
+
+class TraceRecorder(QObject):
+    # event filter recording the mouse events of a map canvas in a running QGIS session:
+    #   recorder = TraceRecorder(iface.mapCanvas())
+    #   ... use the tools ...
+    #   recorder.save("/tmp/trace.json")
+    types = {QEvent.MouseMove: "move", QEvent.MouseButtonPress: "press", QEvent.MouseButtonRelease: "release"}
+
+    def __init__(self, canvas):
+        QObject.__init__(self)
+        self.canvas = canvas
+        self.events = []
+        self.start = time.time()
+        canvas.viewport().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() in self.types:
+            self.events.append({"t": 1000*(time.time()-self.start), "type": self.types[event.type()],
+                                "x": event.pos().x(), "y": event.pos().y(), "button": int(event.button())})
+        return False
+
+    def save(self, path):
+        self.canvas.viewport().removeEventFilter(self)
+        with open(path, "w") as f:
+            json.dump({"width": self.canvas.width(), "height": self.canvas.height(), "events": self.events}, f)
+
+
+def syntheticTrace(rng, nEvents, width, height, clickEvery=50):
+    # random walk of the cursor at 60 Hz with a click (press + release) every clickEvery events
+    x, y = width/2., height/2.
+    events = []
+    for i in range(nEvents):
+        x = min(max(x + rng.gauss(0, 8), 0), width-1)
+        y = min(max(y + rng.gauss(0, 8), 0), height-1)
+        events.append({"t": i*16.7, "type": "move", "x": int(x), "y": int(y), "button": 0})
+        if clickEvery and i % clickEvery == clickEvery-1:
+            events.append({"t": i*16.7, "type": "press", "x": int(x), "y": int(y), "button": int(Qt.LeftButton)})
+            events.append({"t": i*16.7, "type": "release", "x": int(x), "y": int(y), "button": int(Qt.LeftButton)})
+    return {"width": width, "height": height, "events": events}
+
+
+def randomPolyline(rng, extent, nVertices, step):
+    x = rng.uniform(extent.xMinimum(), extent.xMaximum())
+    y = rng.uniform(extent.yMinimum(), extent.yMaximum())
+    points = []
+    azimuth = rng.uniform(0, 2*pi)
+    for i in range(nVertices):
+        points.append(QgsPoint(x, y))
+        azimuth += rng.gauss(0, .3)
+        x += step*sin(azimuth)
+        y += step*cos(azimuth)
+    return points
+
+
+def addFeatures(layer, geometries, attributes=None):
+    features = []
+    fields = layer.dataProvider().fields()
+    for i, geometry in enumerate(geometries):
+        f = QgsFeature()
+        f.setFields(fields)
+        f.initAttributes(fields.size())
+        if attributes is not None:
+            for name, value in attributes[i].items():
+                f[name] = value
+        f.setGeometry(geometry)
+        features.append(f)
+    layer.dataProvider().addFeatures(features)
+    layer.updateExtents()
+
+
+def syntheticLayers(rng, iface, extent, nFeatures, nVertices, nObservations):
+    # background lines and polygons, observations in the memory layers and an editable dimension layer
+    crs = "EPSG:21781"
+    step = extent.width() / 200.
+    lines = QgsVectorLayer("LineString?crs=%s&index=yes" % crs, "replay lines", "memory")
+    addFeatures(lines, [QgsGeometry().fromPolyline(randomPolyline(rng, extent, nVertices, step))
+                        for i in range(nFeatures)])
+    polygons = QgsVectorLayer("Polygon?crs=%s&index=yes" % crs, "replay polygons", "memory")
+    rings = []
+    for i in range(nFeatures // 10):
+        ring = randomPolyline(rng, extent, nVertices, step)
+        rings.append(QgsGeometry().fromPolygon([ring + [ring[0]]]))
+    addFeatures(polygons, rings)
+
+    settings = MySettings()
+    memoryLayers = MemoryLayers(iface)
+    lineLayer = memoryLayers.lineLayer()
+    pointLayer = memoryLayers.pointLayer()
+    geometries = []
+    attributes = []
+    for i in range(nObservations):
+        x = rng.uniform(extent.xMinimum(), extent.xMaximum())
+        y = rng.uniform(extent.yMinimum(), extent.yMaximum())
+        if i % 2:
+            r = rng.uniform(step, 20*step)
+            geometries.append(QgsGeometry().fromPolyline([QgsPoint(x + r*cos(pi/180*a), y + r*sin(pi/180*a))
+                                                          for a in range(0, 361, 3)]))
+            attributes.append({"id": str(i), "type": "distance", "x": x, "y": y, "observation": r,
+                               "precision": .025})
+        else:
+            az = rng.uniform(0, 360)
+            geometries.append(QgsGeometry().fromPolyline([QgsPoint(x, y), QgsPoint(x + 4*step*sin(az*pi/180),
+                                                                                 y + 4*step*cos(az*pi/180))]))
+            attributes.append({"id": str(i), "type": "orientation", "x": x, "y": y, "observation": az,
+                               "precision": .5})
+    addFeatures(lineLayer, geometries, attributes)
+    addFeatures(pointLayer, [QgsGeometry().fromPoint(QgsPoint(a["x"], a["y"])) for a in attributes],
+                [{"id": a["id"]} for a in attributes])
+
+    dimensions = QgsVectorLayer("LineString?crs=%s&index=yes" % crs, "replay dimensions", "memory")
+    addFeatures(dimensions, [QgsGeometry().fromPolyline(randomPolyline(rng, extent, 20, step/4.))
+                             for i in range(nObservations)])
+    output = QgsVectorLayer("Point?crs=%s" % crs, "replay output", "memory")
+    QgsMapLayerRegistry.instance().addMapLayers([lines, polygons, dimensions, output])
+    dimensions.startEditing()
+    output.startEditing()
+    settings.setValue("dimensionDistanceLayer", dimensions.id())
+    settings.setValue("dimensionOrientationLayer", dimensions.id())
+    settings.setValue("simpleIntersectionLayer", output.id())
+    settings.setValue("simpleIntersectionWritePoint", True)
+    settings.setValue("obsDistanceSnapping", "all")
+    return [lineLayer, pointLayer, lines, polygons, dimensions, output]
+
+
+def replay(tool, canvas, trace):
+    # feed the trace events to the tool, the hover pipeline is flushed after each move
+    # so that every event is measured
+    latencies = {"move": [], "press": [], "release": []}
+    canvas.setMapTool(tool)
+    for event in trace["events"]:
+        pos = QPoint(event["x"], event["y"])
+        button = Qt.MouseButton(event["button"])
+        timer.start()
+        start = time.time()
+        if event["type"] == "move":
+            buttons = Qt.LeftButton if getattr(tool, "editing", False) else Qt.NoButton
+            tool.canvasMoveEvent(QMouseEvent(QEvent.MouseMove, pos, Qt.NoButton, buttons, Qt.NoModifier))
+            if hasattr(tool, "hover"):
+                tool.hover.flush()
+        elif event["type"] == "press":
+            tool.canvasPressEvent(QMouseEvent(QEvent.MouseButtonPress, pos, button, button, Qt.NoModifier))
+        else:
+            tool.canvasReleaseEvent(QMouseEvent(QEvent.MouseButtonRelease, pos, button, Qt.NoButton,
+                                                Qt.NoModifier))
+        total = 1000*(time.time() - start)
+        stageTimes = timer.stop()
+        stageTimes["total"] = total
+        latencies[event["type"]].append(stageTimes)
+        QApplication.processEvents()
+    canvas.unsetMapTool(tool)
+    return latencies
+
+
+def summarize(latencies):
+    summary = {}
+    for eventType, events in latencies.items():
+        if len(events) == 0:
+            continue
+        summary[eventType] = {"count": len(events)}
+        for stage in stages + ("total",):
+            values = np.array([e[stage] for e in events])
+            summary[eventType][stage] = dict(("p%u" % p, float(np.percentile(values, p))) for p in (50, 90, 99))
+            summary[eventType][stage]["max"] = float(values.max())
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m intersectit.benchmarks.replay",
+                                     description="Replay mouse-event traces on the map tools.")
+    parser.add_argument("-o", "--output", help="JSON result file")
+    parser.add_argument("--trace", help="recorded trace (JSON), a synthetic one is generated otherwise")
+    parser.add_argument("--events", type=int, default=500, help="number of move events of the synthetic trace")
+    parser.add_argument("--features", type=int, default=10000, help="number of features in the background layers")
+    parser.add_argument("--vertices", type=int, default=50, help="number of vertices per background feature")
+    parser.add_argument("--observations", type=int, default=5000, help="number of observations")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    app = QgsApplication([], True)
+    QgsApplication.setPrefixPath(os.environ.get("QGIS_PREFIX_PATH", "/usr"), True)
+    QgsApplication.initQgis()
+    rng = random.Random(args.seed)
+
+    if args.trace:
+        with open(args.trace) as f:
+            trace = json.load(f)
+    else:
+        trace = syntheticTrace(rng, args.events, 800, 600)
+
+    patches = Patches()
+    patches.apply()
+    try:
+        canvas = QgsMapCanvas()
+        canvas.resize(trace["width"], trace["height"])
+        canvas.mapRenderer().setOutputSize(QSize(trace["width"], trace["height"]), 96)
+        canvas.mapRenderer().setDestinationCrs(QgsCoordinateReferenceSystem("EPSG:21781"))
+        iface = FakeIface(canvas)
+        extent = QgsRectangle(0, 0, 10000, 7500)
+        layers = syntheticLayers(rng, iface, extent, args.features, args.vertices, args.observations)
+        canvas.setLayerSet([QgsMapCanvasLayer(layer) for layer in layers])
+        canvas.setExtent(extent)
+
+        tools = (("DistanceMapTool", distancemaptool.DistanceMapTool(iface)),
+                 ("OrientationMapTool", orientationmaptool.OrientationMapTool(iface)),
+                 ("SimpleIntersectionMapTool", simpleintersectionmaptool.SimpleIntersectionMapTool(iface)),
+                 ("AdvancedIntersectionMapTool", advancedintersectionmaptool.AdvancedIntersectionMapTool(iface)),
+                 ("DimensionEditMapTool", dimensioneditmaptool.DimensionEditMapTool(iface, "distance")))
+        results = {"meta": {"features": args.features, "vertices": args.vertices,
+                            "observations": args.observations, "events": len(trace["events"]),
+                            "trace": args.trace or "synthetic", "seed": args.seed},
+                   "tools": {}}
+        for name, tool in tools:
+            results["tools"][name] = summarize(replay(tool, canvas, trace))
+    finally:
+        patches.restore()
+
+    print("%-28s %-8s %8s %8s %8s %8s %8s %8s" % (("tool", "event") + stages + ("total",)))
+    for name, summary in sorted(results["tools"].items()):
+        for eventType, stats in sorted(summary.items()):
+            print("%-28s %-8s" % (name, eventType) +
+                  "".join(" %8.2f" % stats[stage]["p90"] for stage in stages + ("total",)))
+    print("(p90 latencies in ms)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    QgsApplication.exitQgis()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
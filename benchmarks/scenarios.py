@@ -0,0 +1,103 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Synthetic scenario generators for the benchmarks.
+# All generators take a random.Random instance so that scenarios are reproducible from a seed.
+
+from math import pi, sin, cos
+
+from ..engine.point import Point
+
+
+class Scenario():
+    def __init__(self, target, observations, initPoint):
+        self.target = target
+        self.observations = observations
+        self.initPoint = initPoint
+
+
+def randomStations(rng, target, n, minDistance=10., maxDistance=100., spread=360.):
+    # n stations around the target, within an angular sector of the given spread (degrees)
+    # a small spread gives a poor intersection geometry
+    start = rng.uniform(0, 360)
+    stations = []
+    for i in range(n):
+        azimuth = (start + rng.uniform(0, spread)) * pi/180
+        distance = rng.uniform(minDistance, maxDistance)
+        stations.append(Point(target.x() + distance*sin(azimuth), target.y() + distance*cos(azimuth)))
+    return stations
+
+
+def observe(rng, target, stations, distanceRatio=.5, types=None, distanceNoise=.01, orientationNoise=.01,
+            distancePrecision=.025, orientationPrecision=.5, blunders=0, blunderSize=10.):
+    # observations of the target from each station
+    #   distanceRatio: share of distances, the others are orientations
+    #   types: imposed type of each observation (overrides distanceRatio)
+    #   noise: standard deviation of the gaussian noise (map units for distances, degrees for orientations)
+    #   blunders: number of observations receiving an additional error of blunderSize noise deviations
+    observations = []
+    for i, station in enumerate(stations):
+        if types is not None:
+            isDistance = types[i] == "distance"
+        else:
+            isDistance = rng.random() < distanceRatio
+        if isDistance:
+            observations.append({"type": "distance", "x": station.x(), "y": station.y(),
+                                 "observation": station.distance(target) + rng.gauss(0, distanceNoise),
+                                 "precision": distancePrecision})
+        else:
+            observations.append({"type": "orientation", "x": station.x(), "y": station.y(),
+                                 "observation": station.azimuth(target) + rng.gauss(0, orientationNoise),
+                                 "precision": orientationPrecision})
+    for i in rng.sample(range(len(observations)), min(blunders, len(observations))):
+        obs = observations[i]
+        noise = distanceNoise if obs["type"] == "distance" else orientationNoise
+        obs["observation"] += rng.choice((-1, 1)) * blunderSize * noise
+    return observations
+
+
+def scenario(rng, n, initOffset=1., extent=1000., **kwargs):
+    # a random target observed n times, the initial position being offset from the target
+    # keyword arguments are passed to randomStations and observe
+    target = Point(rng.uniform(-extent, extent), rng.uniform(-extent, extent))
+    stationArgs = dict((k, kwargs.pop(k)) for k in ("minDistance", "maxDistance", "spread") if k in kwargs)
+    stations = randomStations(rng, target, n, **stationArgs)
+    observations = observe(rng, target, stations, **kwargs)
+    initPoint = Point(target.x() + rng.uniform(-initOffset, initOffset),
+                      target.y() + rng.uniform(-initOffset, initOffset))
+    return Scenario(target, observations, initPoint)
+
+
+def typedScenario(rng, types, **kwargs):
+    # scenario with observations of the given types (e.g. ("distance", "orientation"))
+    return scenario(rng, len(types), types=types, **kwargs)
+
+
+def randomPoints(rng, n, extent=1000.):
+    return [Point(rng.uniform(-extent, extent), rng.uniform(-extent, extent)) for i in range(n)]
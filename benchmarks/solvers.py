@@ -0,0 +1,218 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Benchmarks of the engine solvers and geometry generators, runs without QGIS:
+#
+#   python -m intersectit.benchmarks.solvers -o results.json
+#   python -m intersectit.benchmarks.solvers -o new.json --compare results.json
+#
+# Each benchmark is run on reproducible synthetic scenarios (see scenarios.py) and reports
+# latency percentiles, and when relevant iterations, failures and accuracy (distance to the true point).
+
+from __future__ import print_function
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from ..engine.point import Point
+from ..engine.arc import Arc
+from ..engine.shapes import circle
+from ..engine.leastsquares import LeastSquares
+from ..engine.intersections import TwoCirclesIntersection, TwoOrientationIntersection, \
+    DistanceOrientationIntersection, closestPoint
+
+from .scenarios import scenario, typedScenario, randomPoints
+
+defaultSizes = (2, 3, 5, 10, 30, 100, 300, 1000, 3000, 10000)
+
+
+def percentiles(values):
+    values = np.array(values, dtype=np.float64)
+    return {"median": float(np.median(values)),
+            "p90": float(np.percentile(values, 90)),
+            "max": float(np.max(values))}
+
+
+def measure(run, cases):
+    # run(case) is timed for each case, returns latencies in ms and the results
+    latencies = []
+    results = []
+    for case in cases:
+        start = time.time()
+        result = run(case)
+        latencies.append(1000*(time.time() - start))
+        results.append((case, result))
+    return latencies, results
+
+
+def solverEntry(name, size, latencies, results):
+    errors = []
+    iterations = []
+    failures = 0
+    for case, intersection in results:
+        if intersection.solution is None:
+            failures += 1
+            continue
+        errors.append(case.target.distance(intersection.solution))
+        iterations.append(getattr(intersection, "iterations", 0))
+    entry = {"benchmark": name, "size": size, "runs": len(results), "latencyMs": percentiles(latencies),
+             "failures": failures}
+    if len(errors):
+        entry["error"] = percentiles(errors)
+        entry["iterations"] = percentiles(iterations)
+    return entry
+
+
+def benchLeastSquares(rng, sizes, repeats, maxIter, threshold, **scenarioArgs):
+    entries = []
+    for size in sizes:
+        if size < 3:
+            continue
+        cases = [scenario(rng, size, **scenarioArgs) for r in range(repeats)]
+        latencies, results = measure(lambda s: LeastSquares(s.observations, s.initPoint, maxIter, threshold), cases)
+        entries.append(solverEntry("LeastSquares", size, latencies, results))
+    return entries
+
+
+def benchClosedForms(rng, repeats):
+    entries = []
+    benches = (("TwoCirclesIntersection", ("distance", "distance"),
+                lambda s: TwoCirclesIntersection(s.observations, s.initPoint)),
+               ("TwoOrientationIntersection", ("orientation", "orientation"),
+                lambda s: TwoOrientationIntersection(s.observations)),
+               ("DistanceOrientationIntersection", ("distance", "orientation"),
+                lambda s: DistanceOrientationIntersection(s.observations, s.initPoint)))
+    for name, types, run in benches:
+        cases = [typedScenario(rng, types) for r in range(repeats)]
+        latencies, results = measure(run, cases)
+        entries.append(solverEntry(name, 2, latencies, results))
+    return entries
+
+
+def benchGeometries(rng, sizes, repeats):
+    # size is the radius of the arc/circle in map units, the number of vertices is reported
+    entries = []
+    for size in sizes:
+        arcs = []
+        for r in range(repeats):
+            center = randomPoints(rng, 1)[0]
+            p1 = Point(center.x() + size, center.y())
+            p3 = Point(center.x(), center.y() + size)
+            arcs.append(Arc(p1, p3))
+        latencies, results = measure(lambda arc: arc.points(), arcs)
+        entries.append({"benchmark": "Arc.geometry", "size": size, "runs": repeats,
+                        "latencyMs": percentiles(latencies), "vertices": len(results[0][1])})
+        centers = randomPoints(rng, repeats)
+        latencies, results = measure(lambda center: circle(center, size), centers)
+        entries.append({"benchmark": "Distance.geometry", "size": size, "runs": repeats,
+                        "latencyMs": percentiles(latencies), "vertices": len(results[0][1])})
+    return entries
+
+
+def benchClosestPoint(rng, sizes, repeats):
+    entries = []
+    for size in sizes:
+        cases = [(randomPoints(rng, 1)[0], randomPoints(rng, size)) for r in range(repeats)]
+        latencies, results = measure(lambda case: closestPoint(case[0], case[1]), cases)
+        entries.append({"benchmark": "closestPoint", "size": size, "runs": repeats,
+                        "latencyMs": percentiles(latencies)})
+    return entries
+
+
+def runAll(seed=0, sizes=defaultSizes, repeats=20, maxIter=15, threshold=.0005):
+    rng = random.Random(seed)
+    entries = []
+    entries += benchLeastSquares(rng, sizes, repeats, maxIter, threshold)
+    # weak geometry and blunders
+    for entry in benchLeastSquares(rng, sizes, repeats, maxIter, threshold, spread=20.):
+        entry["benchmark"] = "LeastSquares (spread 20 deg)"
+        entries.append(entry)
+    for entry in benchLeastSquares(rng, [size for size in sizes if size >= 5], repeats, maxIter, threshold,
+                                   blunders=1):
+        entry["benchmark"] = "LeastSquares (1 blunder)"
+        entries.append(entry)
+    entries += benchClosedForms(rng, repeats)
+    entries += benchGeometries(rng, (1, 10, 100, 1000), repeats)
+    entries += benchClosestPoint(rng, sizes, repeats)
+    return {"meta": {"seed": seed, "repeats": repeats, "maxIter": maxIter, "threshold": threshold,
+                     "python": platform.python_version(), "numpy": np.__version__,
+                     "platform": platform.platform(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": entries}
+
+
+def compare(current, reference):
+    # print the ratio of median latencies and the change of median error for matching entries
+    referenceEntries = dict(((e["benchmark"], e["size"]), e) for e in reference["results"])
+    print("%-35s %6s %12s %12s %8s" % ("benchmark", "size", "ref [ms]", "new [ms]", "ratio"))
+    for entry in current["results"]:
+        ref = referenceEntries.get((entry["benchmark"], entry["size"]))
+        if ref is None:
+            continue
+        old = ref["latencyMs"]["median"]
+        new = entry["latencyMs"]["median"]
+        ratio = new / old if old > 0 else float("inf")
+        line = "%-35s %6s %12.4f %12.4f %8.2f" % (entry["benchmark"], entry["size"], old, new, ratio)
+        if "error" in entry and "error" in ref:
+            line += "   error %.2e -> %.2e" % (ref["error"]["median"], entry["error"]["median"])
+        if entry.get("failures", 0) != ref.get("failures", 0):
+            line += "   failures %u -> %u" % (ref["failures"], entry["failures"])
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m intersectit.benchmarks.solvers",
+                                     description="Benchmark the intersection solvers and geometry generators.")
+    parser.add_argument("-o", "--output", help="JSON result file (default: standard output)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=20, help="number of scenarios per benchmark and size")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in defaultSizes),
+                        help="comma separated numbers of observations")
+    parser.add_argument("--compare", help="reference JSON result file to compare with")
+    args = parser.parse_args(argv)
+
+    results = runAll(args.seed, [int(s) for s in args.sizes.split(",")], args.repeats)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    elif args.compare is None:
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
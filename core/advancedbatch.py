@@ -0,0 +1,142 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from qgis.core import QgsFeature, QgsFeatureRequest, QgsGeometry, QgsMapLayerRegistry, QgsPoint
+
+from mysettings import MySettings
+from solver import intersect
+from dimensions import writeDimensionsMany
+from provenance import provenanceGraph, recordIntersections
+from reports import reportValue
+from ..engine.observations import packFeatures
+from ..engine.clustering import clusterObservations
+
+# clusters with less redundancy are flagged: unrelated observations meeting near a point pass any variance test
+minRedundancy = 2
+
+
+class Cluster():
+    # observations of one target and the result of their adjustment
+    def __init__(self, observations, seed):
+        self.observations = observations
+        self.seed = seed
+        self.solution = None
+        self.report = ""
+        self.intersection = None
+        self.varianceFactor = None
+        self.status = "pending"
+
+    def flagged(self):
+        return self.status in ("failed", "variance", "redundancy")
+
+
+class AdvancedBatch():
+    def __init__(self, lineLayer, tolerance, reach, minObservations, maxVarianceFactor):
+        # tolerance: size of the cells gathering the intersection candidates of a target (map units)
+        # reach: length of the orientations (map units)
+        # maxVarianceFactor: clusters with a larger variance factor (sigma0^2 with the a priori precisions)
+        # are flagged for review, the observations of another target give a large one
+        self.lineLayer = lineLayer
+        self.tolerance = tolerance
+        self.reach = reach
+        self.minObservations = minObservations
+        self.maxVarianceFactor = maxVarianceFactor
+        self.settings = MySettings()
+        self.clusters = []
+        self.nObservations = 0
+
+    def cluster(self):
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+        observations = packFeatures(self.lineLayer.getFeatures(request))
+        # the observations of the intersections already saved are left out, the batch can be run again
+        graph = provenanceGraph()
+        observations = observations[[not graph.isUsed(obsId) for obsId in observations["id"]]] \
+            if len(observations) else observations
+        self.nObservations = len(observations)
+        self.clusters = [Cluster(observations[indexes], seed) for indexes, seed in
+                         clusterObservations(observations, self.tolerance, self.reach, self.minObservations)]
+        return self.clusters
+
+    def adjust(self, cluster):
+        maxIter = self.settings.value("advancedIntersecLSmaxIteration")
+        threshold = self.settings.value("advancedIntersecLSconvergeThreshold")
+        intersection = intersect(cluster.observations, QgsPoint(cluster.seed[0], cluster.seed[1]), maxIter, threshold)
+        cluster.report = intersection.report
+        cluster.intersection = intersection
+        if intersection.solution is None:
+            cluster.status = "failed"
+            return
+        cluster.solution = intersection.solution
+        normals = getattr(intersection, "normals", None)
+        cluster.varianceFactor = normals.varianceFactor() if normals is not None else None
+        if len(cluster.observations) - 2 < minRedundancy:
+            cluster.status = "redundancy"
+        elif cluster.varianceFactor is not None and cluster.varianceFactor > self.maxVarianceFactor:
+            cluster.status = "variance"
+        else:
+            cluster.status = "accepted"
+
+    def accepted(self):
+        return [cluster for cluster in self.clusters if cluster.status == "accepted"]
+
+    def write(self, iface, clusters):
+        # points, reports and dimensions of the clusters, one write per layer
+        # returns the number of intersections written
+        clusters = [cluster for cluster in clusters if cluster.solution is not None]
+        if len(clusters) == 0:
+            return 0
+        points = [None] * len(clusters)
+        if self.settings.value("advancedIntersectionWritePoint"):
+            layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("advancedIntersectionLayer"))
+            if layer is not None:
+                fields = layer.dataProvider().fields()
+                reportIndex = -1
+                if self.settings.value("advancedIntersectionWriteReport"):
+                    reportIndex = layer.dataProvider().fieldNameIndex(self.settings.value("reportField"))
+                features = []
+                for cluster in clusters:
+                    f = QgsFeature()
+                    f.setFields(fields)
+                    f.initAttributes(fields.size())
+                    if reportIndex != -1:
+                        f[reportIndex] = reportValue(cluster.intersection, cluster.observations)
+                    f.setGeometry(QgsGeometry().fromPoint(cluster.solution))
+                    features.append(f)
+                ok, features = layer.dataProvider().addFeatures(features)
+                if ok:
+                    points = [(layer.id(), f.id()) for f in features]
+                layer.updateExtents()
+        dimensions = writeDimensionsMany(iface, [(cluster.solution, cluster.observations) for cluster in clusters])
+        recordIntersections([(cluster.solution, point, cluster.observations, clusterDimensions)
+                             for cluster, point, clusterDimensions in zip(clusters, points, dimensions)])
+        for cluster in clusters:
+            cluster.status = "written"
+        iface.mapCanvas().refresh()
+        return len(clusters)
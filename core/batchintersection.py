@@ -0,0 +1,91 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from qgis.core import QgsSpatialIndex, QgsCoordinateTransform
+
+from linearintersection import linearGeometry, intersectionPoints
+
+
+class BatchIntersection():
+    def __init__(self, layer1, layer2=None):
+        # intersect all features of layer1 with the ones of layer2
+        # if layer2 is None, the features of layer1 are intersected with each other
+        if layer2 is None:
+            layer2 = layer1
+        self.layer1 = layer1
+        self.layer2 = layer2
+        self.selfIntersection = layer1.id() == layer2.id()
+        self.transform = None
+        if layer1.crs() != layer2.crs():
+            self.transform = QgsCoordinateTransform(layer2.crs(), layer1.crs())
+        self.index = None
+        self.features2 = {}
+
+    def featureCount(self):
+        return self.layer1.featureCount()
+
+    def buildIndex(self):
+        # candidates are found using a R-tree on the bounding boxes of layer2 features
+        # geometries are kept in their linear form (in layer1 CRS) to be intersected directly
+        self.index = QgsSpatialIndex()
+        self.features2 = {}
+        for f in self.layer2.getFeatures():
+            if f.geometry() is None:
+                continue
+            geometry = linearGeometry(f.geometry())
+            if self.transform is not None:
+                geometry.transform(self.transform)
+            self.features2[f.id()] = (f, geometry)
+            self.index.insertFeature(f)
+        return self.index
+
+    def intersections(self):
+        # generator yielding, for each feature of layer1, the feature and the list of its intersections
+        # as (point, feature2) tuples, points are in layer1 CRS
+        if self.index is None:
+            self.buildIndex()
+        for f1 in self.layer1.getFeatures():
+            yield f1, self.intersectFeature(f1)
+
+    def intersectFeature(self, f1):
+        if f1.geometry() is None:
+            return []
+        geometry1 = linearGeometry(f1.geometry())
+        rect = geometry1.boundingBox()
+        if self.transform is not None:
+            rect = self.transform.transform(rect, QgsCoordinateTransform.ReverseTransform)
+        intersections = []
+        for fid in self.index.intersects(rect):
+            # in a single layer, each pair is tested once and a feature is not intersected with itself
+            if self.selfIntersection and fid <= f1.id():
+                continue
+            f2, geometry2 = self.features2[fid]
+            for point in intersectionPoints(geometry1, geometry2):
+                intersections.append((point, f2))
+        return intersections
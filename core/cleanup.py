@@ -0,0 +1,99 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from datetime import datetime, timedelta
+
+from qgis.core import QgsFeatureRequest, QgsMapLayerRegistry
+
+from mysettings import MySettings
+from memorylayers import MemoryLayers
+from provenance import provenanceGraph
+from observationjournal import journalFeatures
+
+# the id of an observation is its creation time (see Observation)
+idFormat = "%Y%m%d%H%M%S%f"
+
+
+def observationRequest(extent=None, types=None, age=None):
+    # request of the observations matching the criteria
+    # extent: rectangle in layer coordinates, candidates come from the spatial index
+    # types: observation types to keep (None for all)
+    # age: minimum age in minutes
+    request = QgsFeatureRequest()
+    if extent is not None:
+        request.setFilterRect(extent)
+        request.setFlags(QgsFeatureRequest.ExactIntersect)
+    else:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+    conditions = []
+    if types is not None:
+        conditions.append("\"type\" IN (%s)" % ",".join("'%s'" % obsType for obsType in types))
+    if age is not None:
+        # ids have a fixed width, so they are ordered as their timestamp
+        createdBefore = (datetime.now() - timedelta(minutes=age)).strftime(idFormat)
+        conditions.append("\"id\" < '%s'" % createdBefore)
+    if len(conditions):
+        request.setFilterExpression(" AND ".join(conditions))
+    return request
+
+
+def deleteObservations(iface, extent=None, types=None, age=None, usedOnly=False):
+    # delete the observations matching all the criteria with their centers, one delete per layer
+    # usedOnly: only the observations used by a saved intersection
+    # the saved intersections are not adjusted again, their observations are kept in the provenance graph
+    # returns the number of observations deleted
+    settings = MySettings()
+    lineLayer = QgsMapLayerRegistry.instance().mapLayer(settings.value("memoryLineLayer"))
+    if lineLayer is None:
+        return 0
+    features = lineLayer.dataProvider().getFeatures(observationRequest(extent, types, age))
+    if usedOnly:
+        graph = provenanceGraph()
+        features = [f for f in features if graph.isUsed(f["id"])]
+    else:
+        features = list(features)
+    if len(features) == 0:
+        return 0
+    journalFeatures("delete", features)
+    lineLayer.dataProvider().deleteFeatures([f.id() for f in features])
+    lineLayer.triggerRepaint()
+    MemoryLayers(iface).deleteCenters([f["id"] for f in features])
+    return len(features)
+
+
+def deleteAll(layers):
+    # all the features of the layers, read without geometry nor attributes
+    lineLayerId = MySettings().value("memoryLineLayer")
+    request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([])
+    for layer in layers:
+        if layer.id() == lineLayerId:
+            journalFeatures("delete", layer.dataProvider().getFeatures())
+        layer.dataProvider().deleteFeatures([f.id() for f in layer.dataProvider().getFeatures(request)])
+        layer.triggerRepaint()
@@ -0,0 +1,114 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from qgis.core import QgsFeature, QgsGeometry, QgsMapLayerRegistry, QgsPoint
+from qgis.gui import QgsMessageBar
+
+from mysettings import MySettings
+from arc import Arc
+
+obsTypes = ("Distance", "Orientation")
+
+
+def dimensionFeature(settings, fields, obsType, obs, intersectedPoint):
+    f = QgsFeature()
+    f.setFields(fields)
+    f.initAttributes(fields.size())
+    if settings.value("dimension"+obsType+"ObservationWrite"):
+        f[settings.value("dimension"+obsType+"ObservationField")] = float(obs["observation"])
+    if settings.value("dimension"+obsType+"PrecisionWrite"):
+        f[settings.value("dimension"+obsType+"PrecisionField")] = float(obs["precision"])
+    p0 = QgsPoint(obs["x"], obs["y"])
+    p1 = intersectedPoint
+    if obs["type"] == "distance":
+        geom = Arc(p0, p1).geometry()
+    elif obs["type"] == "orientation":
+        geom = QgsGeometry().fromPolyline([p0, p1])
+    else:
+        raise NameError("Invalid observation %s" % obs["type"])
+    f.setGeometry(geom)
+    return f
+
+
+def writeDimensionsMany(iface, intersections):
+    # intersections: list of (intersected point, observations), all written with one write per layer
+    # returns a list of {observation id: (layer id, feature id)}, one per intersection
+    dimensions = [{} for i in range(len(intersections))]
+    for layer, keys, features in dimensionFeaturesMany(intersections):
+        ok, features = layer.dataProvider().addFeatures(features)
+        if not ok:
+            iface.messageBar().pushMessage("Could not commit %s dimensions" % layer.name(), QgsMessageBar.CRITICAL)
+            continue
+        linkDimensions(dimensions, layer, keys, features)
+        layer.updateExtents()
+    return dimensions
+
+
+def dimensionFeatures(intersectedPoint, observations):
+    return dimensionFeaturesMany([(intersectedPoint, observations)])
+
+
+def dimensionFeaturesMany(intersections):
+    # dimension features of the observations in the layers defined in the settings, not written yet
+    # returns a list of (layer, [(intersection index, observation id)], features), one per layer
+    settings = MySettings()
+    layers = []
+    for obsType in obsTypes:
+        if not settings.value("dimension"+obsType+"Write"):
+            continue
+        layer = QgsMapLayerRegistry.instance().mapLayer(settings.value("dimension"+obsType+"Layer"))
+        if layer is None:
+            continue
+        fields = layer.dataProvider().fields()
+        written = [(i, obs) for i, (intersectedPoint, observations) in enumerate(intersections)
+                   for obs in observations if obs["type"] == obsType.lower()]
+        if len(written) == 0:
+            continue
+        features = [dimensionFeature(settings, fields, obsType, obs, intersections[i][0]) for i, obs in written]
+        layers.append((layer, [(i, str(obs["id"])) for i, obs in written], features))
+    return layers
+
+
+def linkDimensions(dimensions, layer, keys, features):
+    # fill the {observation id: (layer id, feature id)} of each intersection with the written features
+    for (i, obsId), f in zip(keys, features):
+        dimensions[i][obsId] = (layer.id(), f.id())
+
+
+def deleteDimensions(dimensions):
+    # dimensions: {observation id: (layer id, feature id)}, one delete per layer
+    fids = {}
+    for layerId, fid in dimensions.values():
+        fids.setdefault(layerId, []).append(fid)
+    for layerId, layerFids in fids.items():
+        layer = QgsMapLayerRegistry.instance().mapLayer(layerId)
+        if layer is not None:
+            layer.dataProvider().deleteFeatures(layerFids)
+            layer.updateExtents()
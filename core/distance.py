@@ -27,11 +27,11 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QgsPoint, QgsGeometry
-from math import pi, cos, sin
+from ..engine.shapes import circle
 
 from mysettings import MySettings
 from observation import Observation
+from qgisadapter import polylineGeometry
 
 class Distance(Observation):
     def __init__(self, iface, point, observation):
@@ -40,6 +40,4 @@ class Distance(Observation):
 
     def geometry(self):
         # trace circle at distance from point
-        return QgsGeometry().fromPolyline([QgsPoint(self.point.x() + self.observation * cos(pi/180*a),
-                                                    self.point.y() + self.observation * sin(pi/180*a))
-                                           for a in range(0, 361, 3)])
+        return polylineGeometry(circle(self.point, self.observation))
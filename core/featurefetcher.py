@@ -0,0 +1,70 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from qgis.core import QgsFeatureRequest
+
+from ..engine.instrumentation import timed
+
+
+@timed("fetching")
+def fetchSnappedFeatures(snappingResults, attributes=None, geometry=True, rendering=False):
+    # fetch the features hit by the snapper, using a single request per layer
+    #   attributes: list of field names to fetch (None fetches all of them)
+    #   geometry: set to False if the geometry is not needed
+    #   rendering: fetch the attributes needed by the renderer (to check if the feature is rendered)
+    # features are returned in the order of the snapping results and have the layer as attribute
+    layers = {}
+    order = []
+    for result in snappingResults:
+        layerId = result.layer.id()
+        fid = result.snappedAtGeometry
+        if layerId not in layers:
+            layers[layerId] = (result.layer, set())
+        if fid in layers[layerId][1]:
+            continue
+        layers[layerId][1].add(fid)
+        order.append((layerId, fid))
+
+    features = {}
+    for layerId, (layer, fids) in layers.iteritems():
+        request = QgsFeatureRequest().setFilterFids(list(fids))
+        if not geometry:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        if attributes is not None:
+            fieldNames = list(attributes)
+            if rendering:
+                fieldNames += layer.rendererV2().usedAttributes()
+            indexes = set([layer.fieldNameIndex(name) for name in fieldNames])
+            indexes.discard(-1)
+            request.setSubsetOfAttributes(list(indexes))
+        # the iterator returns a new feature at each step, no need to copy it
+        for f in layer.getFeatures(request):
+            f.layer = layer
+            features[(layerId, f.id())] = f
+    return [features[key] for key in order if key in features]
@@ -30,7 +30,10 @@
 
 from qgis.core import QgsRenderContext, QGis
 
+from ..engine.instrumentation import timed
 
+
+@timed("visibility check")
 def isFeatureRendered(canvas, layer, feature):
     renderer = layer.rendererV2()
 
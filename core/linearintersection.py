@@ -0,0 +1,98 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from qgis.core import QGis, QgsGeometry, QgsPoint
+
+from ..engine.instrumentation import timed
+
+
+def linearParts(geometry):
+    # return the geometry as a list of polylines, polygons being replaced by their rings
+    if geometry.type() == QGis.Polygon:
+        if geometry.isMultipart():
+            return [ring for polygon in geometry.asMultiPolygon() for ring in polygon]
+        return geometry.asPolygon()
+    if geometry.type() == QGis.Line:
+        if geometry.isMultipart():
+            return geometry.asMultiPolyline()
+        return [geometry.asPolyline()]
+    return []
+
+
+def linearGeometry(geometry):
+    return QgsGeometry().fromMultiPolyline(linearParts(geometry))
+
+
+def clipToWindow(geometry, window):
+    # keep only the runs of consecutive segments whose bounding box touches the window
+    # this avoids GEOS to node the full geometries when only the neighbourhood of the cursor matters
+    xMin = window.xMinimum()
+    xMax = window.xMaximum()
+    yMin = window.yMinimum()
+    yMax = window.yMaximum()
+    lines = []
+    for polyline in linearParts(geometry):
+        run = []
+        for i in range(len(polyline)-1):
+            p1 = polyline[i]
+            p2 = polyline[i+1]
+            if max(p1.x(), p2.x()) < xMin or min(p1.x(), p2.x()) > xMax or \
+               max(p1.y(), p2.y()) < yMin or min(p1.y(), p2.y()) > yMax:
+                if len(run) > 1:
+                    lines.append(run)
+                run = []
+                continue
+            if len(run) == 0:
+                run.append(p1)
+            run.append(p2)
+        if len(run) > 1:
+            lines.append(run)
+    if len(lines) == 0:
+        return None
+    return QgsGeometry().fromMultiPolyline(lines)
+
+
+@timed("intersection")
+def intersectionPoints(geometry1, geometry2):
+    # return the intersection of two linear geometries as a list of points
+    if not geometry1.boundingBox().intersects(geometry2.boundingBox()):
+        return []
+    intersection = geometry1.intersection(geometry2)
+    if intersection is None:
+        return []
+    points = intersection.asMultiPoint()
+    if len(points) == 0:
+        points = intersection.asPolyline()
+    if len(points) == 0:
+        points = [point for polyline in intersection.asMultiPolyline() for point in polyline]
+    if len(points) == 0:
+        point = intersection.asPoint()
+        if point != QgsPoint(0, 0):
+            points = [point]
+    return [QgsPoint(point) for point in points]
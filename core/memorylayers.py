@@ -27,9 +27,34 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QgsMapLayerRegistry, QgsVectorLayer
+from qgis.core import QgsMapLayerRegistry, QgsVectorLayer, QgsFeatureRequest
+from qgis.gui import QgsMessageBar
 
 from mysettings import MySettings
+from observationstore import storePath, spatialiteLayer
+from observationjournal import journalFeatures
+
+lineFields = (("id", "string"), ("type", "string"), ("x", "double"), ("y", "double"),
+              ("observation", "double"), ("precision", "double"))
+pointFields = (("id", "string"),)
+
+
+def idExpression(obsIds):
+    # filter on the id field, which providers can resolve with their index on it
+    return "\"id\" IN (%s)" % ",".join("'%s'" % obsId for obsId in obsIds)
+
+
+def observationsById(obsIds):
+    # observations of the line layer (as committed) by id
+    layer = QgsMapLayerRegistry.instance().mapLayer(MySettings().value("memoryLineLayer"))
+    if layer is None or len(obsIds) == 0:
+        return {}
+    request = QgsFeatureRequest().setFilterExpression(idExpression(obsIds)).setFlags(QgsFeatureRequest.NoGeometry)
+    observations = {}
+    for f in layer.dataProvider().getFeatures(request):
+        observations[f["id"]] = {"id": f["id"], "type": f["type"], "x": f["x"], "y": f["y"],
+                                 "observation": f["observation"], "precision": f["precision"]}
+    return observations
 
 
 class MemoryLayers():
@@ -41,29 +66,88 @@ class MemoryLayers():
         layerID = self.settings.value("memoryLineLayer")
         layer = QgsMapLayerRegistry.instance().mapLayer(layerID)
         if layer is None:
-            epsg = self.iface.mapCanvas().mapRenderer().destinationCrs().authid()
-            layer = QgsVectorLayer("LineString?crs=%s&field=id:string&field=type:string&field=x:double&field=y:double&field=observation:double&field=precision:double&index=yes" % epsg, "IntersectIt Lines", "memory")
-            QgsMapLayerRegistry.instance().addMapLayer(layer)
-            layer.layerDeleted.connect(self.__lineLayerDeleted)
-            layer.featureDeleted.connect(self.__lineLayerFeatureDeleted)
+            layer = self.createLayer("LineString", lineFields, "IntersectIt Lines", "observations")
+            # the setting is saved first, the plugin follows the edits of the layer once it is added
             self.settings.setValue("memoryLineLayer", layer.id())
+            QgsMapLayerRegistry.instance().addMapLayer(layer)
         else:
             self.iface.legendInterface().setLayerVisible(layer, True)
         return layer
 
+    def createLayer(self, geometryType, fields, name, table):
+        # layers are stored in memory or in a SpatiaLite file next to the project (see settings)
+        crs = self.iface.mapCanvas().mapRenderer().destinationCrs()
+        if self.settings.value("observationStorage") == "spatialite":
+            path = storePath()
+            layer = None
+            if path is not None:
+                layer = spatialiteLayer(path, table, geometryType, fields, crs, name)
+            if layer is not None:
+                return layer
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                "Construction features can not be stored on disk"
+                                                " (the project must be saved and SpatiaLite available),"
+                                                " they are kept in memory.", QgsMessageBar.WARNING, 5)
+        fieldDefinitions = "".join(["&field=%s:%s" % field for field in fields])
+        return QgsVectorLayer("%s?crs=%s%s&index=yes" % (geometryType, crs.authid(), fieldDefinitions), name, "memory")
+
+    def existingLayers(self):
+        # the memory layers which have already been created
+        layers = []
+        for setting in ("memoryLineLayer", "memoryPointLayer"):
+            layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value(setting))
+            if layer is not None:
+                layers.append(layer)
+        return layers
+
+    def followLineLayer(self, layer):
+        # journal, centers and intersections follow the edits of the line layer
+        layer.layerDeleted.connect(self.__lineLayerDeleted)
+        layer.beforeCommitChanges.connect(self.__lineLayerBeforeCommit)
+
+    def unfollowLineLayer(self, layer):
+        layer.layerDeleted.disconnect(self.__lineLayerDeleted)
+        layer.beforeCommitChanges.disconnect(self.__lineLayerBeforeCommit)
+
     def __lineLayerDeleted(self):
         self.settings.setValue("memoryLineLayer", "")
 
-    def __lineLayerFeatureDeleted(self, fid):
-        # todo: delete corresponding feature in other layer
-        print "hay"
+    def __lineLayerBeforeCommit(self):
+        # observations edited or deleted in the layer: log them in the journal,
+        # delete the centers of the deleted observations and adjust again the intersections using them
+        layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("memoryLineLayer"))
+        if layer is None:
+            return
+        editBuffer = layer.editBuffer()
+        # the deleted features are still in the provider, the edited ones are read with the pending changes
+        deletedIds = [fid for fid in editBuffer.deletedFeatureIds() if fid >= 0]
+        editedIds = [fid for fid in editBuffer.changedAttributeValues().keys() if fid >= 0 and fid not in deletedIds]
+        deleted = list(layer.dataProvider().getFeatures(QgsFeatureRequest().setFilterFids(deletedIds)))
+        edited = list(layer.getFeatures(QgsFeatureRequest().setFilterFids(editedIds)))
+        journalFeatures("delete", deleted)
+        journalFeatures("edit", edited)
+        self.deleteCenters([f["id"] for f in deleted])
+        # the intersections using these observations are adjusted again once the changes are committed
+        from readjustment import readjustLater
+        readjustLater(self.iface, [f["id"] for f in edited], [f["id"] for f in deleted])
+
+    def deleteCenters(self, obsIds):
+        pointLayer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("memoryPointLayer"))
+        if pointLayer is None or len(obsIds) == 0:
+            return
+        # only the centers of these observations are fetched, with their id (needed by the filter) only
+        request = QgsFeatureRequest().setFilterExpression(idExpression(obsIds))
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+        request.setSubsetOfAttributes([pointLayer.dataProvider().fieldNameIndex("id")])
+        fids = [f.id() for f in pointLayer.dataProvider().getFeatures(request)]
+        pointLayer.dataProvider().deleteFeatures(fids)
+        pointLayer.triggerRepaint()
 
     def pointLayer(self):
         layerID = self.settings.value("memoryPointLayer")
         layer = QgsMapLayerRegistry.instance().mapLayer(layerID)
         if layer is None:
-            epsg = self.iface.mapCanvas().mapRenderer().destinationCrs().authid()
-            layer = QgsVectorLayer("Point?crs=%s&field=id:string&index=yes" % epsg, "IntersectIt Points", "memory")
+            layer = self.createLayer("Point", pointFields, "IntersectIt Points", "centers")
             QgsMapLayerRegistry.instance().addMapLayer(layer)
             layer.layerDeleted.connect(self.__pointLayerDeleted)
             self.settings.setValue("memoryPointLayer", layer.id())
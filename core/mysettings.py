@@ -50,11 +50,29 @@ class MySettings(SettingManager):
         self.addSetting("rubberIcon", "integer", "global", 4)
         self.addSetting("advancedIntersecLSmaxIteration", "Integer", "global", 15)
         self.addSetting("advancedIntersecLSconvergeThreshold", "double", "global", .0005)
+        self.addSetting("advancedIntersecGridSearch", "bool", "global", False)
+        self.addSetting("advancedIntersecGridSearchBudget", "integer", "global", 50)
+        self.addSetting("hoverFrameBudget", "integer", "global", 16)
+        self.addSetting("writeBufferDelay", "integer", "global", 1000)
+        self.addSetting("instrumentationEnabled", "bool", "global", False)
+        self.addSetting("likelihoodSurface", "bool", "global", False)
+        self.addSetting("batchClusterTolerance", "double", "global", .5)
+        self.addSetting("batchOrientationReach", "double", "global", 100)
+        self.addSetting("batchMinObservations", "integer", "global", 3)
+        self.addSetting("batchMaxVarianceFactor", "double", "global", 3)
+        self.addSetting("cleanupExtent", "bool", "global", False)
+        self.addSetting("cleanupOlder", "bool", "global", False)
+        self.addSetting("cleanupAge", "integer", "global", 60)
+        self.addSetting("cleanupDistances", "bool", "global", True)
+        self.addSetting("cleanupOrientations", "bool", "global", True)
+        self.addSetting("cleanupUsedOnly", "bool", "global", False)
 
         # project settings
         self.addSetting("simpleIntersectionWritePoint", "bool", "project", False)
         self.addSetting("advancedIntersectionWritePoint", "bool", "project", False)
         self.addSetting("advancedIntersectionWriteReport", "bool", "project", False)
+        self.addSetting("advancedIntersectionReadjust", "bool", "project", True)
+        self.addSetting("advancedIntersectionReportFormat", "string", "project", "text")
         self.addSetting("dimensionDistanceWrite", "bool", "project", False)
         self.addSetting("dimensionDistanceObservationWrite", "bool", "project", False)
         self.addSetting("dimensionDistancePrecisionWrite", "bool", "project", False)
@@ -74,3 +92,5 @@ class MySettings(SettingManager):
         self.addSetting("reportField", "string", "project", "")
         self.addSetting("memoryLineLayer", "string", "project", "")
         self.addSetting("memoryPointLayer", "string", "project", "")
+        self.addSetting("observationStorage", "string", "project", "memory")
+        self.addSetting("observationJournal", "bool", "project", False)
@@ -32,14 +32,15 @@ from qgis.core import QgsPoint, QgsGeometry, QgsFeature
 from datetime import datetime
 
 from memorylayers import MemoryLayers
+from observationjournal import journalObservations
+from ..engine.instrumentation import timed
 
 
 
 class Observation():
     def __init__(self, iface, obsType, point, observation, precision):
-        memoryLayers = MemoryLayers(iface)
-        self.lineLayer = memoryLayers.lineLayer()
-        self.pointLayer = memoryLayers.pointLayer()
+        # the memory layers are only fetched (or created) when the observation is saved
+        self.iface = iface
 
         # generate ID;
         self.id = datetime.now().strftime("%Y%m%d%H%M%S%f")
@@ -60,10 +61,8 @@ class Observation():
     def geometry(self):
         return QgsGeometry()
 
-    def save(self):
-        # observation
+    def lineFeature(self, fields):
         f = QgsFeature()
-        fields = self.lineLayer.dataProvider().fields()
         f.setFields(fields)
         f["id"] = self.id
         f["type"] = self.obsType
@@ -72,19 +71,30 @@ class Observation():
         f["observation"] = self.observation
         f["precision"] = self.precision
         f.setGeometry(self.geometry())
-        self.lineLayer.dataProvider().addFeatures([f])
-        self.lineLayer.updateExtents()
-        self.lineLayer.setCacheImage(None)
-        self.lineLayer.triggerRepaint()
+        return f
 
-        # center
+    def pointFeature(self, fields):
         f = QgsFeature()
-        fields = self.pointLayer.dataProvider().fields()
         f.setFields(fields)
         f["id"] = self.id
         f.setGeometry(QgsGeometry().fromPoint(self.point))
-        self.pointLayer.dataProvider().addFeatures([f])
+        return f
+
+    @timed("observation save")
+    def save(self):
+        memoryLayers = MemoryLayers(self.iface)
+        self.lineLayer = memoryLayers.lineLayer()
+        self.pointLayer = memoryLayers.pointLayer()
+        # observation
+        self.lineLayer.dataProvider().addFeatures([self.lineFeature(self.lineLayer.dataProvider().fields())])
+        self.lineLayer.updateExtents()
+        self.lineLayer.setCacheImage(None)
+        self.lineLayer.triggerRepaint()
+
+        # center
+        self.pointLayer.dataProvider().addFeatures([self.pointFeature(self.pointLayer.dataProvider().fields())])
         self.pointLayer.updateExtents()
         self.pointLayer.setCacheImage(None)
         self.pointLayer.triggerRepaint()
 
+        journalObservations("create", [self])
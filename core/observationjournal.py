@@ -0,0 +1,113 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QFileInfo
+from qgis.core import QgsProject, QgsPoint, QgsFeatureRequest
+
+from mysettings import MySettings
+from ..engine.journal import Journal, JournalError, observationTypes
+
+
+def journalPath():
+    # the journal is saved next to the project: myproject_intersectit.journal
+    # returns None if the project has not been saved yet
+    projectFile = QgsProject.instance().fileName()
+    if not projectFile:
+        return None
+    info = QFileInfo(projectFile)
+    return "%s/%s_intersectit.journal" % (info.absolutePath(), info.completeBaseName())
+
+
+def openJournal():
+    # returns None if the journal is disabled or can not be opened
+    if not MySettings().value("observationJournal"):
+        return None
+    path = journalPath()
+    if path is None:
+        return None
+    try:
+        return Journal(path)
+    except (JournalError, IOError, OSError):
+        return None
+
+
+def journalObservations(operation, observations):
+    # observations: Observation instances
+    journal = openJournal()
+    if journal is None:
+        return
+    journal.appendMany([(operation, obs.id, obs.obsType, obs.point.x(), obs.point.y(), obs.observation,
+                         obs.precision) for obs in observations])
+
+
+def journalFeatures(operation, features):
+    # features of the line layer
+    journal = openJournal()
+    if journal is None:
+        return
+    journal.appendMany([(operation, f["id"], f["type"], f["x"], f["y"], f["observation"], f["precision"])
+                        for f in features])
+
+
+def rebuildLayers(iface):
+    # replace the content of the construction layers by the current state of the journal
+    # returns the number of observations loaded, None if there is no journal
+    from memorylayers import MemoryLayers
+    from distance import Distance
+    from orientation import Orientation
+    journal = openJournal()
+    if journal is None:
+        return None
+    records = journal.replay()
+    memoryLayers = MemoryLayers(iface)
+    lineLayer = memoryLayers.lineLayer()
+    pointLayer = memoryLayers.pointLayer()
+    lineFields = lineLayer.dataProvider().fields()
+    pointFields = pointLayer.dataProvider().fields()
+    lineFeatures = []
+    pointFeatures = []
+    for record in records:
+        point = QgsPoint(float(record["x"]), float(record["y"]))
+        if observationTypes[record["type"]] == "distance":
+            obs = Distance(iface, point, float(record["observation"]))
+        else:
+            obs = Orientation(iface, point, float(record["observation"]))
+        obs.id = record["id"].decode("ascii")
+        obs.precision = float(record["precision"])
+        lineFeatures.append(obs.lineFeature(lineFields))
+        pointFeatures.append(obs.pointFeature(pointFields))
+    # one bulk load per layer
+    for layer, features in ((lineLayer, lineFeatures), (pointLayer, pointFeatures)):
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([])
+        layer.dataProvider().deleteFeatures([f.id() for f in layer.dataProvider().getFeatures(request)])
+        layer.dataProvider().addFeatures(features)
+        layer.updateExtents()
+        layer.setCacheImage(None)
+        layer.triggerRepaint()
+    return len(records)
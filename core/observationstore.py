@@ -0,0 +1,78 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QFileInfo
+from qgis.core import QgsProject, QgsVectorLayer, QgsDataSourceURI
+
+sqlTypes = {"string": "TEXT", "double": "REAL", "integer": "INTEGER"}
+
+
+def storePath():
+    # the SpatiaLite file is saved next to the project: myproject_intersectit.sqlite
+    # returns None if the project has not been saved yet
+    projectFile = QgsProject.instance().fileName()
+    if not projectFile:
+        return None
+    info = QFileInfo(projectFile)
+    return "%s/%s_intersectit.sqlite" % (info.absolutePath(), info.completeBaseName())
+
+
+def spatialiteLayer(path, table, geometryType, fields, crs, name):
+    # open a table of the store, the file and the table are created if needed
+    # fields: list of (name, type) with type in sqlTypes
+    # returns None if SpatiaLite is not available or the layer can not be opened
+    try:
+        from pyspatialite import dbapi2 as sqlite
+    except ImportError:
+        return None
+    connection = sqlite.connect(path)
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT count(*) FROM sqlite_master WHERE type='table' AND name='geometry_columns'")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT InitSpatialMetadata()")
+        cursor.execute("SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        if cursor.fetchone()[0] == 0:
+            columns = ", ".join(["%s %s" % (fieldName, sqlTypes[fieldType]) for fieldName, fieldType in fields])
+            cursor.execute("CREATE TABLE %s (fid INTEGER PRIMARY KEY AUTOINCREMENT, %s)" % (table, columns))
+            cursor.execute("SELECT AddGeometryColumn(?, 'geometry', ?, ?, 'XY')",
+                           (table, crs.postgisSrid(), geometryType.upper()))
+            # R-tree index for the rendering and the snapping, observations are also looked up by id
+            cursor.execute("SELECT CreateSpatialIndex(?, 'geometry')", (table,))
+            cursor.execute("CREATE INDEX %s_id ON %s (id)" % (table, table))
+        connection.commit()
+    finally:
+        connection.close()
+    uri = QgsDataSourceURI()
+    uri.setDatabase(path)
+    uri.setDataSource("", table, "geometry")
+    layer = QgsVectorLayer(uri.uri(), name, "spatialite")
+    if not layer.isValid():
+        return None
+    return layer
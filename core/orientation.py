@@ -27,11 +27,11 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QgsPoint, QgsGeometry
-from math import cos, sin, pi
+from ..engine.shapes import ray
 
 from mysettings import MySettings
 from observation import Observation
+from qgisadapter import polylineGeometry
 
 
 class Orientation(Observation):
@@ -42,6 +42,4 @@ class Orientation(Observation):
         Observation.__init__(self, iface, "orientation", point, observation, precision)
 
     def geometry(self):
-        x = self.point.x() + self.length * cos((90-self.observation)*pi/180)
-        y = self.point.y() + self.length * sin((90-self.observation)*pi/180)
-        return QgsGeometry().fromPolyline([self.point, QgsPoint(x, y)])
+        return polylineGeometry(ray(self.point, self.observation, self.length))
@@ -27,29 +27,11 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QgsPoint, QgsGeometry
-from math import pi, cos, sin, sqrt
+from ..engine import shapes
 
+from qgisadapter import polylineGeometry
 
-class OrientationLine():
-    def __init__(self, line, point):
-        if len(line) != 2:
-            raise NameError("line must be a vector of 2 QgsPoint")
-        self.orientation = line[0].azimuth(line[1]) * pi/180
-        self.origin = line[0]
-        self.point = point
-
-    def setPoint(self, point):
-        self.point = point
 
+class OrientationLine(shapes.OrientationLine):
     def geometry(self):
-        a = -self.orientation + pi/180*self.origin.azimuth(self.point)
-        d = sqrt(self.origin.sqrDist(self.point)) * cos(a)
-        if d == 0:
-            d = 1
-        P = QgsPoint(self.origin.x() + d * sin(self.orientation),
-                     self.origin.y() + d * cos(self.orientation))
-        return QgsGeometry().fromPolyline([self.origin, P])
-
-
-
+        return polylineGeometry(self.points())
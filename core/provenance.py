@@ -0,0 +1,112 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from PyQt4.QtCore import QFileInfo
+from qgis.core import QgsProject
+
+from ..engine.provenance import ProvenanceGraph
+
+from dimensions import linkDimensions
+
+# graph of the current project, loaded when first needed
+_graph = None
+_graphPath = None
+
+
+def provenancePath():
+    # the graph is saved next to the project: myproject_intersectit.provenance.json
+    # returns None if the project has not been saved yet
+    projectFile = QgsProject.instance().fileName()
+    if not projectFile:
+        return None
+    info = QFileInfo(projectFile)
+    return "%s/%s_intersectit.provenance.json" % (info.absolutePath(), info.completeBaseName())
+
+
+def provenanceGraph():
+    global _graph, _graphPath
+    path = provenancePath()
+    if _graph is None or path != _graphPath:
+        if _graph is not None and _graphPath is None and len(_graph):
+            # the project has just been saved: keep the intersections done so far
+            _graphPath = path
+            saveProvenance()
+        else:
+            try:
+                _graph = ProvenanceGraph.load(path)
+            except (IOError, OSError, ValueError):
+                _graph = ProvenanceGraph()
+            _graphPath = path
+    return _graph
+
+
+def saveProvenance():
+    # the graph is only kept in memory until the project is saved
+    if _graph is None or _graphPath is None:
+        return
+    try:
+        _graph.save(_graphPath)
+    except (IOError, OSError):
+        pass
+
+
+def recordIntersection(solution, point, observations, dimensions):
+    # solution: QgsPoint, point: (layer id, feature id) or None
+    # dimensions: {observation id: (layer id, feature id)}
+    return recordIntersections([(solution, point, observations, dimensions)])[0]
+
+
+def recordIntersections(intersections):
+    # intersections: list of (solution, point, observations, dimensions), the graph is saved once
+    graph = provenanceGraph()
+    pointIds = [graph.addPoint((solution.x(), solution.y()), point, observations, dimensions)
+                for solution, point, observations, dimensions in intersections]
+    saveProvenance()
+    return pointIds
+
+
+class PendingIntersection():
+    # an intersection whose point and dimensions are still in a write buffer,
+    # it is recorded once the ids of the written features are known
+    def __init__(self, solution, observations):
+        self.solution = solution
+        self.observations = observations
+        self.point = None
+        self.dimensions = [{}]
+
+    def pointWritten(self, layer, features):
+        if len(features):
+            self.point = (layer.id(), features[0].id())
+
+    def dimensionsWritten(self, layer, keys, features):
+        linkDimensions(self.dimensions, layer, keys, features)
+
+    def record(self):
+        recordIntersection(self.solution, self.point, self.observations, self.dimensions[0])
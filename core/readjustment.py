@@ -0,0 +1,170 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from PyQt4.QtCore import QObject, QThread, QTimer, pyqtSignal
+from qgis.core import QgsGeometry, QgsMapLayerRegistry, QgsPoint
+from qgis.gui import QgsMessageBar
+
+from mysettings import MySettings
+from memorylayers import observationsById
+from provenance import provenanceGraph, saveProvenance
+from dimensions import writeDimensionsMany, deleteDimensions
+from solver import intersect
+from reports import reportValue
+
+# running re-adjustments, referenced until they are applied
+_running = []
+
+
+class ReadjustmentThread(QThread):
+    # adjusts a batch of points outside of the GUI thread
+    def __init__(self, groups, maxIter, threshold):
+        # groups: list of (point id, observations, initial point)
+        QThread.__init__(self)
+        self.groups = groups
+        self.maxIter = maxIter
+        self.threshold = threshold
+        self.results = []
+
+    def run(self):
+        for pointId, observations, initPoint in self.groups:
+            intersection = None
+            if len(observations) >= 2:
+                try:
+                    intersection = intersect(observations, initPoint, self.maxIter, self.threshold)
+                except Exception:
+                    intersection = None
+            self.results.append((pointId, observations, intersection))
+
+
+class Readjustment(QObject):
+    # adjusts again the points using edited or deleted observations, and regenerates their dimensions
+    done = pyqtSignal()
+
+    def __init__(self, iface, editedIds, deletedIds):
+        QObject.__init__(self)
+        self.iface = iface
+        self.settings = MySettings()
+        self.thread = None
+        graph = provenanceGraph()
+        deletedIds = set(deletedIds)
+        pointIds = graph.affectedPoints(set(editedIds) | deletedIds)
+        if len(pointIds) == 0:
+            return
+        # values of the edited observations, as committed in the line layer
+        current = observationsById(editedIds)
+        groups = []
+        for pointId in pointIds:
+            observations = [current.get(obs["id"], obs) for obs in graph.observationsOf(pointId)
+                            if obs["id"] not in deletedIds]
+            solution = graph.points[pointId]["solution"]
+            groups.append((pointId, observations, QgsPoint(solution[0], solution[1])))
+        self.thread = ReadjustmentThread(groups, self.settings.value("advancedIntersecLSmaxIteration"),
+                                         self.settings.value("advancedIntersecLSconvergeThreshold"))
+        self.thread.finished.connect(self.apply)
+
+    def start(self):
+        if self.thread is None:
+            self.done.emit()
+            return
+        self.thread.start()
+
+    def apply(self):
+        # back in the GUI thread: move the points and regenerate their dimensions, with one write per layer
+        graph = provenanceGraph()
+        writeReport = self.settings.value("advancedIntersectionWriteReport")
+        reportField = self.settings.value("reportField")
+        adjusted = 0
+        failed = 0
+        updated = []
+        moves = {}
+        oldDimensions = {}
+        for pointId, observations, intersection in self.thread.results:
+            node = graph.points.get(pointId)
+            if node is None:
+                continue
+            if intersection is not None and intersection.solution is not None:
+                solution = intersection.solution
+                adjusted += 1
+                if node["point"] is not None:
+                    layerId, fid = node["point"]
+                    moves.setdefault(layerId, []).append((fid, solution, reportValue(intersection, observations)))
+            else:
+                # not enough observations left: the point stays, its dimensions follow the observations
+                solution = QgsPoint(node["solution"][0], node["solution"][1])
+                failed += 1
+            for obsId, dimension in node["dimensions"].items():
+                oldDimensions[(pointId, obsId)] = dimension
+            updated.append((pointId, solution, observations))
+        for layerId, layerMoves in moves.items():
+            self.movePoints(layerId, layerMoves, reportField if writeReport else None)
+        deleteDimensions(oldDimensions)
+        dimensions = writeDimensionsMany(self.iface, [(solution, observations)
+                                                      for pointId, solution, observations in updated])
+        for (pointId, solution, observations), pointDimensions in zip(updated, dimensions):
+            graph.update(pointId, (solution.x(), solution.y()), observations, pointDimensions)
+        saveProvenance()
+        self.iface.mapCanvas().refresh()
+        if adjusted:
+            self.iface.messageBar().pushMessage("Intersect It", "%u intersections adjusted again." % adjusted,
+                                                QgsMessageBar.INFO, 3)
+        if failed:
+            self.iface.messageBar().pushMessage("Intersect It", "%u intersections could not be adjusted again"
+                                                                " with the remaining observations." % failed,
+                                                QgsMessageBar.WARNING, 5)
+        self.done.emit()
+
+    def movePoints(self, layerId, moves, reportField):
+        # moves: list of (feature id, solution, report), the report is written if reportField is given
+        layer = QgsMapLayerRegistry.instance().mapLayer(layerId)
+        if layer is None:
+            return
+        layer.dataProvider().changeGeometryValues(dict((fid, QgsGeometry().fromPoint(solution))
+                                                       for fid, solution, report in moves))
+        if reportField is not None:
+            idx = layer.dataProvider().fieldNameIndex(reportField)
+            if idx != -1:
+                layer.dataProvider().changeAttributeValues(dict((fid, {idx: report})
+                                                                for fid, solution, report in moves))
+        layer.updateExtents()
+
+
+def readjust(iface, editedIds, deletedIds):
+    readjustment = Readjustment(iface, editedIds, deletedIds)
+    _running.append(readjustment)
+    readjustment.done.connect(lambda: _running.remove(readjustment))
+    readjustment.start()
+
+
+def readjustLater(iface, editedIds, deletedIds):
+    # called before the changes of the line layer are committed: adjust once they are
+    if not MySettings().value("advancedIntersectionReadjust") or len(editedIds) + len(deletedIds) == 0:
+        return
+    QTimer.singleShot(0, lambda: readjust(iface, editedIds, deletedIds))
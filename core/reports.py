@@ -0,0 +1,63 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from mysettings import MySettings
+from provenance import provenanceGraph
+from memorylayers import observationsById
+from ..engine.report import reportRecord, encodeRecord, decodeRecord, formatRecord
+
+
+def reportValue(intersection, observations):
+    # value written in the report field: the text report, or its compact record (see settings)
+    reportFormat = MySettings().value("advancedIntersectionReportFormat")
+    if reportFormat == "text":
+        return intersection.report
+    record = reportRecord(intersection, [obs["id"] for obs in observations])
+    return encodeRecord(record, reportFormat == "compressed")
+
+
+def findObservations(obsIds):
+    # observations by id, from the provenance graph or else the construction layer
+    graph = provenanceGraph()
+    observations = {}
+    for obsId in obsIds:
+        obs = graph.observation(obsId)
+        if obs is not None:
+            observations[obsId] = obs
+    observations.update(observationsById([obsId for obsId in obsIds if obsId not in observations]))
+    return observations
+
+
+def readReport(value):
+    # human-readable report of a report field value (text or record)
+    record = decodeRecord(value)
+    if record is None:
+        return value
+    return formatRecord(record, findObservations(record["observations"]))
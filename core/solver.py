@@ -0,0 +1,46 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from copy import copy
+
+from ..engine import solver
+from ..engine.solutioncache import solutions
+
+from qgisadapter import toPoint, toQgsPoint
+
+
+def intersect(observations, initPoint, maxIter, threshold, isCancelled=None, gridSearchBudget=None):
+    # QGIS adapter of the engine solver: takes and returns QgsPoint
+    # least-squares results are cached and shared by all the dialogs and threads,
+    # so the QgsPoint is set on a copy and the cached result is left untouched
+    intersection = copy(solver.intersect(observations, toPoint(initPoint), maxIter, threshold, isCancelled,
+                                         solutions, gridSearchBudget))
+    if intersection.solution is not None:
+        intersection.solution = toQgsPoint(intersection.solution)
+    return intersection
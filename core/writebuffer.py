@@ -0,0 +1,116 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from collections import OrderedDict
+
+from PyQt4.QtCore import QTimer
+from qgis.core import QgsMapLayerRegistry
+from qgis.gui import QgsMessageBar
+
+from mysettings import MySettings
+
+
+class WriteBuffer():
+    # write-behind buffer of the features written by the map tools:
+    # features are grouped per layer and written with one transaction per layer when the buffer is flushed
+    # (after a delay without new features, or when the tool is deactivated), followed by a single refresh
+    def __init__(self, iface):
+        self.iface = iface
+        self.mapCanvas = iface.mapCanvas()
+        # layer id -> [edit buffer, features, [(number of features, callback)]]
+        self.pending = OrderedDict()
+        self.flushCallbacks = []
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def __len__(self):
+        return sum(len(entry[1]) for entry in self.pending.values())
+
+    def add(self, layer, features, callback=None, editBuffer=False):
+        # callback: called on flush with the written features (having their ids)
+        # editBuffer: features are added to the edit buffer of the layer instead of its data provider,
+        #             they are flushed before the layer edits are saved
+        if editBuffer and layer.id() not in self.pending:
+            layer.beforeCommitChanges.connect(self.flush)
+        entry = self.pending.setdefault(layer.id(), [editBuffer, [], []])
+        entry[1].extend(features)
+        entry[2].append((len(features), callback))
+        self.schedule()
+
+    def whenFlushed(self, callback):
+        # called once all the pending features have been written
+        self.flushCallbacks.append(callback)
+        self.schedule()
+
+    def schedule(self):
+        delay = MySettings().value("writeBufferDelay")
+        if delay <= 0:
+            self.flush()
+        else:
+            self.timer.start(delay)
+
+    def flush(self):
+        self.timer.stop()
+        if len(self.pending) == 0 and len(self.flushCallbacks) == 0:
+            return
+        pending = self.pending
+        flushCallbacks = self.flushCallbacks
+        self.pending = OrderedDict()
+        self.flushCallbacks = []
+        for layerId, (editBuffer, features, callbacks) in pending.items():
+            layer = QgsMapLayerRegistry.instance().mapLayer(layerId)
+            if layer is None:
+                continue
+            if editBuffer:
+                layer.beforeCommitChanges.disconnect(self.flush)
+                if not layer.isEditable():
+                    self.iface.messageBar().pushMessage("Intersect It",
+                                                        "%u features could not be written, the layer %s is not"
+                                                        " editable anymore." % (len(features), layer.name()),
+                                                        QgsMessageBar.WARNING, 5)
+                    continue
+                layer.editBuffer().addFeatures(features)
+                ok, written = True, features
+            else:
+                ok, written = layer.dataProvider().addFeatures(features)
+                layer.updateExtents()
+            if not ok:
+                self.iface.messageBar().pushMessage("Intersect It", "Could not write the features in %s" %
+                                                    layer.name(), QgsMessageBar.CRITICAL)
+                continue
+            start = 0
+            for count, callback in callbacks:
+                if callback is not None:
+                    callback(written[start:start+count])
+                start += count
+        for callback in flushCallbacks:
+            callback()
+        self.mapCanvas.refresh()
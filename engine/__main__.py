@@ -0,0 +1,148 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Command-line batch adjustment, runs without QGIS:
+#
+#   python -m intersectit.engine observations.csv -o solutions.csv --workers 4
+#
+# The input CSV has the columns group,type,x,y,observation,precision, one row per observation.
+# A row of type "init" gives the initial position (x,y) of its group,
+# otherwise the centroid of the group stations is used.
+# The output CSV has the columns group,x,y,sigma,iterations.
+# With --calibrate, the variance components of distances and orientations are estimated over
+# all the groups instead, and the calibrated default precisions are printed.
+
+from __future__ import print_function
+
+import argparse
+import csv
+import sys
+
+from .batchadjustment import BatchAdjustment
+from . import telemetry
+
+
+def readGroups(inputFile):
+    groups = {}
+    initPoints = {}
+    order = []
+    for row in csv.DictReader(inputFile):
+        group = row["group"]
+        if group not in groups:
+            groups[group] = []
+            order.append(group)
+        if row["type"] == "init":
+            initPoints[group] = (float(row["x"]), float(row["y"]))
+            continue
+        groups[group].append({"type": row["type"], "x": float(row["x"]), "y": float(row["y"]),
+                              "observation": float(row["observation"]), "precision": float(row["precision"])})
+    for group in order:
+        if group not in initPoints and len(groups[group]) > 0:
+            n = float(len(groups[group]))
+            initPoints[group] = (sum(obs["x"] for obs in groups[group]) / n,
+                                 sum(obs["y"] for obs in groups[group]) / n)
+    order = [group for group in order if group in initPoints]
+    return order, [groups[group] for group in order], [initPoints[group] for group in order]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m intersectit.engine",
+                                     description="Adjust groups of observations (distances and orientations).")
+    parser.add_argument("input", help="CSV file with columns group,type,x,y,observation,precision")
+    parser.add_argument("-o", "--output", help="output CSV file (default: standard output)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: CPU count)")
+    parser.add_argument("--max-iterations", type=int, default=15)
+    parser.add_argument("--threshold", type=float, default=.0005, help="convergence threshold")
+    parser.add_argument("--throughput", default=None,
+                        help="comma separated worker counts, report points per second instead of adjusting")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="estimate the variance components of distances and orientations instead of adjusting")
+    parser.add_argument("--distance-precision", type=float, default=.025,
+                        help="default precision of distances to calibrate (default: %(default)s)")
+    parser.add_argument("--orientation-precision", type=float, default=.5,
+                        help="default precision of orientations to calibrate (default: %(default)s)")
+    parser.add_argument("--grid-search", type=float, default=None, metavar="MS",
+                        help="search the initial point of each group on a grid, with this time budget in ms")
+    parser.add_argument("--telemetry", default=None,
+                        help="CSV file receiving the telemetry of each least-squares solve, a summary is printed")
+    args = parser.parse_args(argv)
+
+    with open(args.input) as inputFile:
+        names, groups, initPoints = readGroups(inputFile)
+    gridSearchBudget = args.grid_search / 1000. if args.grid_search else None
+    batch = BatchAdjustment(groups, initPoints, args.max_iterations, args.threshold, gridSearchBudget)
+
+    if args.throughput is not None:
+        workerCounts = [int(n) for n in args.throughput.split(",")]
+        for workers, pointsPerSecond in batch.throughput(workerCounts):
+            print("%3u workers: %10.1f points/s" % (workers, pointsPerSecond))
+        return 0
+
+    if args.calibrate:
+        varianceComponents = batch.calibrate(args.workers)
+        print(varianceComponents.report())
+        print("calibrated precision of distances:    %.4f" %
+              varianceComponents.calibrated("distance", args.distance_precision))
+        print("calibrated precision of orientations: %.4f" %
+              varianceComponents.calibrated("orientation", args.orientation_precision))
+        return 0 if varianceComponents.converged else 1
+
+    if args.telemetry is not None:
+        telemetry.session = telemetry.TelemetryLog(max(len(batch), 1))
+    results = batch.run(args.workers)
+    outputFile = open(args.output, "w") if args.output else sys.stdout
+    try:
+        writer = csv.writer(outputFile)
+        writer.writerow(("group", "x", "y", "sigma", "iterations"))
+        for name, result in zip(names, results):
+            writer.writerow((name, "%.4f" % result["x"], "%.4f" % result["y"], "%.4f" % result["sigma"],
+                             result["iterations"]))
+    finally:
+        if outputFile is not sys.stdout:
+            outputFile.close()
+    if args.telemetry is not None:
+        telemetry.session.exportCsv(args.telemetry)
+        printSummary(telemetry.session.summary())
+    return 0
+
+
+def printSummary(summary):
+    print("%-12s %7s %9s %7s %9s %8s %11s %11s" % ("geometry", "solves", "converged", "failed", "mean iter",
+                                                   "max iter", "median cond", "mean sigma"), file=sys.stderr)
+    for name in sorted(summary, key=lambda name: (name != "all", name)):
+        s = summary[name]
+        print("%-12s %7u %9u %7u %9.2f %8u %11.3g %11s" % (name, s["solves"], s["converged"],
+                                                        s["solves"] - s["converged"], s["meanIterations"],
+                                                        s["maxIterations"], s["medianCondition"] or 0,
+                                                        "%.3f" % s["meanSigma"] if s["meanSigma"] is not None else "-"),
+              file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
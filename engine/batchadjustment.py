@@ -0,0 +1,153 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from time import time
+import multiprocessing
+import numpy as np
+
+from .point import Point
+from .observations import packGroups
+from .solver import intersect
+from .variancecomponents import VarianceComponents
+from . import telemetry
+
+resultDtype = [("x", "f8"), ("y", "f8"), ("sigma", "f8"), ("iterations", "i4")]
+
+
+def adjustChunk(chunk, normals=None):
+    # worker: adjust the groups of a chunk, returns a packed array of results
+    # normals: if given, the normal equations of the least-squares solutions are appended to it
+    observations, offsets, initPoints, maxIter, threshold, gridSearchBudget = chunk
+    results = np.zeros(len(initPoints), dtype=resultDtype)
+    results["x"] = np.nan
+    results["y"] = np.nan
+    results["sigma"] = np.nan
+    for i in range(len(initPoints)):
+        group = observations[offsets[i]:offsets[i+1]]
+        if len(group) < 2:
+            continue
+        initPoint = Point(initPoints[i][0], initPoints[i][1])
+        intersection = intersect(group, initPoint, maxIter, threshold, gridSearchBudget=gridSearchBudget)
+        if intersection.solution is None:
+            continue
+        results["x"][i] = intersection.solution.x()
+        results["y"][i] = intersection.solution.y()
+        if getattr(intersection, "sigma", None) is not None:
+            results["sigma"][i] = intersection.sigma
+        results["iterations"][i] = getattr(intersection, "iterations", 0)
+        if normals is not None and getattr(intersection, "normals", None) is not None:
+            normals.append(intersection.normals)
+    return results
+
+
+def chunkNormals(chunk):
+    # worker: only the normal equations are sent back
+    normals = []
+    adjustChunk(chunk, normals)
+    return normals
+
+
+def adjustChunkWithTelemetry(chunk):
+    # worker running in another process: its telemetry is sent back with the results
+    telemetry.session.clear()
+    results = adjustChunk(chunk)
+    return results, telemetry.session.records()
+
+
+class BatchAdjustment():
+    def __init__(self, groups, initPoints, maxIter, threshold, gridSearchBudget=None):
+        # groups: list of observation lists (dicts or packed rows), one per point to adjust
+        # initPoints: initial position of each point, as points or (x, y) tuples
+        # gridSearchBudget: time budget (seconds) of a global search of the initial point of each group
+        self.observations, self.offsets = packGroups(groups)
+        self.initPoints = np.array([(p.x(), p.y()) if hasattr(p, "x") else (p[0], p[1])
+                                    for p in initPoints], dtype=np.float64)
+        self.maxIter = maxIter
+        self.threshold = threshold
+        self.gridSearchBudget = gridSearchBudget
+
+    def __len__(self):
+        return len(self.initPoints)
+
+    def chunks(self, nChunks):
+        # contiguous chunks of groups, offsets are rebased on the chunk
+        nGroups = len(self)
+        bounds = np.linspace(0, nGroups, nChunks+1).astype(np.int64)
+        chunks = []
+        for c in range(nChunks):
+            g1, g2 = bounds[c], bounds[c+1]
+            if g1 == g2:
+                continue
+            o1, o2 = self.offsets[g1], self.offsets[g2]
+            chunks.append((self.observations[o1:o2], self.offsets[g1:g2+1] - o1, self.initPoints[g1:g2],
+                           self.maxIter, self.threshold, self.gridSearchBudget))
+        return chunks
+
+    def run(self, workers=None):
+        # returns a packed array of results, in the same order as the groups
+        # workers defaults to the number of CPUs, 1 runs in the current process
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers <= 1 or len(self) < 2:
+            return adjustChunk(self.chunks(1)[0]) if len(self) else np.zeros(0, dtype=resultDtype)
+        # several chunks per worker to balance the load, map keeps the order of the chunks
+        pool = multiprocessing.Pool(workers)
+        try:
+            chunkResults = pool.map(adjustChunkWithTelemetry, self.chunks(4*workers))
+        finally:
+            pool.close()
+            pool.join()
+        for results, solves in chunkResults:
+            telemetry.session.extend(solves)
+        return np.concatenate([results for results, solves in chunkResults])
+
+    def calibrate(self, workers=None):
+        # variance components of distances and orientations over all the groups
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers <= 1 or len(self) < 2:
+            normals = chunkNormals(self.chunks(1)[0]) if len(self) else []
+        else:
+            pool = multiprocessing.Pool(workers)
+            try:
+                normals = sum(pool.map(chunkNormals, self.chunks(4*workers)), [])
+            finally:
+                pool.close()
+                pool.join()
+        return VarianceComponents(normals)
+
+    def throughput(self, workerCounts=(1, 2, 4, 8)):
+        # returns a list of (workers, points per second)
+        report = []
+        for workers in workerCounts:
+            start = time()
+            self.run(workers)
+            elapsed = time() - start
+            report.append((workers, len(self) / elapsed if elapsed > 0 else float("inf")))
+        return report
@@ -0,0 +1,200 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+# Clustering of observations by their mutual intersection candidates, for the batch advanced intersection.
+#
+# Every pair of observations gives its candidate intersections (two for circles, one for orientations).
+# Around a target measured by k observations, the k(k-1)/2 candidates coincide, while the intersections
+# of unrelated observations are scattered: candidates are binned on a grid of the tolerance size and the
+# cells gathering the most observations claim them first.
+
+from math import sqrt, sin, cos, pi
+
+import numpy as np
+
+from .observations import packObservations
+
+deg2rad = pi/180
+
+
+def circleCircle(x1, y1, r1, x2, y2, r2):
+    d2 = (x2-x1)**2 + (y2-y1)**2
+    if d2 == 0:
+        return []
+    d = sqrt(d2)
+    if d > r1+r2 or d < abs(r1-r2):
+        return []
+    a = (r1*r1 - r2*r2 + d2) / (2*d)
+    h = sqrt(max(r1*r1 - a*a, 0))
+    xm = x1 + a*(x2-x1)/d
+    ym = y1 + a*(y2-y1)/d
+    return [(xm + h*(y2-y1)/d, ym - h*(x2-x1)/d), (xm - h*(y2-y1)/d, ym + h*(x2-x1)/d)]
+
+
+def rayRay(x1, y1, az1, x2, y2, az2, reach):
+    s1, c1 = sin(az1*deg2rad), cos(az1*deg2rad)
+    s2, c2 = sin(az2*deg2rad), cos(az2*deg2rad)
+    det = s2*c1 - s1*c2
+    if abs(det) < 1e-9:
+        return []
+    # x1 + k.s1 = x2 + l.s2, y1 + k.c1 = y2 + l.c2
+    k = (s2*(y2-y1) - c2*(x2-x1)) / det
+    l = (s1*(y2-y1) - c1*(x2-x1)) / det
+    if not 0 <= k <= reach or not 0 <= l <= reach:
+        return []
+    return [(x1 + k*s1, y1 + k*c1)]
+
+
+def circleRay(x1, y1, r, x2, y2, az, reach):
+    s, c = sin(az*deg2rad), cos(az*deg2rad)
+    dx = x1-x2
+    dy = y1-y2
+    b = -2*(dx*s + dy*c)
+    delta = b*b - 4*(dx*dx + dy*dy - r*r)
+    if delta < 0:
+        return []
+    points = []
+    for k in ((-b + sqrt(delta)) / 2, (-b - sqrt(delta)) / 2):
+        if 0 <= k <= reach:
+            points.append((x2 + k*s, y2 + k*c))
+    return points
+
+
+def pairCandidates(a, b, reach):
+    if a["type"] == "distance" and b["type"] == "distance":
+        return circleCircle(a["x"], a["y"], a["observation"], b["x"], b["y"], b["observation"])
+    if a["type"] == "orientation" and b["type"] == "orientation":
+        return rayRay(a["x"], a["y"], a["observation"], b["x"], b["y"], b["observation"], reach)
+    if a["type"] == "orientation":
+        a, b = b, a
+    return circleRay(a["x"], a["y"], a["observation"], b["x"], b["y"], b["observation"], reach)
+
+
+def offset(observation, x, y):
+    # distance from the point to the circle, or to the half-line, of the observation
+    dx = x - observation["x"]
+    dy = y - observation["y"]
+    if observation["type"] == "distance":
+        return abs(sqrt(dx*dx + dy*dy) - observation["observation"])
+    s, c = sin(observation["observation"]*deg2rad), cos(observation["observation"]*deg2rad)
+    if dx*s + dy*c < 0:
+        return sqrt(dx*dx + dy*dy)
+    return abs(dx*c - dy*s)
+
+
+def candidates(observations, reach):
+    # intersection candidates of all the pairs of observations whose extents overlap
+    # reach: length of the orientations
+    # returns arrays x, y and the indexes i, j of the intersected observations
+    observations = packObservations(observations)
+    isDistance = observations["type"] == "distance"
+    extent = np.where(isDistance, observations["observation"], reach)
+    xmin = observations["x"] - extent
+    xmax = observations["x"] + extent
+    ymin = observations["y"] - extent
+    ymax = observations["y"] + extent
+    # sweep along x: only the pairs with overlapping extents are intersected
+    order = np.argsort(xmin)
+    sortedXmin = xmin[order]
+    xs, ys, ii, jj = [], [], [], []
+    for n, i in enumerate(order):
+        end = np.searchsorted(sortedXmin, xmax[i], side="right")
+        others = order[n+1:end]
+        others = others[(ymin[others] <= ymax[i]) & (ymax[others] >= ymin[i])]
+        for j in others:
+            for x, y in pairCandidates(observations[i], observations[j], reach):
+                xs.append(x)
+                ys.append(y)
+                ii.append(i)
+                jj.append(j)
+    return np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64), \
+        np.array(ii, dtype=np.int64), np.array(jj, dtype=np.int64)
+
+
+def clusterObservations(observations, tolerance, reach, minObservations=3):
+    # returns a list of (observation indexes, seed point) for the clusters of at least minObservations
+    # every observation belongs to one cluster at most
+    x, y, ii, jj = candidates(observations, reach)
+    if len(x) == 0:
+        return []
+    cells = {}
+    cx = np.floor(x / tolerance).astype(np.int64)
+    cy = np.floor(y / tolerance).astype(np.int64)
+    for n in range(len(x)):
+        cells.setdefault((cx[n], cy[n]), []).append(n)
+
+    def neighbourhood(cell):
+        # the candidates of a target may fall in adjacent cells
+        members = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                members.extend(cells.get((cell[0]+dx, cell[1]+dy), ()))
+        return members
+
+    scores = []
+    for cell in cells:
+        members = neighbourhood(cell)
+        scores.append((len(set(ii[members]) | set(jj[members])), len(members), cell))
+    scores.sort(reverse=True)
+
+    observations = packObservations(observations)
+    assigned = np.zeros(len(observations), dtype=bool)
+    minPartners = max(2, minObservations - 1)
+    clusters = []
+    for score, count, cell in scores:
+        if score < minObservations:
+            break
+        members = [n for n in neighbourhood(cell) if not assigned[ii[n]] and not assigned[jj[n]]]
+        while len(members):
+            # an unrelated observation crossing near the target only meets some of its observations there:
+            # keep the observations intersecting all the others of a cluster of minObservations
+            partners = {}
+            for n in members:
+                partners.setdefault(ii[n], set()).add(jj[n])
+                partners.setdefault(jj[n], set()).add(ii[n])
+            kept = [n for n in members
+                    if len(partners[ii[n]]) >= minPartners and len(partners[jj[n]]) >= minPartners]
+            # one crossing close to the target meets all of them, but it does not pass through the seed:
+            # drop the observations farther than half the tolerance from it
+            if len(kept):
+                seedX, seedY = np.median(x[kept]), np.median(y[kept])
+                far = set(i for i in set(ii[kept]) | set(jj[kept])
+                          if offset(observations[i], seedX, seedY) > tolerance/2)
+                kept = [n for n in kept if ii[n] not in far and jj[n] not in far]
+            if len(kept) == len(members):
+                break
+            members = kept
+        indexes = sorted(set(ii[members]) | set(jj[members]))
+        if len(indexes) < minObservations:
+            continue
+        assigned[indexes] = True
+        seed = (float(np.median(x[members])), float(np.median(y[members])))
+        clusters.append((np.array(indexes, dtype=np.int64), seed))
+    return clusters
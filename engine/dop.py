@@ -0,0 +1,86 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Dilution of precision of an intersection from a set of stations.
+#
+# For every cell of a grid, the design matrix of the observations which could be measured from the stations
+# (distances and/or orientations) gives the normal matrix N = A' P A, the expected precision of the position
+# being sqrt(trace(N^-1)). Everything is computed for the whole grid at once,
+# the contributions of the stations being accumulated by chunks.
+
+import numpy as np
+
+deg2rad = np.pi/180
+# maximum number of elements of the (ny, nx, stations) arrays
+chunkCells = 2**20
+
+
+def addStations(n00, n01, n11, stations, xs, ys, distances, orientations, distancePrecision, orientationPrecision):
+    # add the contribution of the stations to the normal matrices of the grid (in place)
+    dx = xs[np.newaxis, :, np.newaxis] - stations[:, 0]
+    dy = ys[:, np.newaxis, np.newaxis] - stations[:, 1]
+    r2 = dx**2 + dy**2
+    r2[r2 == 0] = np.nan
+    if distances:
+        # d(r)/d(x,y) = (dx, dy) / r
+        w = 1. / distancePrecision**2
+        n00 += w * np.nansum(dx**2 / r2, axis=2)
+        n01 += w * np.nansum(dx*dy / r2, axis=2)
+        n11 += w * np.nansum(dy**2 / r2, axis=2)
+    if orientations:
+        # d(azimuth)/d(x,y) = (dy, -dx) / r^2 (radians)
+        w = 1. / (orientationPrecision*deg2rad)**2
+        n00 += w * np.nansum(dy**2 / r2**2, axis=2)
+        n01 -= w * np.nansum(dx*dy / r2**2, axis=2)
+        n11 += w * np.nansum(dx**2 / r2**2, axis=2)
+
+
+def dopSurface(stations, xmin, ymin, xmax, ymax, nx, ny, distances=True, orientations=True,
+               distancePrecision=.025, orientationPrecision=.5):
+    # stations: array of shape (n, 2) or list of (x, y)
+    # precisions in map units and degrees
+    # returns a ny x nx array (row 0 at ymax) of the expected position precision in map units,
+    # inf where the geometry does not allow an intersection
+    stations = np.asarray(stations, dtype=np.float64).reshape(-1, 2)
+    xs = np.linspace(xmin, xmax, nx)
+    ys = np.linspace(ymax, ymin, ny)
+    n00 = np.zeros((ny, nx))
+    n01 = np.zeros((ny, nx))
+    n11 = np.zeros((ny, nx))
+    # the stations are taken by chunks to keep the temporary arrays under chunkCells elements
+    chunk = max(1, chunkCells // (nx*ny))
+    for start in range(0, len(stations), chunk):
+        addStations(n00, n01, n11, stations[start:start+chunk], xs, ys, distances, orientations,
+                    distancePrecision, orientationPrecision)
+    det = n00*n11 - n01**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dop = np.sqrt((n00 + n11) / det)
+    # a (nearly) singular normal matrix means no intersection
+    dop[~np.isfinite(dop) | (det <= 1e-12 * (n00 + n11)**2)] = np.inf
+    return dop
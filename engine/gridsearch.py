@@ -0,0 +1,113 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Coarse-to-fine search of the global minimum of the weighted misclosures,
+# used to find a starting point for the adjustment in configurations with several basins
+# (nearly tangent circles, nearly parallel orientations).
+
+from time import time
+
+import numpy as np
+
+from .point import Point
+from .observations import packObservations
+from .uncertainty import misclosureSurface
+
+# cells per side of each grid
+gridSize = 32
+# number of candidates refined at each level
+candidates = 3
+# minima whose chi-square differ by less than this (absolute, relative) are equivalent
+ambiguity = (4., .1)
+
+
+def searchWindow(observations):
+    # window containing the stations and the circles, orientations are given the size of the station spread
+    x = observations["x"]
+    y = observations["y"]
+    isDistance = observations["type"] == "distance"
+    radius = observations["observation"][isDistance].max() if isDistance.any() else 0
+    spread = max(x.max() - x.min(), y.max() - y.min())
+    margin = max(radius, spread, 1.)
+    return x.min() - margin, y.min() - margin, x.max() + margin, y.max() + margin
+
+
+def startCell(observations, point):
+    # cell of the coarse grid containing the point: starts in the same cell lead to the same minimum
+    xmin, ymin, xmax, ymax = searchWindow(packObservations(observations))
+    return (int(np.floor((point.x() - xmin) / (xmax - xmin) * gridSize)),
+            int(np.floor((point.y() - ymin) / (ymax - ymin) * gridSize)))
+
+
+def distinctCells(cells, count):
+    # the best cells, at least 2 cells away from each other so that each candidate keeps its own basin
+    selected = []
+    for cell in sorted(cells, key=lambda cell: cell[0]):
+        cost, x, y, dx, dy = cell
+        if all(abs(x - other[1]) > 2*dx or abs(y - other[2]) > 2*dy for other in selected):
+            selected.append(cell)
+            if len(selected) == count:
+                break
+    return selected
+
+
+def gridSearch(observations, budget=.05, resolution=None, initPoint=None):
+    # returns the best point found within the time budget (seconds)
+    # the search stops earlier when the cells are smaller than resolution (map units)
+    # initPoint: among minima of nearly equal cost (e.g. mirrored solutions), the closest one is returned,
+    #            the solution cache keeps the results per startCell so that this choice follows the click
+    start = time()
+    observations = packObservations(observations)
+    if resolution is None:
+        resolution = observations["precision"][observations["type"] == "distance"].min() \
+            if (observations["type"] == "distance").any() else 1e-3
+    windows = [searchWindow(observations)]
+    while True:
+        # evaluate all windows of this level, keep the best cells as the next windows
+        cells = []
+        for xmin, ymin, xmax, ymax in windows:
+            cost = misclosureSurface(observations, xmin, ymin, xmax, ymax, gridSize, gridSize)
+            xs = np.linspace(xmin, xmax, gridSize)
+            ys = np.linspace(ymax, ymin, gridSize)
+            dx = (xmax - xmin) / (gridSize - 1)
+            dy = (ymax - ymin) / (gridSize - 1)
+            order = np.argsort(cost, axis=None)[:candidates]
+            for index in order:
+                r, c = np.unravel_index(index, cost.shape)
+                cells.append((cost[r, c], xs[c], ys[r], dx, dy))
+        cells = distinctCells(cells, candidates)
+        if time() - start > budget or max(cells[0][3], cells[0][4]) < resolution:
+            break
+        # refine around the candidates, the new window spans 2 cells on each side
+        windows = [(x - 2*dx, y - 2*dy, x + 2*dx, y + 2*dy) for cost, x, y, dx, dy in cells]
+    best = cells[0]
+    if initPoint is not None:
+        equivalent = [cell for cell in cells if cell[0] <= best[0] * (1 + ambiguity[1]) + ambiguity[0]]
+        best = min(equivalent, key=lambda cell: (cell[1] - initPoint.x())**2 + (cell[2] - initPoint.y())**2)
+    return Point(best[1], best[2])
@@ -0,0 +1,144 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Opt-in timing of the hot paths (snapping, fetching, intersections, adjustment, ...).
+# Timers and counters are aggregated in memory: count, total, min and max per name.
+# When disabled, a timed call only costs a check of a module flag.
+
+import csv
+import threading
+from time import time
+
+enabled = False
+statistics = {}
+lock = threading.Lock()
+
+
+def setEnabled(enable):
+    global enabled
+    enabled = bool(enable)
+
+
+def isEnabled():
+    return enabled
+
+
+def reset():
+    with lock:
+        statistics.clear()
+
+
+def record(name, elapsed):
+    # elapsed time in seconds
+    with lock:
+        stat = statistics.get(name)
+        if stat is None:
+            statistics[name] = [1, elapsed, elapsed, elapsed]
+        else:
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] = min(stat[2], elapsed)
+            stat[3] = max(stat[3], elapsed)
+
+
+def increment(name, n=1):
+    # counters have no timing
+    if not enabled:
+        return
+    with lock:
+        stat = statistics.setdefault(name, [0, None, None, None])
+        stat[0] += n
+
+
+class Timer():
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time()
+        return self
+
+    def __exit__(self, *args):
+        record(self.name, time() - self.start)
+        return False
+
+
+class NoTimer():
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+noTimer = NoTimer()
+
+
+def timing(name):
+    # context manager: with timing("snapping"): ...
+    if not enabled:
+        return noTimer
+    return Timer(name)
+
+
+def timed(name):
+    # decorator for functions and methods
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time() - start)
+        wrapper.__name__ = function.__name__
+        wrapper.__doc__ = function.__doc__
+        return wrapper
+    return decorator
+
+
+def rows():
+    # name, count, total [ms], mean [ms], min [ms], max [ms] (timings are None for counters)
+    with lock:
+        items = sorted(statistics.items())
+    result = []
+    for name, (count, total, minimum, maximum) in items:
+        if total is None:
+            result.append((name, count, None, None, None, None))
+        else:
+            result.append((name, count, 1000*total, 1000*total/count, 1000*minimum, 1000*maximum))
+    return result
+
+
+def exportCsv(path):
+    with open(path, "w") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "count", "total_ms", "mean_ms", "min_ms", "max_ms"))
+        for row in rows():
+            writer.writerow(["" if value is None else value for value in row])
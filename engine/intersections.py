@@ -28,7 +28,8 @@
 #---------------------------------------------------------------------
 
 from math import sqrt, fabs, pow, sin, cos, tan, pi
-from qgis.core import QgsPoint
+
+from .point import Point
 
 
 def closestPoint(point, pointList):
@@ -43,6 +44,7 @@ def closestPoint(point, pointList):
 class TwoCirclesIntersection():
     def __init__(self, observations, initPoint):
         self.intersection = None
+        self.solution = None
         # see http://www.mathpages.com/home/kmath396/kmath396.htm
         x1 = observations[0]["x"]
         y1 = observations[0]["y"]
@@ -68,8 +70,8 @@ class TwoCirclesIntersection():
         ya = ylt - yrt
         xb = xlt - xrt
         yb = ylt + yrt
-        P1 = QgsPoint(xa, ya)
-        P2 = QgsPoint(xb, yb)
+        P1 = Point(xa, ya)
+        P2 = Point(xb, yb)
         self.solution = closestPoint(initPoint, [P1, P2])
         self.report = "A solution using two distances has been found.\n\n"
         self.report += "         |       x       |       y       |   radius   |\n"
@@ -83,6 +85,7 @@ class TwoCirclesIntersection():
 class TwoOrientationIntersection():
     def __init__(self, observations):
         self.intersection = None
+        self.solution = None
 
         # x = x1+k*cos(90-a1) = x2+l*cos(90-a2)
         # y = y1+k*sin(90-a1) = y2+l*sin(90-a2)
@@ -108,7 +111,7 @@ class TwoOrientationIntersection():
         k = (x2-x1+(y1-y2)*tan(a2)) / (sin(a1)*(1-tan(a2)/tan(a1)))
         x = x1 + k * sin(a1)
         y = y1 + k * cos(a1)
-        self.solution = QgsPoint(x, y)
+        self.solution = Point(x, y)
         self.report = "A solution using two orientations has been found.\n\n"
         self.report += "              |       x       |       y       | azimut |\n"
         self.report += " ------------ | ------------- | ------------- | ------ |\n"
@@ -121,6 +124,7 @@ class TwoOrientationIntersection():
 class DistanceOrientationIntersection():
     def __init__(self, observations, initPoint):
         self.intersection = None
+        self.solution = None
         if observations[0]["type"] == "distance":
             distance = observations[0]
             orientation = observations[1]
@@ -162,8 +166,8 @@ class DistanceOrientationIntersection():
         y_1 = y2 + k_1*cos(az)
         x_2 = x2 + k_2*sin(az)
         y_2 = y2 + k_2*cos(az)
-        P1 = QgsPoint(x_1, y_1)
-        P2 = QgsPoint(x_2, y_2)
+        P1 = Point(x_1, y_1)
+        P2 = Point(x_2, y_2)
         self.solution = closestPoint(initPoint, [P1, P2])
         self.report = "A solution using an orientation and a distance has been found.\n\n"
         self.report += "          |       x       |       y       | observation |\n"
@@ -172,6 +176,3 @@ class DistanceOrientationIntersection():
         self.report += "Circle    | %13.3f | %13.3f |   %9.3f |\n" % (x1, y1, r)
         self.report += "--------- | ------------- | ------------- |\n"
         self.report += "Solution  | %13.3f | %13.3f |\n" % (self.solution.x(), self.solution.y())
-
-
-
@@ -0,0 +1,133 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Append-only journal of the observations.
+#
+# The file starts with a 16 bytes header followed by fixed-size records of 64 bytes:
+#   time (float64, seconds since epoch), id (20 bytes), operation (uint8), type (uint8), 2 reserved bytes,
+#   x, y, observation, precision (float64)
+# Records are only appended and flushed to disk at once, a record truncated by a crash is ignored.
+# Since records are appended in time order, a time window is found by binary search on the memory-mapped file.
+
+import os
+import struct
+from time import time
+
+import numpy as np
+
+magic = b"IITJ"
+version = 1
+headerFormat = "<4sHH8x"
+headerSize = struct.calcsize(headerFormat)
+recordFormat = "<d20sBB2x4d"
+recordSize = struct.calcsize(recordFormat)
+recordDtype = np.dtype([("time", "<f8"), ("id", "S20"), ("operation", "u1"), ("type", "u1"), ("reserved", "V2"),
+                        ("x", "<f8"), ("y", "<f8"), ("observation", "<f8"), ("precision", "<f8")])
+
+operations = ("create", "edit", "delete")
+observationTypes = ("distance", "orientation")
+
+
+class JournalError(Exception):
+    pass
+
+
+class Journal():
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(struct.pack(headerFormat, magic, version, recordSize))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with open(path, "rb") as f:
+                header = f.read(headerSize)
+            if len(header) < headerSize:
+                raise JournalError("%s is not an observation journal" % path)
+            fileMagic, fileVersion, fileRecordSize = struct.unpack(headerFormat, header)
+            if fileMagic != magic or fileRecordSize != recordSize:
+                raise JournalError("%s is not an observation journal" % path)
+            if fileVersion > version:
+                raise JournalError("%s has been written by a newer version (%u)" % (path, fileVersion))
+
+    def __len__(self):
+        # a partially written record at the end is ignored
+        return max(os.path.getsize(self.path) - headerSize, 0) // recordSize
+
+    def pack(self, operation, obsId, obsType, x, y, observation, precision, timestamp=None):
+        if not isinstance(obsId, bytes):
+            obsId = obsId.encode("ascii")
+        if timestamp is None:
+            timestamp = time()
+        return struct.pack(recordFormat, timestamp, obsId, operations.index(operation),
+                           observationTypes.index(obsType), x, y, observation, precision)
+
+    def append(self, operation, obsId, obsType, x, y, observation, precision, timestamp=None):
+        self.appendMany([(operation, obsId, obsType, x, y, observation, precision, timestamp)])
+
+    def appendMany(self, records):
+        # records: list of (operation, id, type, x, y, observation, precision[, timestamp])
+        data = b"".join([self.pack(*record) for record in records])
+        if not data:
+            return
+        with open(self.path, "r+b") as f:
+            # drop a record truncated by a previous crash so that the records stay aligned
+            f.seek(headerSize + len(self) * recordSize)
+            f.truncate()
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self):
+        # memory-mapped records (read-only), nothing is parsed until accessed
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=recordDtype)
+        return np.memmap(self.path, dtype=recordDtype, mode="r", offset=headerSize, shape=(n,))
+
+    def slice(self, start=None, end=None):
+        # records with start <= time < end
+        records = self.records()
+        times = records["time"]
+        i1 = 0 if start is None else np.searchsorted(times, start, side="left")
+        i2 = len(records) if end is None else np.searchsorted(times, end, side="left")
+        return np.array(records[i1:i2])
+
+    def replay(self):
+        # the current state: the last record of each observation which has not been deleted,
+        # in the order of their last operation
+        records = self.records()
+        if len(records) == 0:
+            return np.zeros(0, dtype=recordDtype)
+        n = len(records)
+        ids, firstReversed = np.unique(records["id"][::-1], return_index=True)
+        last = np.sort(n - 1 - firstReversed)
+        state = np.array(records[last])
+        return state[state["operation"] != operations.index("delete")]
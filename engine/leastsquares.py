@@ -0,0 +1,156 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from math import sqrt, pi
+from time import time
+import numpy as np
+from numpy import linalg as la
+
+from .point import Point
+from .observations import packObservations
+from .uncertainty import errorEllipse, confidence95
+from .variancecomponents import ComponentNormals, VarianceComponents
+from .report import solutionReport
+from . import instrumentation
+from . import telemetry
+
+deg2rad = pi/180
+
+
+class LeastSquares():
+    def __init__(self, observations, initPoint, maxIter, threshold, isCancelled=None):
+        self.solution = None
+        self.precision = None
+        self.sigma = None
+        self.normals = None
+        self.iterations = 0
+        observations = packObservations(observations)
+        nObs = len(observations)
+        # fixed points and observations
+        px = observations["x"]
+        py = observations["y"]
+        l = observations["observation"]
+        # stochastic model (diagonal)
+        Qll = observations["precision"]**2
+        isDistance = observations["type"] == "distance"
+        isOrientation = observations["type"] == "orientation"
+        self.telemetry = telemetry.SolveTelemetry(int(isDistance.sum()), int(isOrientation.sum()))
+        sinaz = np.sin(l*deg2rad)
+        cosaz = np.cos(l*deg2rad)
+        # initial parameters (position x,y)
+        x0 = np.array([float(initPoint.x()), float(initPoint.y())])
+        self.report = "Initial position: %13.3f %13.3f\n" % (x0[0], x0[1])
+        dx = np.array([2*threshold, 2*threshold])
+        it = 0
+        # adjustment main loop
+        # B is diagonal, so the weight matrix P = (B.Qll.B')^-1 is diagonal too and kept as a vector
+        while max(np.abs(dx)) > threshold:
+            iterationStart = time()
+            it += 1
+            self.iterations = min(it, maxIter)
+            if it > maxIter:
+                self.report += "\n!!! Maximum iterations reached (%u)" % (it-1)
+                self.finish("max iterations")
+                return
+            if isCancelled is not None and isCancelled():
+                self.report += "\n!!! Adjustment cancelled"
+                self.finish("cancelled")
+                return
+            A = np.zeros((nObs, 2))
+            B = np.zeros(nObs)
+            w = np.zeros(nObs)
+            # distance equation: (xc - px)^2 + (yc - py)^2 - r^2 = 0 (obs: r, param: xc,yc, fixed: px,py)
+            ddx = x0[0] - px[isDistance]
+            ddy = x0[1] - py[isDistance]
+            r = l[isDistance]
+            # jacobian for parameters
+            A[isDistance, 0] = 2*ddx
+            A[isDistance, 1] = 2*ddy
+            # jacobian for observations
+            B[isDistance] = -2*r
+            # misclosure
+            w[isDistance] = ddx**2 + ddy**2 - r**2
+            # orientation equation: (xc-px)/sin(az) - (yc-py)/cos(az) = 0 (obs: az, param: xc,yc, fixed: px,py)
+            ddx = x0[0] - px[isOrientation]
+            ddy = x0[1] - py[isOrientation]
+            s = sinaz[isOrientation]
+            c = cosaz[isOrientation]
+            # jacobian for parameters
+            A[isOrientation, 0] = 1/s
+            A[isOrientation, 1] = -1/c
+            # jacobian for observations
+            B[isOrientation] = ddx*deg2rad*c/s**2 - ddy*-deg2rad*s/c**2
+            # misclosure
+            w[isOrientation] = ddx/s - ddy/c
+            # weight matrix
+            P = 1/(B**2*Qll)
+            # normal matrix
+            N = np.dot(A.T * P, A)
+            u = np.dot(A.T * P, w)
+            try:
+                dx = la.solve(N, u)
+            except la.LinAlgError:
+                dx = None
+            if dx is None or not np.all(np.isfinite(dx)):
+                self.report += "\n!!! Adjustment failed, the configuration is singular"
+                self.finish("singular")
+                return
+            x0 -= dx
+            self.report += "\nCorrection %u: %10.4f %10.4f" % (it, dx[0], dx[1])
+            elapsed = time() - iterationStart
+            self.telemetry.addIteration(N, dx, elapsed)
+            if instrumentation.enabled:
+                instrumentation.record("least squares iteration", elapsed)
+        Qxx = la.inv(N)
+        p1 = sqrt(Qxx[0][0])
+        p2 = sqrt(Qxx[1][1])
+        # residuals -Qll*B'*(P * (A* dx(iN)+w)) !!! ToBeChecked todo !!!
+        v = -Qll * B * (P * (np.dot(A, dx) + w))
+        self.solution = Point(x0[0], x0[1])
+        self.precision = (p1, p2)
+        self.Qxx = Qxx
+        self.residuals = v
+        self.ellipse = errorEllipse(Qxx, confidence95)
+        # normal equations split by observation type, for the variance component estimation
+        self.normals = ComponentNormals(A, w, P, isOrientation)
+
+        sigmapos = np.dot(v * P, v) / (nObs - 2)  # vTPv / r
+        self.sigma = float(sigmapos)
+        self.report += "\n"
+        self.report += solutionReport(x0, self.precision, self.ellipse, observations, v, self.sigma)
+        if isDistance.any() and isOrientation.any():
+            varianceComponents = VarianceComponents([self.normals])
+            # a single point only gives a hint, when each type has some redundancy
+            if varianceComponents.converged and varianceComponents.redundancy.min() >= 1:
+                self.report += "\n" + varianceComponents.report()
+        self.finish("converged")
+
+    def finish(self, status):
+        self.telemetry.finish(status, self.sigma)
+        telemetry.session.add(self.telemetry)
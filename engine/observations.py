@@ -0,0 +1,58 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+import numpy as np
+
+# packed representation of observations, rows behave like the observation dictionaries
+observationDtype = [("type", "U11"), ("x", "f8"), ("y", "f8"), ("observation", "f8"), ("precision", "f8")]
+# observations with the id of their feature
+featureDtype = observationDtype + [("id", "U20")]
+
+
+def packObservations(observations):
+    # convert a list of observation dictionaries to a packed array
+    if isinstance(observations, np.ndarray):
+        return observations
+    return np.array([(obs["type"], obs["x"], obs["y"], obs["observation"], obs["precision"])
+                     for obs in observations], dtype=observationDtype)
+
+
+def packFeatures(features):
+    # features of the observation layer (or any mapping with the same keys) to a packed array
+    return np.array([(f["type"], f["x"], f["y"], f["observation"], f["precision"], f["id"] or "")
+                     for f in features], dtype=featureDtype)
+
+
+def packGroups(groups):
+    # concatenate the observation groups in a single array, offsets[i]:offsets[i+1] delimiting group i
+    offsets = np.zeros(len(groups)+1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(group) for group in groups])
+    observations = np.concatenate([packObservations(group) for group in groups]) if len(groups) \
+        else np.zeros(0, dtype=observationDtype)
+    return observations, offsets
@@ -0,0 +1,67 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from math import sqrt, atan2, pi
+
+
+class Point():
+    # plain 2D point exposing the part of the QgsPoint API used by the engine
+    def __init__(self, x, y=None):
+        if y is None:
+            # copy constructor
+            x, y = x.x(), x.y()
+        self.__x = float(x)
+        self.__y = float(y)
+
+    def x(self):
+        return self.__x
+
+    def y(self):
+        return self.__y
+
+    def sqrDist(self, other):
+        dx = other.x() - self.__x
+        dy = other.y() - self.__y
+        return dx*dx + dy*dy
+
+    def distance(self, other):
+        return sqrt(self.sqrDist(other))
+
+    def azimuth(self, other):
+        # azimuth in degrees, clockwise from north
+        return atan2(other.x() - self.__x, other.y() - self.__y) * 180 / pi
+
+    def __eq__(self, other):
+        return self.__x == other.x() and self.__y == other.y()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return "Point(%r, %r)" % (self.__x, self.__y)
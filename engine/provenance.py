@@ -0,0 +1,148 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+# Provenance graph of the advanced intersections: observation -> point -> dimensions.
+#
+# Every saved intersection is a node keeping a copy of the observations it has been adjusted with,
+# its solution and the features written for it (the point and one dimension per observation),
+# so that only the points using an edited or deleted observation have to be adjusted again.
+# The graph is saved as JSON.
+
+import json
+import os
+from datetime import datetime
+
+version = 1
+
+
+def snapshot(observations):
+    # copy of the observations, the construction features may be erased afterwards
+    return dict((str(obs["id"]), [str(obs["type"]), float(obs["x"]), float(obs["y"]), float(obs["observation"]),
+                                  float(obs["precision"])])
+                for obs in observations)
+
+
+class ProvenanceGraph():
+    def __init__(self):
+        # point id -> {"solution": [x, y], "point": [layer id, feature id] or None,
+        #              "observations": {observation id: [type, x, y, observation, precision]},
+        #              "dimensions": {observation id: [layer id, feature id]}}
+        self.points = {}
+        # observation id -> set of point ids
+        self.observations = {}
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def load(cls, path):
+        graph = cls()
+        if path is None or not os.path.exists(path):
+            return graph
+        with open(path) as f:
+            content = json.load(f)
+        for pointId, node in content.get("points", {}).items():
+            graph.points[pointId] = node
+            graph.link(pointId)
+        return graph
+
+    def save(self, path):
+        # written to a temporary file first, so that a crash does not lose the graph
+        with open(path + ".tmp", "w") as f:
+            json.dump({"version": version, "points": self.points}, f)
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(path + ".tmp", path)
+
+    def link(self, pointId):
+        for obsId in self.points[pointId]["observations"]:
+            self.observations.setdefault(obsId, set()).add(pointId)
+
+    def unlink(self, pointId):
+        for obsId in self.points[pointId]["observations"]:
+            pointIds = self.observations.get(obsId)
+            if pointIds is not None:
+                pointIds.discard(pointId)
+                if not pointIds:
+                    del self.observations[obsId]
+
+    def addPoint(self, solution, point, observations, dimensions):
+        # solution: (x, y)
+        # point: (layer id, feature id) of the written point, None if it has not been written
+        # observations: rows having id, type, x, y, observation and precision
+        # dimensions: {observation id: (layer id, feature id)}
+        pointId = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        while pointId in self.points:
+            pointId += "_"
+        self.points[pointId] = {"solution": [float(solution[0]), float(solution[1])],
+                                "point": list(point) if point is not None else None,
+                                "observations": snapshot(observations),
+                                "dimensions": dict((str(obsId), list(dimension))
+                                                   for obsId, dimension in dimensions.items())}
+        self.link(pointId)
+        return pointId
+
+    def removePoint(self, pointId):
+        if pointId in self.points:
+            self.unlink(pointId)
+            del self.points[pointId]
+
+    def affectedPoints(self, obsIds):
+        # the points adjusted with any of these observations
+        pointIds = set()
+        for obsId in obsIds:
+            pointIds.update(self.observations.get(obsId, ()))
+        return sorted(pointIds)
+
+    def observation(self, obsId):
+        # copy of an observation, None if it is not used by any point
+        for pointId in self.observations.get(obsId, ()):
+            values = self.points[pointId]["observations"][obsId]
+            return {"id": obsId, "type": values[0], "x": values[1], "y": values[2], "observation": values[3],
+                    "precision": values[4]}
+        return None
+
+    def isUsed(self, obsId):
+        return obsId in self.observations
+
+    def observationsOf(self, pointId):
+        # observation dictionaries, as given to the solver
+        return [{"id": obsId, "type": values[0], "x": values[1], "y": values[2], "observation": values[3],
+                 "precision": values[4]}
+                for obsId, values in sorted(self.points[pointId]["observations"].items())]
+
+    def update(self, pointId, solution, observations, dimensions):
+        # the point has been adjusted again with these observations and its dimensions regenerated
+        node = self.points[pointId]
+        self.unlink(pointId)
+        node["solution"] = [float(solution[0]), float(solution[1])]
+        node["observations"] = snapshot(observations)
+        node["dimensions"] = dict((str(obsId), list(dimension)) for obsId, dimension in dimensions.items())
+        self.link(pointId)
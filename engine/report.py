@@ -0,0 +1,126 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+# Adjustment reports: the human-readable text and its compact structured record.
+#
+# The record keeps the solution, precision, sigma a posteriori, residuals and the ids of the observations,
+# and is stored as JSON (optionally compressed). The text is regenerated from the record on demand,
+# the values of the observations being looked up from their ids.
+
+import base64
+import json
+import zlib
+
+version = 1
+compressedPrefix = "z:"
+
+
+def sigmaComment(sigma):
+    if sigma > 1.8:
+        return "precision is too optimistic"
+    elif sigma < .5:
+        return "precision is too pessimistc"
+    else:
+        return "precision seems realistic"
+
+
+def solutionReport(solution, precision, ellipse, observations, residuals, sigma):
+    # result part of the least-squares report
+    # observations: rows or dictionaries, None for an observation which can not be found anymore
+    report = "\nSolution:\t%13.3f\t%13.3f" % (solution[0], solution[1])
+    report += "\nPrecision:\t%13.3f\t%13.3f" % (precision[0], precision[1])
+    if ellipse is not None:
+        report += "\nError ellipse (95%%): a = %.3f, b = %.3f, azimuth = %.1f" % tuple(ellipse)
+    report += "\n\n Observation  |       x       |       y       |   Measure   | Precision | Residual"
+    report += "  \n              |  [map units]  |  [map units]  |   [deg/m]   |  [1/1000] | [1/1000]"
+    for obs, v in zip(observations, residuals):
+        if obs is None:
+            report += "\n%13s | %13s | %13s | %11s | %9s | %7.1f" % ("?", "?", "?", "?", "?", 1000*v)
+            continue
+        report += "\n%13s | %13.3f | %13.3f | %11.3f | %9.1f | %7.1f" % (obs["type"], obs["x"], obs["y"],
+                                                                         obs["observation"], obs["precision"]*1000,
+                                                                         1000*v)
+    report += "\n\nSigma a posteriori: %5.2f \t (%s)" % (sigma, sigmaComment(sigma))
+    return report
+
+
+def reportRecord(intersection, observationIds):
+    # compact record of an intersection (least-squares or closed form)
+    record = {"v": version, "solution": [round(intersection.solution.x(), 4), round(intersection.solution.y(), 4)],
+              "observations": [str(obsId) for obsId in observationIds]}
+    if getattr(intersection, "sigma", None) is not None:
+        record["precision"] = [round(p, 5) for p in intersection.precision]
+        record["ellipse"] = [round(value, 5) for value in intersection.ellipse]
+        record["sigma"] = round(intersection.sigma, 4)
+        record["residuals"] = [round(float(v), 6) for v in intersection.residuals]
+    return record
+
+
+def encodeRecord(record, compressed=False):
+    text = json.dumps(record, separators=(",", ":"), sort_keys=True)
+    if not compressed:
+        return text
+    return compressedPrefix + base64.b64encode(zlib.compress(text.encode("utf-8"), 9)).decode("ascii")
+
+
+def decodeRecord(value):
+    # returns None if the value is not a record (e.g. a text report)
+    if not value:
+        return None
+    try:
+        value = str(value)
+        if value.startswith(compressedPrefix):
+            value = zlib.decompress(base64.b64decode(value[len(compressedPrefix):].encode("ascii"))).decode("utf-8")
+        elif not value.startswith("{"):
+            return None
+        record = json.loads(value)
+    except (ValueError, TypeError, UnicodeError, zlib.error):
+        return None
+    if not isinstance(record, dict) or "solution" not in record:
+        return None
+    return record
+
+
+def formatRecord(record, observations):
+    # human-readable report of a record
+    # observations: {observation id: observation} of the observations which can be found
+    report = "Report regenerated from the stored record.\n"
+    rows = [observations.get(obsId) for obsId in record["observations"]]
+    if "sigma" not in record:
+        report += "\nSolution:\t%13.3f\t%13.3f" % tuple(record["solution"])
+        report += "\n\nClosed-form solution of 2 observations:"
+        for obsId, obs in zip(record["observations"], rows):
+            if obs is None:
+                report += "\n%13s | unknown observation %s" % ("?", obsId)
+            else:
+                report += "\n%13s | %13.3f | %13.3f | %11.3f" % (obs["type"], obs["x"], obs["y"], obs["observation"])
+        return report
+    return report + solutionReport(record["solution"], record["precision"], record.get("ellipse"), rows,
+                                   record["residuals"], record["sigma"])
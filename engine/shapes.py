@@ -0,0 +1,68 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from math import pi, cos, sin, sqrt
+
+from .point import Point
+
+
+def circle(center, radius, step=3):
+    # trace circle at distance from point, one vertex every step degrees
+    return [Point(center.x() + radius * cos(pi/180*a),
+                  center.y() + radius * sin(pi/180*a))
+            for a in range(0, 361, step)]
+
+
+def ray(origin, azimuth, length):
+    # segment starting at origin in the given azimuth (degrees)
+    x = origin.x() + length * cos((90-azimuth)*pi/180)
+    y = origin.y() + length * sin((90-azimuth)*pi/180)
+    return [Point(origin), Point(x, y)]
+
+
+class OrientationLine():
+    # line keeping the orientation of a given segment, its length following a point
+    def __init__(self, line, point):
+        if len(line) != 2:
+            raise NameError("line must be a vector of 2 points")
+        self.orientation = line[0].azimuth(line[1]) * pi/180
+        self.origin = Point(line[0])
+        self.point = Point(point)
+
+    def setPoint(self, point):
+        self.point = Point(point)
+
+    def points(self):
+        a = -self.orientation + pi/180*self.origin.azimuth(self.point)
+        d = sqrt(self.origin.sqrDist(self.point)) * cos(a)
+        if d == 0:
+            d = 1
+        P = Point(self.origin.x() + d * sin(self.orientation),
+                  self.origin.y() + d * cos(self.orientation))
+        return [self.origin, P]
@@ -0,0 +1,92 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Bounded LRU cache of least-squares results.
+# The key is a hash of the observations (type, station, value and precision), of the solver settings
+# and of the coarse cell of the initial point,
+# so that toggling observations back to a previous configuration does not solve again.
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .observations import packObservations
+from . import instrumentation
+
+defaultCapacity = 256
+
+
+class SolutionCache():
+    def __init__(self, capacity=defaultCapacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def key(self, observations, *settings):
+        # settings: any solver setting changing the result (max iterations, threshold, ...)
+        observations = packObservations(observations)
+        digest = hashlib.sha1()
+        for name in ("type", "x", "y", "observation", "precision"):
+            digest.update(np.ascontiguousarray(observations[name]).tobytes())
+        digest.update(repr(settings).encode("ascii"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.pop(key, None)
+            if value is None:
+                instrumentation.increment("solution cache miss")
+                return None
+            # most recently used last
+            self.entries[key] = value
+        instrumentation.increment("solution cache hit")
+        return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = value
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def values(self):
+        with self.lock:
+            return list(self.entries.values())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+# shared by the intersection dialog and the advanced intersection tool
+solutions = SolutionCache()
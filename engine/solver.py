@@ -0,0 +1,65 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from .leastsquares import LeastSquares
+from .intersections import TwoCirclesIntersection, TwoOrientationIntersection, DistanceOrientationIntersection
+from .gridsearch import gridSearch, startCell
+
+
+def intersect(observations, initPoint, maxIter, threshold, isCancelled=None, cache=None, gridSearchBudget=None):
+    # intersect 2 observations with a closed-form solution, 3 or more using least-squares
+    # observations must contain at least 2 elements
+    # cache: optional SolutionCache for the least-squares results (closed forms depend on the initial point)
+    # gridSearchBudget: if given (seconds), the least-squares start from a global grid search,
+    # the initial point choosing between minima of equal cost
+    if len(observations) == 2:
+        if observations[0]["type"] == "distance" and observations[1]["type"] == "distance":
+            return TwoCirclesIntersection(observations, initPoint)
+        elif observations[0]["type"] == "orientation" and observations[1]["type"] == "orientation":
+            return TwoOrientationIntersection(observations)
+        else:
+            return DistanceOrientationIntersection(observations, initPoint)
+    if cache is None:
+        return leastSquares(observations, initPoint, maxIter, threshold, isCancelled, gridSearchBudget)
+    # the result depends on the start (basin, report), which is kept at the resolution of the coarse grid
+    key = cache.key(observations, maxIter, float(threshold), gridSearchBudget, startCell(observations, initPoint))
+    intersection = cache.get(key)
+    if intersection is None:
+        intersection = leastSquares(observations, initPoint, maxIter, threshold, isCancelled, gridSearchBudget)
+        # failed solves are not kept, another start or more iterations may succeed
+        if intersection.telemetry.status == "converged":
+            cache.put(key, intersection)
+    return intersection
+
+
+def leastSquares(observations, initPoint, maxIter, threshold, isCancelled, gridSearchBudget):
+    # the grid search replaces the start, the clicked point only breaks the ties between equivalent minima
+    if gridSearchBudget:
+        initPoint = gridSearch(observations, gridSearchBudget, initPoint=initPoint)
+    return LeastSquares(observations, initPoint, maxIter, threshold, isCancelled)
@@ -0,0 +1,149 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Structured telemetry of the least-squares solves.
+# Every solve is recorded (iterations, condition number of the normal matrix, step norms,
+# time per iteration, sigma a posteriori, redundancy) in a bounded ring buffer for the session.
+
+import csv
+from collections import deque
+from time import time
+
+import numpy as np
+
+# number of solves kept in the session log
+defaultCapacity = 1000
+
+statuses = ("converged", "max iterations", "singular", "cancelled")
+
+
+def condition(N):
+    # condition number of the symmetric 2x2 normal matrix, from its eigenvalues (t +- s) / 2
+    t = N[0][0] + N[1][1]
+    s = np.hypot(N[0][0] - N[1][1], 2*N[0][1])
+    if not t - s > 0:
+        return float("inf")
+    return float((t + s) / (t - s))
+
+
+class SolveTelemetry():
+    def __init__(self, nDistances, nOrientations):
+        self.nDistances = nDistances
+        self.nOrientations = nOrientations
+        self.redundancy = nDistances + nOrientations - 2
+        self.status = None
+        self.sigma = None
+        self.conditions = []
+        self.stepNorms = []
+        self.iterationTimes = []
+        self.start = time()
+        self.duration = None
+
+    def iterations(self):
+        return len(self.stepNorms)
+
+    def composition(self):
+        # observation geometry, e.g. 2d+1o for 2 distances and 1 orientation
+        return "%ud+%uo" % (self.nDistances, self.nOrientations)
+
+    def addIteration(self, N, dx, elapsed):
+        self.conditions.append(condition(N))
+        self.stepNorms.append(float(np.hypot(dx[0], dx[1])))
+        self.iterationTimes.append(elapsed)
+
+    def finish(self, status, sigma=None):
+        self.status = status
+        self.sigma = sigma
+        self.duration = time() - self.start
+
+    def row(self):
+        return {"composition": self.composition(), "redundancy": self.redundancy, "status": self.status,
+                "iterations": self.iterations(),
+                "condition": self.conditions[-1] if self.conditions else None,
+                "last_step": self.stepNorms[-1] if self.stepNorms else None,
+                "time_per_iteration_ms": 1000*np.mean(self.iterationTimes) if self.iterationTimes else None,
+                "duration_ms": 1000*self.duration if self.duration is not None else None,
+                "sigma": self.sigma}
+
+
+class TelemetryLog():
+    def __init__(self, capacity=defaultCapacity):
+        self.solves = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.solves)
+
+    def add(self, solve):
+        self.solves.append(solve)
+
+    def extend(self, solves):
+        self.solves.extend(solves)
+
+    def records(self):
+        return list(self.solves)
+
+    def clear(self):
+        self.solves.clear()
+
+    def summary(self):
+        # aggregates per observation geometry, plus the overall one under "all"
+        groups = {"all": []}
+        for solve in self.records():
+            groups["all"].append(solve)
+            groups.setdefault(solve.composition(), []).append(solve)
+        summary = {}
+        for name, solves in groups.items():
+            if len(solves) == 0:
+                continue
+            iterations = np.array([s.iterations() for s in solves])
+            conditions = [s.conditions[-1] for s in solves if s.conditions]
+            sigmas = [s.sigma for s in solves if s.sigma is not None]
+            iterationTimes = [t for s in solves for t in s.iterationTimes]
+            summary[name] = {"solves": len(solves),
+                             "meanIterations": float(iterations.mean()),
+                             "maxIterations": int(iterations.max()),
+                             "medianCondition": float(np.median(conditions)) if conditions else None,
+                             "maxCondition": float(max(conditions)) if conditions else None,
+                             "meanSigma": float(np.mean(sigmas)) if sigmas else None,
+                             "meanIterationTime": float(np.mean(iterationTimes)) if iterationTimes else None}
+            for status in statuses:
+                summary[name][status] = sum(1 for s in solves if s.status == status)
+        return summary
+
+    def exportCsv(self, path):
+        columns = ("composition", "redundancy", "status", "iterations", "condition", "last_step",
+                   "time_per_iteration_ms", "duration_ms", "sigma")
+        with open(path, "w") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for solve in self.records():
+                row = solve.row()
+                writer.writerow(["" if row[c] is None else row[c] for c in columns])
+
+session = TelemetryLog()
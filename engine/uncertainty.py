@@ -0,0 +1,88 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+# Error ellipse of a solution and misclosure surface of a set of observations.
+
+from math import atan2, cos, sin, sqrt, pi
+
+import numpy as np
+
+from .point import Point
+from .observations import packObservations
+
+# scale of the standard ellipse giving a 95% confidence region in 2D: sqrt(chi2(2, 0.95))
+confidence95 = 2.4477
+
+
+def errorEllipse(Qxx, scale=1.):
+    # semi-major axis, semi-minor axis and azimuth (degrees) of the major axis
+    # Qxx is the 2x2 cofactor matrix of (x, y)
+    qxx, qyy, qxy = Qxx[0][0], Qxx[1][1], Qxx[0][1]
+    root = sqrt((qxx - qyy)**2 / 4. + qxy**2)
+    a = scale * sqrt(max((qxx + qyy) / 2. + root, 0))
+    b = scale * sqrt(max((qxx + qyy) / 2. - root, 0))
+    azimuth = (90 - 180/pi * .5 * atan2(2*qxy, qxx - qyy)) % 180
+    return a, b, azimuth
+
+
+def ellipsePoints(center, a, b, azimuth, step=5):
+    # closed polyline of the ellipse, one vertex every step degrees
+    theta = (90 - azimuth) * pi/180
+    points = []
+    for t in range(0, 361, step):
+        u = a * cos(t*pi/180)
+        v = b * sin(t*pi/180)
+        points.append(Point(center.x() + u*cos(theta) - v*sin(theta),
+                            center.y() + u*sin(theta) + v*cos(theta)))
+    return points
+
+
+def misclosureSurface(observations, xmin, ymin, xmax, ymax, nx, ny):
+    # sum of the squared misclosures weighted by the precisions (chi-square) on a ny x nx grid,
+    # row 0 being the top (ymax) of the window; computed for all the observations at once by broadcasting
+    observations = packObservations(observations)
+    xs = np.linspace(xmin, xmax, nx)
+    ys = np.linspace(ymax, ymin, ny)
+    X = xs[np.newaxis, :, np.newaxis]
+    Y = ys[:, np.newaxis, np.newaxis]
+    dx = X - observations["x"]
+    dy = Y - observations["y"]
+    isDistance = observations["type"] == "distance"
+    # distance: computed - observed
+    misclosure = np.hypot(dx, dy) - observations["observation"]
+    # orientation: angle difference in degrees, wrapped to [-180, 180]
+    azimuth = np.degrees(np.arctan2(dx, dy))
+    angle = (azimuth - observations["observation"] + 180) % 360 - 180
+    misclosure = np.where(isDistance, misclosure, angle)
+    return np.sum((misclosure / observations["precision"])**2, axis=2)
+
+
+def likelihood(surface):
+    # relative likelihood in [0, 1] from a chi-square surface
+    return np.exp(-.5 * (surface - surface.min()))
@@ -0,0 +1,157 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+# Helmert variance component estimation of the distances and orientations.
+# The normal equations of every adjusted point are kept split by observation type,
+# so that the weights of each type can be rescaled without linearizing again.
+# Summed over a batch of points, the variance components calibrate the default precisions.
+
+import numpy as np
+
+components = ("distance", "orientation")
+
+defaultMaxIter = 20
+defaultThreshold = .01
+# points whose sigma a posteriori exceeds the median by this factor are left out
+# (typically a least-squares solution which converged to the wrong intersection)
+outlierFactor = 25
+
+
+class ComponentNormals():
+    def __init__(self, A, w, P, isOrientation):
+        # A, w, P: jacobian, misclosure and weights of the last iteration of the adjustment
+        # per component i: N_i = A_i' P_i A_i, u_i = A_i' P_i w_i, c_i = w_i' P_i w_i
+        self.N = np.zeros((2, 2, 2))
+        self.u = np.zeros((2, 2))
+        self.c = np.zeros(2)
+        self.n = np.zeros(2)
+        for i, mask in enumerate((~isOrientation, isOrientation)):
+            AP = A[mask].T * P[mask]
+            self.N[i] = np.dot(AP, A[mask])
+            self.u[i] = np.dot(AP, w[mask])
+            self.c[i] = np.dot(w[mask] * P[mask], w[mask])
+            self.n[i] = mask.sum()
+
+    def varianceFactor(self):
+        # sigma0^2 = v'Pv / (n-2) of the point with the a priori weights, v'Pv = c - u' N^-1 u
+        # None if there is no redundancy
+        n = self.n.sum()
+        if n <= 2:
+            return None
+        N = self.N.sum(axis=0)
+        u = self.u.sum(axis=0)
+        vtpv = self.c.sum() - np.dot(u, np.linalg.solve(N, u))
+        return float(max(vtpv, 0) / (n - 2))
+
+
+class VarianceComponents():
+    def __init__(self, normals, maxIter=defaultMaxIter, threshold=defaultThreshold):
+        # normals: list of ComponentNormals, one per adjusted point
+        # estimates the variance factor of each observation type relative to its a priori precision
+        normals = [n for n in normals if n is not None and n.n.sum() > 2]
+        self.nPoints = len(normals)
+        self.nObservations = np.sum([n.n for n in normals], axis=0) if normals else np.zeros(2)
+        self.factors = np.ones(2)
+        self.variances = np.ones(2)
+        self.redundancy = np.zeros(2)
+        self.iterations = 0
+        self.converged = False
+        self.estimated = np.zeros(2, dtype=bool)
+        self.rejected = 0
+        if not normals:
+            return
+        N = np.array([n.N for n in normals])
+        u = np.array([n.u for n in normals])
+        c = np.array([n.c for n in normals])
+        # sigma a posteriori of each point with the a priori weights
+        Nt = N.sum(axis=1)
+        dx = np.linalg.solve(Nt, u.sum(axis=1)[..., np.newaxis])[..., 0]
+        vtpv = np.einsum("gj,gjk,gk->g", dx, Nt, dx) - 2*np.einsum("gj,gj->g", dx, u.sum(axis=1)) + c.sum(axis=1)
+        sigmas = np.maximum(vtpv, 0) / (np.array([n.n.sum() for n in normals]) - 2)
+        inliers = sigmas <= outlierFactor * np.median(sigmas)
+        self.rejected = int((~inliers).sum())
+        N, u, c = N[inliers], u[inliers], c[inliers]
+        self.nPoints -= self.rejected
+        if self.nPoints == 0:
+            return
+        self.nObservations = np.sum([n.n for n, inlier in zip(normals, inliers) if inlier], axis=0)
+        # only the components having observations in redundant points are estimated
+        estimated = self.nObservations > 0
+        while self.iterations < maxIter:
+            self.iterations += 1
+            # normal equations of all the points with the current weight factors
+            Nf = np.einsum("i,gijk->gjk", self.factors, N)
+            uf = np.einsum("i,gij->gj", self.factors, u)
+            Ninv = np.linalg.inv(Nf)
+            dx = np.einsum("gjk,gk->gj", Ninv, uf)
+            # weighted square sum of the residuals e = A.dx - w of each component
+            omega = self.factors * (np.einsum("gj,gijk,gk->gi", dx, N, dx) - 2*np.einsum("gj,gij->gi", dx, u) + c)
+            omega = np.maximum(omega, 0).sum(axis=0)
+            # partial redundancy: n_i - trace(N^-1 . N_i)
+            self.redundancy = self.nObservations - self.factors * np.einsum("gjk,gikj->i", Ninv, N)
+            estimable = estimated & (self.redundancy > 1e-6) & (omega > 0)
+            if not np.any(estimable):
+                break
+            variances = np.ones(2)
+            variances[estimable] = omega[estimable] / self.redundancy[estimable]
+            self.factors /= variances
+            if np.all(np.abs(variances - 1) < threshold):
+                self.converged = True
+                break
+        # variance factors of each type relative to the a priori precisions
+        self.variances = 1 / self.factors
+        self.estimated = estimated & (self.redundancy > 1e-6)
+
+    def scale(self, component):
+        # factor to apply to the a priori precision of the component, None if it could not be estimated
+        i = components.index(component)
+        if not self.converged or not self.estimated[i]:
+            return None
+        return float(np.sqrt(self.variances[i]))
+
+    def calibrated(self, component, precision):
+        scale = self.scale(component)
+        if scale is None:
+            return precision
+        return precision * scale
+
+    def report(self):
+        lines = ["Variance components (%u points, %u iterations%s):" %
+                 (self.nPoints, self.iterations, "" if self.converged else ", not converged")]
+        if self.rejected:
+            lines.append("%u points left out, their sigma a posteriori is too large" % self.rejected)
+        for i, component in enumerate(components):
+            scale = self.scale(component)
+            if scale is None:
+                lines.append("%13s | %4u observations | not estimated" % (component, self.nObservations[i]))
+            else:
+                lines.append("%13s | %4u observations | redundancy %6.2f | precision scale %6.3f" %
+                             (component, self.nObservations[i], self.redundancy[i], scale))
+        return "\n".join(lines)
@@ -0,0 +1,166 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from PyQt4.QtCore import QCoreApplication
+from PyQt4.QtGui import QDialog, QTableWidgetItem
+from qgis.core import QgsMapLayerRegistry, QgsPoint, QgsRectangle
+from qgis.gui import QgsMessageBar
+
+from ..qgissettingmanager import SettingDialog
+
+from ..core.mysettings import MySettings
+from ..core.advancedbatch import AdvancedBatch
+
+from ..ui.ui_advanced_batch import Ui_AdvancedBatch
+
+from intersectiondialog import IntersectionDialog
+
+statusNames = {"pending": "pending", "accepted": "accepted", "failed": "no solution",
+               "variance": "variance factor too large", "redundancy": "too few observations to check",
+               "written": "written"}
+
+
+class AdvancedBatchDialog(QDialog, Ui_AdvancedBatch, SettingDialog):
+    def __init__(self, iface):
+        QDialog.__init__(self)
+        self.setupUi(self)
+        self.iface = iface
+        self.settings = MySettings()
+        SettingDialog.__init__(self, self.settings, False, True)
+        self.batch = None
+        self.running = False
+        self.cancelled = False
+        # cluster displayed on each row of the table
+        self.rows = []
+        self.adjustButton.clicked.connect(self.adjust)
+        self.writeButton.clicked.connect(self.writeAccepted)
+        self.flaggedOnly.toggled.connect(self.displayClusters)
+        self.clusterTable.cellDoubleClicked.connect(self.review)
+
+    def reject(self):
+        if self.running:
+            self.cancelled = True
+            return
+        QDialog.reject(self)
+
+    def adjust(self):
+        if self.running:
+            return
+        lineLayer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("memoryLineLayer"))
+        if lineLayer is None:
+            self.iface.messageBar().pushMessage("Intersect It", "There are no observations to intersect.",
+                                                QgsMessageBar.WARNING, 3)
+            return
+        self.running = True
+        self.cancelled = False
+        self.adjustButton.setEnabled(False)
+        self.writeButton.setEnabled(False)
+        try:
+            self.batch = AdvancedBatch(lineLayer, self.batchClusterTolerance.value(),
+                                       self.batchOrientationReach.value(), self.batchMinObservations.value(),
+                                       self.batchMaxVarianceFactor.value())
+            clusters = self.batch.cluster()
+            self.progressBar.setMaximum(len(clusters))
+            self.progressBar.setValue(0)
+            for n, cluster in enumerate(clusters):
+                self.batch.adjust(cluster)
+                self.progressBar.setValue(n+1)
+                QCoreApplication.processEvents()
+                if self.cancelled:
+                    break
+        finally:
+            self.running = False
+            self.adjustButton.setEnabled(True)
+        self.displayClusters()
+
+    def displayClusters(self, dummy=None):
+        self.clusterTable.setRowCount(0)
+        self.rows = []
+        if self.batch is None:
+            return
+        flaggedOnly = self.flaggedOnly.isChecked()
+        for cluster in self.batch.clusters:
+            if flaggedOnly and not cluster.flagged():
+                continue
+            row = len(self.rows)
+            self.rows.append(cluster)
+            self.clusterTable.insertRow(row)
+            self.clusterTable.setItem(row, 0, QTableWidgetItem("%u" % len(cluster.observations)))
+            point = cluster.solution if cluster.solution is not None else QgsPoint(cluster.seed[0], cluster.seed[1])
+            self.clusterTable.setItem(row, 1, QTableWidgetItem("%.3f" % point.x()))
+            self.clusterTable.setItem(row, 2, QTableWidgetItem("%.3f" % point.y()))
+            varianceFactor = "%.2f" % cluster.varianceFactor if cluster.varianceFactor is not None else "-"
+            self.clusterTable.setItem(row, 3, QTableWidgetItem(varianceFactor))
+            self.clusterTable.setItem(row, 4, QTableWidgetItem(statusNames[cluster.status]))
+        statuses = [cluster.status for cluster in self.batch.clusters]
+        flagged = len([cluster for cluster in self.batch.clusters if cluster.flagged()])
+        self.summaryLabel.setText(QCoreApplication.translate("IntersectIt",
+                                                             "%u observations in %u clusters: %u accepted, "
+                                                             "%u flagged, %u written")
+                                  % (self.batch.nObservations, len(statuses), statuses.count("accepted"),
+                                     flagged, statuses.count("written")))
+        self.writeButton.setEnabled("accepted" in statuses)
+
+    def checkOutput(self):
+        if not self.settings.value("advancedIntersectionWritePoint") and \
+                not self.settings.value("dimensionDistanceWrite") and \
+                not self.settings.value("dimensionOrientationWrite"):
+            self.iface.messageBar().pushMessage("Intersect It", "Nothing would be written, define the point"
+                                                                " or dimension layers in the settings.",
+                                                QgsMessageBar.WARNING, 3)
+            return False
+        return True
+
+    def writeAccepted(self):
+        if self.batch is None or not self.checkOutput():
+            return
+        count = self.batch.write(self.iface, self.batch.accepted())
+        self.iface.messageBar().pushMessage("Intersect It", "%u intersections have been written." % count,
+                                            QgsMessageBar.INFO, 3)
+        self.displayClusters()
+
+    def review(self, row, column):
+        # the cluster is adjusted interactively, like a click of the advanced intersection tool
+        cluster = self.rows[row]
+        if cluster.status == "written" or not self.checkOutput():
+            return
+        seed = QgsPoint(cluster.seed[0], cluster.seed[1])
+        d = 20 * self.batch.tolerance
+        mapCanvas = self.iface.mapCanvas()
+        mapCanvas.setExtent(QgsRectangle(seed.x()-d, seed.y()-d, seed.x()+d, seed.y()+d))
+        mapCanvas.refresh()
+        dlg = IntersectionDialog(self.iface, cluster.observations, seed)
+        if dlg.exec_() and dlg.solution is not None:
+            cluster.solution = dlg.solution
+            cluster.report = dlg.report
+            cluster.intersection = dlg.intersection
+            cluster.observations = dlg.observations
+            self.batch.write(self.iface, [cluster])
+        self.displayClusters()
@@ -29,14 +29,20 @@
 
 from PyQt4.QtCore import QCoreApplication
 from PyQt4.QtGui import QMessageBox
-from qgis.core import QgsFeatureRequest, QgsFeature, QgsGeometry, QgsMapLayerRegistry, QgsPoint, QgsSnapper, QgsTolerance
-from qgis.gui import QgsMapTool, QgsRubberBand, QgsMessageBar
+from qgis.core import QgsFeature, QgsGeometry, QgsMapLayerRegistry, QgsSnapper, QgsTolerance
+from qgis.gui import QgsMapTool, QgsRubberBand
 
 from ..core.mysettings import MySettings
 from ..core.memorylayers import MemoryLayers
-from ..core.arc import Arc
+from ..core.featurefetcher import fetchSnappedFeatures
+from ..core.dimensions import dimensionFeatures
+from ..core.provenance import PendingIntersection
+from ..core.reports import reportValue
+from ..core.writebuffer import WriteBuffer
+from ..engine.instrumentation import timing
 
 from mysettingsdialog import MySettingsDialog
+from hoverpipeline import HoverPipeline
 from intersectiondialog import IntersectionDialog
 
 
@@ -47,6 +53,8 @@ class AdvancedIntersectionMapTool(QgsMapTool):
         QgsMapTool.__init__(self, self.mapCanvas)
         self.settings = MySettings()
         self.rubber = QgsRubberBand(self.mapCanvas)
+        self.hover = HoverPipeline(self.hoverFeatures, self.displayFeatures, self.settings.value("hoverFrameBudget"))
+        self.writeBuffer = WriteBuffer(iface)
 
         self.tolerance = self.settings.value("selectTolerance")
         units = self.settings.value("selectUnits")
@@ -75,19 +83,29 @@ class AdvancedIntersectionMapTool(QgsMapTool):
         self.mapCanvas.unsetMapTool(self)
 
     def deactivate(self):
+        self.hover.clear()
         self.rubber.reset()
+        self.writeBuffer.flush()
         lineLayer = QgsMapLayerRegistry.instance().mapLayer(self.layerId)
         if lineLayer is not None:
             lineLayer.layerDeleted.disconnect(self.unsetMapTool)
         QgsMapTool.deactivate(self)
 
     def canvasMoveEvent(self, mouseEvent):
+        self.hover.push(mouseEvent.pos())
+
+    def hoverFeatures(self, pos):
+        features = self.getFeatures(pos)
+        return tuple(f.id() for f in features), features
+
+    def displayFeatures(self, features):
         # put the observations within tolerance in the rubber band
         self.rubber.reset()
-        for f in self.getFeatures(mouseEvent.pos()):
+        for f in features:
             self.rubber.addGeometry(f.geometry(), None)
 
     def canvasPressEvent(self, mouseEvent):
+        self.hover.clear()
         pos = mouseEvent.pos()
         observations = self.getFeatures(pos)
         point = self.toMapCoordinates(pos)
@@ -97,18 +115,10 @@ class AdvancedIntersectionMapTool(QgsMapTool):
         snapper = QgsSnapper(self.mapCanvas.mapRenderer())
         snapper.setSnapLayers([self.snapLayer])
         snapper.setSnapMode(QgsSnapper.SnapWithResultsWithinTolerances)
-        ok, snappingResults = snapper.snapPoint(pixPoint, [])
-        # output snapped features
-        features = []
-        alreadyGot = []
-        for result in snappingResults:
-            featureId = result.snappedAtGeometry
-            f = QgsFeature()
-            if featureId not in alreadyGot:
-                if result.layer.getFeatures(QgsFeatureRequest().setFilterFid(featureId)).nextFeature(f) is not False:
-                    features.append(QgsFeature(f))
-                    alreadyGot.append(featureId)
-        return features
+        with timing("snapping"):
+            ok, snappingResults = snapper.snapPoint(pixPoint, [])
+        # output snapped features with the attributes needed for the intersection
+        return fetchSnappedFeatures(snappingResults, ("id", "type", "x", "y", "observation", "precision"))
 
     def doIntersection(self, initPoint, observations):
         nObs = len(observations)
@@ -119,10 +129,15 @@ class AdvancedIntersectionMapTool(QgsMapTool):
         if not self.dlg.exec_() or self.dlg.solution is None:
             return
         intersectedPoint = self.dlg.solution
-        self.saveIntersectionResult(self.dlg.report, intersectedPoint)
-        self.saveDimension(intersectedPoint, self.dlg.observations)
+        # the point and dimensions are written by the write buffer, the link of the observations
+        # to the point and dimensions (to adjust them again when observations change) is recorded after
+        pending = PendingIntersection(intersectedPoint, self.dlg.observations)
+        report = reportValue(self.dlg.intersection, self.dlg.observations)
+        self.saveIntersectionResult(report, intersectedPoint, pending)
+        self.saveDimension(intersectedPoint, self.dlg.observations, pending)
+        self.writeBuffer.whenFlushed(pending.record)
 
-    def saveIntersectionResult(self, report, intersectedPoint):
+    def saveIntersectionResult(self, report, intersectedPoint, pending):
         # save the intersection result (point) and its report
         # check first
         while True:
@@ -154,11 +169,9 @@ class AdvancedIntersectionMapTool(QgsMapTool):
             if self.settings.value("advancedIntersectionWriteReport"):
                 irep = intLayer.dataProvider().fieldNameIndex(reportField)
                 f.addAttribute(irep, report)
-            intLayer.dataProvider().addFeatures([f])
-            intLayer.updateExtents()
-            self.mapCanvas.refresh()
+            self.writeBuffer.add(intLayer, [f], lambda features: pending.pointWritten(intLayer, features))
 
-    def saveDimension(self, intersectedPoint, observations):
+    def saveDimension(self, intersectedPoint, observations, pending):
         # check that dimension layer and fields have been set correctly
         if not self.settings.value("dimensionDistanceWrite") and not self.settings.value("dimensionOrientationWrite"):
             return  # if we do not place any dimension, skip
@@ -207,40 +220,10 @@ class AdvancedIntersectionMapTool(QgsMapTool):
                         if status == 3:
                             return
                     break
-        # save the intersection results
-        for obsType in obsTypes:
-            if self.settings.value("dimension"+obsType+"Write"):
-                layerid = self.settings.value("dimension"+obsType+"Layer")
-                layer = QgsMapLayerRegistry.instance().mapLayer(layerid)
-                if layer is None:
-                    continue
-                initFields = layer.dataProvider().fields()
-                features = []
-                for obs in observations:
-                    if obs["type"] != obsType.lower():
-                        continue
-                    f = QgsFeature()
-                    f.setFields(initFields)
-                    f.initAttributes(initFields.size())
-                    if self.settings.value("dimension"+obsType+"ObservationWrite"):
-                        f[self.settings.value("dimension"+obsType+"ObservationField")] = obs["observation"]
-                    if self.settings.value("dimension"+obsType+"PrecisionWrite"):
-                        f[self.settings.value("dimension"+obsType+"PrecisionField")] = obs["precision"]
-                    p0 = QgsPoint(obs["x"], obs["y"])
-                    p1 = intersectedPoint
-                    if obs["type"] == "distance":
-                        geom = Arc(p0, p1).geometry()
-                    elif obs["type"] == "orientation":
-                        geom = QgsGeometry().fromPolyline([p0, p1])
-                    else:
-                        raise NameError("Invalid observation %s" % obs["type"])
-                    f.setGeometry(geom)
-                    features.append(QgsFeature(f))
-                if not layer.dataProvider().addFeatures(features):
-                    self.iface.messageBar().pushMessage("Could not commit %s observations" % obsType,
-                                                        QgsMessageBar.CRITICAL)
-                layer.updateExtents()
-        self.mapCanvas.refresh()
+        # save the dimensions
+        for layer, keys, features in dimensionFeatures(intersectedPoint, observations):
+            self.writeBuffer.add(layer, features,
+                                 lambda written, layer=layer, keys=keys: pending.dimensionsWritten(layer, keys, written))
 
     def checkLayerExists(self, layerid, message):
         # returns:
@@ -0,0 +1,202 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QCoreApplication
+from PyQt4.QtGui import QDialog, QDialogButtonBox
+from qgis.core import QGis, QgsFeature, QgsGeometry, QgsMapLayerRegistry, QgsCoordinateTransform
+from qgis.gui import QgsMessageBar
+
+from ..qgiscombomanager import VectorLayerCombo
+
+from ..core.mysettings import MySettings
+from ..core.batchintersection import BatchIntersection
+
+from ..ui.ui_batch_intersection import Ui_BatchIntersection
+
+# number of points written at once in the output layer
+chunkSize = 500
+# prefix of the output fields receiving the attributes of the second layer
+secondLayerPrefix = "l2_"
+
+
+def fieldMapping(fields, layer1, layer2):
+    # output fields get the value of the field with the same name in the first layer,
+    # and of the field of the second layer with the same name prefixed by l2_ (or without prefix if the first
+    # layer has no such field)
+    # returns (output index, source layer, source index) and the names of the source fields not written
+    fieldMap = []
+    written = (set(), set())
+    for i in range(fields.count()):
+        name = fields[i].name()
+        idx = layer1.fieldNameIndex(name)
+        if idx != -1:
+            fieldMap.append((i, 0, idx))
+            written[0].add(name)
+            continue
+        if name.startswith(secondLayerPrefix):
+            idx = layer2.fieldNameIndex(name[len(secondLayerPrefix):])
+            if idx != -1:
+                fieldMap.append((i, 1, idx))
+                written[1].add(name[len(secondLayerPrefix):])
+                continue
+        idx = layer2.fieldNameIndex(name)
+        if idx != -1:
+            fieldMap.append((i, 1, idx))
+            written[1].add(name)
+    dropped = []
+    for source, layer in enumerate((layer1, layer2)):
+        for field in layer.pendingFields():
+            name = "%s.%s" % (layer.name(), field.name())
+            if field.name() not in written[source] and name not in dropped:
+                dropped.append(name)
+    return fieldMap, dropped
+
+
+class BatchIntersectionDialog(QDialog, Ui_BatchIntersection):
+    def __init__(self, iface):
+        QDialog.__init__(self)
+        self.setupUi(self)
+        self.iface = iface
+        self.settings = MySettings()
+        self.running = False
+        self.cancelled = False
+        # source fields having no output field
+        self.droppedFields = []
+
+        self.firstLayerCombo = VectorLayerCombo(self.firstLayer, lambda: "",
+                                                {"groupLayers": False, "hasGeometry": True})
+        self.secondLayerCombo = VectorLayerCombo(self.secondLayer, lambda: "",
+                                                 {"groupLayers": False, "hasGeometry": True})
+
+        layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("simpleIntersectionLayer"))
+        if layer is not None:
+            self.outputLabel.setText(QCoreApplication.translate("IntersectIt",
+                                                                "Intersections will be written in %s.") % layer.name())
+
+    def accept(self):
+        if self.running:
+            return
+        outputLayer = self.checkOutputLayer()
+        if outputLayer is None:
+            return
+        layer1 = self.firstLayerCombo.getLayer()
+        if self.withinLayerCheckBox.isChecked():
+            layer2 = None
+        else:
+            layer2 = self.secondLayerCombo.getLayer()
+        for layer in (layer1, layer2):
+            if layer is not None and layer.geometryType() not in (QGis.Line, QGis.Polygon):
+                self.iface.messageBar().pushMessage("Intersect It", "Only lines and polygons can be intersected.",
+                                                    QgsMessageBar.WARNING, 3)
+                return
+        if layer1 is None or (layer2 is None and not self.withinLayerCheckBox.isChecked()):
+            return
+
+        self.running = True
+        self.cancelled = False
+        self.buttonBox.button(QDialogButtonBox.Ok).setEnabled(False)
+        try:
+            count = self.intersect(layer1, layer2, outputLayer)
+        finally:
+            self.running = False
+            self.buttonBox.button(QDialogButtonBox.Ok).setEnabled(True)
+        self.iface.messageBar().pushMessage("Intersect It", "%u intersections have been written in %s."
+                                            % (count, outputLayer.name()), QgsMessageBar.INFO, 3)
+        if len(self.droppedFields):
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                "These fields have no output field and were not written: %s."
+                                                " Add fields with the same name (prefixed by %s for the second"
+                                                " layer) to the output layer to keep them."
+                                                % (", ".join(self.droppedFields), secondLayerPrefix),
+                                                QgsMessageBar.WARNING, 10)
+        QDialog.accept(self)
+
+    def reject(self):
+        if self.running:
+            self.cancelled = True
+            return
+        QDialog.reject(self)
+
+    def checkOutputLayer(self):
+        layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("simpleIntersectionLayer"))
+        if not self.settings.value("simpleIntersectionWritePoint") or layer is None:
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                "You must define an output layer for simple intersections",
+                                                QgsMessageBar.WARNING, 3)
+            return None
+        if not layer.isEditable():
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                "The output layer <b>%s must be editable</b>" % layer.name(),
+                                                QgsMessageBar.WARNING, 3)
+            return None
+        return layer
+
+    def intersect(self, layer1, layer2, outputLayer):
+        batch = BatchIntersection(layer1, layer2)
+        transform = None
+        if layer1.crs() != outputLayer.crs():
+            transform = QgsCoordinateTransform(layer1.crs(), outputLayer.crs())
+
+        # attributes of both source features
+        fields = outputLayer.pendingFields()
+        fieldMap, self.droppedFields = fieldMapping(fields, layer1, batch.layer2)
+
+        self.progressBar.setMaximum(batch.featureCount())
+        self.progressBar.setValue(0)
+        batch.buildIndex()
+        count = 0
+        chunk = []
+        for n, (f1, intersections) in enumerate(batch.intersections()):
+            for point, f2 in intersections:
+                f = QgsFeature()
+                f.setFields(fields)
+                f.initAttributes(fields.size())
+                sources = (f1, f2)
+                for i, source, idx in fieldMap:
+                    f[i] = sources[source][idx]
+                if transform is not None:
+                    point = transform.transform(point)
+                f.setGeometry(QgsGeometry().fromPoint(point))
+                chunk.append(f)
+            if len(chunk) >= chunkSize:
+                count += self.writeChunk(outputLayer, chunk)
+                chunk = []
+            self.progressBar.setValue(n+1)
+            QCoreApplication.processEvents()
+            if self.cancelled:
+                break
+        count += self.writeChunk(outputLayer, chunk)
+        return count
+
+    def writeChunk(self, layer, features):
+        if len(features) == 0:
+            return 0
+        layer.editBuffer().addFeatures(features)
+        layer.triggerRepaint()
+        return len(features)
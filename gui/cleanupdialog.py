@@ -0,0 +1,73 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+
+from PyQt4.QtCore import QCoreApplication
+from PyQt4.QtGui import QDialog
+from qgis.core import QgsMapLayerRegistry
+from qgis.gui import QgsMessageBar
+
+from ..qgissettingmanager import SettingDialog
+
+from ..core.mysettings import MySettings
+from ..core.cleanup import deleteObservations
+
+from ..ui.ui_cleanup import Ui_Cleanup
+
+
+class CleanupDialog(QDialog, Ui_Cleanup, SettingDialog):
+    def __init__(self, iface):
+        QDialog.__init__(self)
+        self.setupUi(self)
+        self.iface = iface
+        self.settings = MySettings()
+        SettingDialog.__init__(self, self.settings, False, True)
+
+    def accept(self):
+        types = []
+        if self.settings.value("cleanupDistances"):
+            types.append("distance")
+        if self.settings.value("cleanupOrientations"):
+            types.append("orientation")
+        extent = None
+        if self.settings.value("cleanupExtent"):
+            lineLayer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("memoryLineLayer"))
+            if lineLayer is not None:
+                mapRenderer = self.iface.mapCanvas().mapRenderer()
+                extent = mapRenderer.mapToLayerCoordinates(lineLayer, self.iface.mapCanvas().extent())
+        age = None
+        if self.settings.value("cleanupOlder"):
+            age = self.settings.value("cleanupAge")
+        count = 0
+        if len(types):
+            count = deleteObservations(self.iface, extent, types, age, self.settings.value("cleanupUsedOnly"))
+        self.iface.messageBar().pushMessage("Intersect It",
+                                            QCoreApplication.translate("IntersectIt", "%u observations erased.")
+                                            % count, QgsMessageBar.INFO, 3)
+        QDialog.accept(self)
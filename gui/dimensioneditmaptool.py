@@ -27,12 +27,16 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QgsMapLayerRegistry, QgsTolerance, QgsSnapper, QgsFeature, QgsFeatureRequest
+from qgis.core import QgsMapLayerRegistry, QgsTolerance, QgsSnapper
 from qgis.gui import QgsRubberBand, QgsMapTool, QgsMessageBar
 
 from ..core.arc import Arc
 from ..core.orientationline import OrientationLine
 from ..core.mysettings import MySettings
+from ..core.featurefetcher import fetchSnappedFeatures
+from ..engine.instrumentation import timing
+
+from hoverpipeline import HoverPipeline
 
 
 class DimensionEditMapTool(QgsMapTool):
@@ -48,6 +52,7 @@ class DimensionEditMapTool(QgsMapTool):
         if self.observationType not in ("Orientation", "Distance"):
             raise NameError("Wrong observation type")
         QgsMapTool.__init__(self, self.mapCanvas)
+        self.hover = HoverPipeline(self.hoverDimension, self.displayDimension, self.settings.value("hoverFrameBudget"))
 
     def activate(self):
         QgsMapTool.activate(self)
@@ -83,6 +88,7 @@ class DimensionEditMapTool(QgsMapTool):
         self.mapCanvas.unsetMapTool(self)
 
     def deactivate(self):
+        self.hover.clear()
         self.lineRubber.reset()
         layer = QgsMapLayerRegistry.instance().mapLayer(self.settings.value("dimension"+self.observationType+"Layer"))
         if layer is not None:
@@ -93,6 +99,7 @@ class DimensionEditMapTool(QgsMapTool):
         QgsMapTool.deactivate(self)
 
     def canvasPressEvent(self, mouseEvent):
+        self.hover.clear()
         feature = self.snapToDimensionLayer(mouseEvent.pos())
         if feature is None:
             return
@@ -114,6 +121,7 @@ class DimensionEditMapTool(QgsMapTool):
         if not self.editing:
             return
         self.editing = False
+        self.hover.clear()
         self.lineRubber.reset()
         point = self.map2layer(mouseEvent.pos())
         if point is None:
@@ -126,18 +134,26 @@ class DimensionEditMapTool(QgsMapTool):
         layer.triggerRepaint()
 
     def canvasMoveEvent(self, mouseEvent):
+        self.hover.push(mouseEvent.pos())
+
+    def hoverDimension(self, pos):
         if not self.editing:
-            feature = self.snapToDimensionLayer(mouseEvent.pos())
+            feature = self.snapToDimensionLayer(pos)
             if feature is None:
-                self.lineRubber.reset()
-                return
-            self.lineRubber.setToGeometry(feature.geometry(), self.snapLayer.mLayer)
+                return None, None
+            return feature.id(), feature.geometry()
         else:
-            point = self.map2layer(mouseEvent.pos())
+            point = self.map2layer(pos)
             if point is None:
-                return
+                return self.hover.hits, None
             self.drawObject.setPoint(point)
-            self.lineRubber.setToGeometry(self.drawObject.geometry(), self.snapLayer.mLayer)
+            return (point.x(), point.y()), self.drawObject.geometry()
+
+    def displayDimension(self, geometry):
+        if geometry is None:
+            self.lineRubber.reset()
+        else:
+            self.lineRubber.setToGeometry(geometry, self.snapLayer.mLayer)
 
     def map2layer(self, pos):
         point = self.toMapCoordinates(pos)
@@ -148,14 +164,13 @@ class DimensionEditMapTool(QgsMapTool):
         snapper.setSnapLayers([self.snapLayer])
         snapper.setSnapMode(QgsSnapper.SnapWithResultsWithinTolerances)
 
-        ok, snappingResults = snapper.snapPoint(pixPoint, [])
-        for result in snappingResults:
-            featureId = result.snappedAtGeometry
-            f = QgsFeature()
-            if self.snapLayer.mLayer.getFeatures(QgsFeatureRequest().setFilterFid(featureId)).nextFeature(f) is not False:
-                if self.observationType == "orientation":
-                    line = f.geometry().asPolyline()
-                    if len(line) != 2:
-                        continue
-                return f
+        with timing("snapping"):
+            ok, snappingResults = snapper.snapPoint(pixPoint, [])
+        # only the geometry of the dimension is needed
+        for f in fetchSnappedFeatures(snappingResults, []):
+            if self.observationType == "Orientation":
+                line = f.geometry().asPolyline()
+                if len(line) != 2:
+                    continue
+            return f
         return None
@@ -34,8 +34,10 @@ from qgis.gui import QgsRubberBand, QgsMapTool, QgsMapCanvasSnapper, QgsMessageB
 
 from ..core.mysettings import MySettings
 from ..core.distance import Distance
+from ..engine.instrumentation import timing
 
 from distancedialog import DistanceDialog
+from hoverpipeline import HoverPipeline
 
 
 class DistanceMapTool(QgsMapTool):
@@ -44,6 +46,7 @@ class DistanceMapTool(QgsMapTool):
         self.mapCanvas = iface.mapCanvas()
         self.settings = MySettings()
         QgsMapTool.__init__(self, self.mapCanvas)
+        self.hover = HoverPipeline(self.hoverSnap, self.displaySnap, self.settings.value("hoverFrameBudget"))
 
     def activate(self):
         QgsMapTool.activate(self)
@@ -80,6 +83,7 @@ class DistanceMapTool(QgsMapTool):
 
     def deactivate(self):
         self.iface.messageBar().popWidget(self.messageWidget)
+        self.hover.clear()
         self.rubber.reset()
         self.mapCanvas.layersChanged.disconnect(self.updateSnapperList)
         self.mapCanvas.scaleChanged.disconnect(self.updateSnapperList)
@@ -109,7 +113,15 @@ class DistanceMapTool(QgsMapTool):
             self.messageWidget.setText(message)
 
     def canvasMoveEvent(self, mouseEvent):
-        snappedPoint = self.snapToLayers(mouseEvent.pos())
+        self.hover.push(mouseEvent.pos())
+
+    def hoverSnap(self, pos):
+        snappedPoint = self.snapToLayers(pos)
+        if snappedPoint is None:
+            return None, None
+        return (snappedPoint.x(), snappedPoint.y()), snappedPoint
+
+    def displaySnap(self, snappedPoint):
         if snappedPoint is None:
             self.rubber.reset()
         else:
@@ -118,6 +130,7 @@ class DistanceMapTool(QgsMapTool):
     def canvasPressEvent(self, mouseEvent):
         if mouseEvent.button() != Qt.LeftButton:
             return
+        self.hover.clear()
         pixPoint = mouseEvent.pos()
         mapPoint = self.toMapCoordinates(pixPoint)
         #snap to layers
@@ -136,7 +149,8 @@ class DistanceMapTool(QgsMapTool):
             return initPoint
 
         if self.snapping == "project":
-            ok, snappingResults = QgsMapCanvasSnapper(self.mapCanvas).snapToBackgroundLayers(pixPoint, [])
+            with timing("snapping"):
+                ok, snappingResults = QgsMapCanvasSnapper(self.mapCanvas).snapToBackgroundLayers(pixPoint, [])
             self.displaySnapInfo(snappingResults)
             if ok == 0 and len(snappingResults) > 0:
                 return QgsPoint(snappingResults[0].snappedVertex)
@@ -149,7 +163,8 @@ class DistanceMapTool(QgsMapTool):
             snapper = QgsSnapper(self.mapCanvas.mapRenderer())
             snapper.setSnapLayers(self.snapperList)
             snapper.setSnapMode(QgsSnapper.SnapWithResultsWithinTolerances)
-            ok, snappingResults = snapper.snapPoint(pixPoint, [])
+            with timing("snapping"):
+                ok, snappingResults = snapper.snapPoint(pixPoint, [])
             self.displaySnapInfo(snappingResults)
             if ok == 0 and len(snappingResults) > 0:
                 return QgsPoint(snappingResults[0].snappedVertex)
@@ -0,0 +1,186 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import Qt, QCoreApplication
+from PyQt4.QtGui import QDialog, QListWidgetItem
+from qgis.core import QGis, QgsFeatureRequest, QgsMapLayerRegistry, QgsRasterLayer, QgsCoordinateTransform
+from qgis.gui import QgsMessageBar
+import numpy as np
+
+from ..qgiscombomanager import VectorLayerCombo
+
+from ..core.mysettings import MySettings
+from ..engine.dop import dopSurface
+
+from ..ui.ui_dop import Ui_Dop
+
+from surfacecanvasitem import SurfaceCanvasItem
+
+# number of columns of the grid, rows follow the canvas aspect
+gridWidth = 200
+# colors of the scale, from good to bad geometry
+scaleColors = np.array([(26, 150, 65), (255, 255, 191), (215, 25, 28)], dtype=np.float64)
+scaleAlpha = 140
+
+
+def dopColors(dop):
+    # log scale between the 5th and 95th percentiles of the finite values
+    # returns the ARGB pixels and the bounds of the scale
+    finite = np.isfinite(dop)
+    if not finite.any():
+        return np.zeros(dop.shape, dtype=np.uint32), None, None
+    low, high = np.percentile(dop[finite], (5, 95))
+    if high <= low:
+        high = low * 1.01 + 1e-12
+    t = np.zeros(dop.shape)
+    t[finite] = (np.log(np.maximum(dop[finite], low)) - np.log(low)) / (np.log(high) - np.log(low))
+    t = np.clip(t, 0, 1) * (len(scaleColors) - 1)
+    i = np.minimum(t.astype(np.int64), len(scaleColors) - 2)
+    f = (t - i)[..., np.newaxis]
+    rgb = (scaleColors[i] * (1 - f) + scaleColors[i + 1] * f).astype(np.uint32)
+    argb = (scaleAlpha << 24) | (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    # no intersection possible: fully transparent
+    argb[~finite] = 0
+    return argb.astype(np.uint32), low, high
+
+
+class DopDialog(QDialog, Ui_Dop):
+    def __init__(self, iface):
+        QDialog.__init__(self, iface.mainWindow())
+        self.setupUi(self)
+        self.iface = iface
+        self.mapCanvas = iface.mapCanvas()
+        self.settings = MySettings()
+        self.dop = None
+        self.extent = None
+
+        self.distancePrecision.setValue(self.settings.value("obsDefaultPrecisionDistance"))
+        self.orientationPrecision.setValue(self.settings.value("obsDefaultPrecisionOrientation"))
+
+        self.surface = SurfaceCanvasItem(self.mapCanvas)
+        self.stationLayerCombo = VectorLayerCombo(self.stationLayer, lambda: self.settings.value("memoryPointLayer"),
+                                                  {"groupLayers": False, "hasGeometry": True,
+                                                   "geomType": QGis.Point})
+
+        self.stationLayer.currentIndexChanged.connect(self.loadStations)
+        self.stationList.itemChanged.connect(self.updateSurface)
+        self.distanceCheckBox.toggled.connect(self.updateSurface)
+        self.orientationCheckBox.toggled.connect(self.updateSurface)
+        self.distancePrecision.valueChanged.connect(self.updateSurface)
+        self.orientationPrecision.valueChanged.connect(self.updateSurface)
+        self.mapCanvas.extentsChanged.connect(self.updateSurface)
+        self.saveButton.clicked.connect(self.saveRaster)
+        self.finished.connect(self.cleanSurface)
+
+        self.loadStations()
+
+    def cleanSurface(self, dummy=0):
+        self.mapCanvas.extentsChanged.disconnect(self.updateSurface)
+        self.mapCanvas.scene().removeItem(self.surface)
+
+    def loadStations(self, dummy=None):
+        # stations are listed in map coordinates, they are all checked
+        self.stationList.blockSignals(True)
+        self.stationList.clear()
+        layer = self.stationLayerCombo.getLayer()
+        if layer is not None:
+            transform = QgsCoordinateTransform(layer.crs(), self.mapCanvas.mapRenderer().destinationCrs())
+            request = QgsFeatureRequest().setSubsetOfAttributes([])
+            for f in layer.getFeatures(request):
+                if f.geometry() is None:
+                    continue
+                point = transform.transform(f.geometry().asPoint())
+                item = QListWidgetItem("%u: %.2f, %.2f" % (f.id(), point.x(), point.y()))
+                item.setData(Qt.UserRole, (point.x(), point.y()))
+                item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked)
+                self.stationList.addItem(item)
+        self.stationList.blockSignals(False)
+        self.updateSurface()
+
+    def stations(self):
+        stations = []
+        for r in range(self.stationList.count()):
+            item = self.stationList.item(r)
+            if item.checkState() == Qt.Checked:
+                stations.append(item.data(Qt.UserRole))
+        return stations
+
+    def updateSurface(self, dummy=None):
+        stations = self.stations()
+        distances = self.distanceCheckBox.isChecked()
+        orientations = self.orientationCheckBox.isChecked()
+        if len(stations) == 0 or not (distances or orientations):
+            self.dop = None
+            self.surface.clear()
+            self.scaleLabel.setText(QCoreApplication.translate("IntersectIt", "Select at least one station."))
+            return
+        extent = self.mapCanvas.extent()
+        nx = gridWidth
+        ny = max(int(round(gridWidth * extent.height() / extent.width())), 1)
+        self.dop = dopSurface(stations, extent.xMinimum(), extent.yMinimum(), extent.xMaximum(),
+                              extent.yMaximum(), nx, ny, distances, orientations,
+                              self.distancePrecision.value(), self.orientationPrecision.value())
+        self.extent = extent
+        pixels, low, high = dopColors(self.dop)
+        self.surface.setPixels(pixels, extent)
+        if low is None:
+            self.scaleLabel.setText(QCoreApplication.translate("IntersectIt",
+                                                               "No intersection is possible with these stations."))
+        else:
+            self.scaleLabel.setText(QCoreApplication.translate("IntersectIt",
+                                                               "Expected precision of an intersection: "
+                                                               "%.3f (green) to %.3f (red) map units")
+                                    % (low, high))
+
+    def saveRaster(self):
+        # write the current surface in an in-memory GeoTIFF and add it as a raster layer
+        if self.dop is None:
+            return
+        try:
+            from osgeo import gdal
+        except ImportError:
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                QCoreApplication.translate("IntersectIt", "GDAL is not available."),
+                                                QgsMessageBar.WARNING, 3)
+            return
+        ny, nx = self.dop.shape
+        path = "/vsimem/intersectit_dop_%u.tif" % id(self.dop)
+        dataset = gdal.GetDriverByName("GTiff").Create(path, nx, ny, 1, gdal.GDT_Float32)
+        # the grid values are sampled at the cell centers
+        dx = self.extent.width() / max(nx - 1, 1)
+        dy = self.extent.height() / max(ny - 1, 1)
+        dataset.SetGeoTransform((self.extent.xMinimum() - dx/2, dx, 0, self.extent.yMaximum() + dy/2, 0, -dy))
+        dataset.SetProjection(self.mapCanvas.mapRenderer().destinationCrs().toWkt())
+        band = dataset.GetRasterBand(1)
+        band.SetNoDataValue(-1)
+        band.WriteArray(np.where(np.isfinite(self.dop), self.dop, -1).astype(np.float32))
+        dataset = None
+        layer = QgsRasterLayer(path, "IntersectIt DOP")
+        QgsMapLayerRegistry.instance().addMapLayer(layer)
@@ -0,0 +1,77 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QObject, QTimer, QPoint
+
+
+class HoverPipeline(QObject):
+    # Coalesces mouse move events of a map tool so that at most one position is processed per frame.
+    #   compute(pos) returns a (hits, result) tuple, hits being a hashable key of what has been found
+    #   apply(result) updates the rubber band, it is skipped if the hits did not change since last time
+    def __init__(self, compute, apply, frameBudget=16):
+        QObject.__init__(self)
+        self.compute = compute
+        self.apply = apply
+        self.pos = None
+        # unknown hits, next result will always be applied
+        self.hits = object()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(frameBudget)
+        self.timer.timeout.connect(self.process)
+
+    def push(self, pos):
+        # only keep the last position, it is processed when the frame budget expires
+        self.pos = QPoint(pos)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def process(self):
+        if self.pos is None:
+            return
+        pos = self.pos
+        self.pos = None
+        # compute runs in the GUI thread: no newer position can arrive before it returns
+        hits, result = self.compute(pos)
+        if hits == self.hits:
+            return
+        self.hits = hits
+        self.apply(result)
+
+    def flush(self):
+        # process the pending position right away
+        if self.timer.isActive():
+            self.timer.stop()
+        self.process()
+
+    def clear(self):
+        # forget pending position and last hits (e.g. when the rubber band is modified elsewhere)
+        self.timer.stop()
+        self.pos = None
+        self.hits = object()
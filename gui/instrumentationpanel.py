@@ -0,0 +1,119 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import Qt, QTimer, QCoreApplication
+from PyQt4.QtGui import QDockWidget, QTableWidgetItem, QFileDialog
+
+from ..core.mysettings import MySettings
+from ..engine import instrumentation, telemetry
+
+from ..ui.ui_instrumentation import Ui_Instrumentation
+
+# refresh interval of the table in ms
+refreshInterval = 1000
+
+
+class InstrumentationPanel(QDockWidget, Ui_Instrumentation):
+    def __init__(self, iface):
+        QDockWidget.__init__(self, iface.mainWindow())
+        self.setupUi(self)
+        self.setObjectName("IntersectItInstrumentation")
+        self.iface = iface
+        self.settings = MySettings()
+
+        self.instrumentationEnabled.setChecked(self.settings.value("instrumentationEnabled"))
+        self.instrumentationEnabled.toggled.connect(self.enable)
+        self.resetButton.clicked.connect(self.reset)
+        self.exportButton.clicked.connect(self.export)
+        self.exportTelemetryButton.clicked.connect(self.exportTelemetry)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(refreshInterval)
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.updateTimer)
+
+    def enable(self, enabled):
+        self.settings.setValue("instrumentationEnabled", enabled)
+        instrumentation.setEnabled(enabled)
+
+    def updateTimer(self, visible):
+        # only refresh the table while it is shown
+        if visible:
+            self.refresh()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def refresh(self):
+        rows = instrumentation.rows()
+        self.statisticsTable.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                if value is None:
+                    text = ""
+                elif c == 0:
+                    text = value
+                elif c == 1:
+                    text = "%u" % value
+                else:
+                    text = "%.3f" % value
+                item = QTableWidgetItem(text)
+                if c > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.statisticsTable.setItem(r, c, item)
+        self.statisticsTable.resizeColumnsToContents()
+        self.refreshSolverSummary()
+
+    def refreshSolverSummary(self):
+        summary = telemetry.session.summary().get("all")
+        if summary is None:
+            self.solverSummary.setText(QCoreApplication.translate("IntersectIt", "No least-squares adjustment yet."))
+            return
+        self.solverSummary.setText(QCoreApplication.translate("IntersectIt",
+                                                              "%u adjustments: %.1f iterations on average (max %u), "
+                                                              "%u reached the maximum, %u singular")
+                                   % (summary["solves"], summary["meanIterations"], summary["maxIterations"],
+                                      summary["max iterations"], summary["singular"]))
+
+    def reset(self):
+        instrumentation.reset()
+        telemetry.session.clear()
+        self.refresh()
+
+    def export(self):
+        path = QFileDialog.getSaveFileName(self, QCoreApplication.translate("IntersectIt", "Export timings"),
+                                           "intersectit_timings.csv", "CSV (*.csv)")
+        if path:
+            instrumentation.exportCsv(path)
+
+    def exportTelemetry(self):
+        path = QFileDialog.getSaveFileName(self, QCoreApplication.translate("IntersectIt", "Export solver telemetry"),
+                                           "intersectit_solver.csv", "CSV (*.csv)")
+        if path:
+            telemetry.session.exportCsv(path)
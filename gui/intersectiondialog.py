@@ -28,18 +28,24 @@
 #---------------------------------------------------------------------
 
 from PyQt4.QtCore import QCoreApplication
-from PyQt4.QtGui import QDialog
-from qgis.core import QGis, QgsGeometry
+from PyQt4.QtGui import QDialog, QColor
+from qgis.core import QGis, QgsGeometry, QgsRectangle
 from qgis.gui import QgsRubberBand
 
 from ..qgissettingmanager import SettingDialog
 
 from ..core.mysettings import MySettings
-from ..core.leastsquares import LeastSquares
-from ..core.intersections import TwoCirclesIntersection, TwoOrientationIntersection, DistanceOrientationIntersection
+from ..core.qgisadapter import toPoint, toQgsPoint
+from ..engine.uncertainty import ellipsePoints, misclosureSurface, likelihood
 
 from ..ui.ui_intersection import Ui_Intersection
 
+from intersectionthread import IntersectionThread
+from surfacecanvasitem import SurfaceCanvasItem
+
+# resolution of the likelihood surface
+surfaceSize = 150
+
 
 class IntersectionDialog(QDialog, Ui_Intersection, SettingDialog):
     def __init__(self, iface, observations, initPoint):
@@ -50,32 +56,76 @@ class IntersectionDialog(QDialog, Ui_Intersection, SettingDialog):
         self.processButton.clicked.connect(self.doIntersection)
         self.okButton.clicked.connect(self.accept)
         self.finished.connect(self.resetRubber)
+        self.finished.connect(self.cancelIntersection)
+        self.finished.connect(self.waitThreads)
         self.initPoint = initPoint
 
         self.observations = []
         self.solution = None
         self.report = ""
+        self.intersection = None
+        # running computation and the cancelled ones which are not finished yet
+        self.thread = None
+        self.threads = []
 
         self.rubber = QgsRubberBand(iface.mapCanvas(), QGis.Point)
         self.rubber.setColor(self.settings.value("rubberColor"))
         self.rubber.setIcon(self.settings.value("rubberIcon"))
         self.rubber.setIconSize(self.settings.value("rubberSize"))
+        self.ellipseRubber = QgsRubberBand(iface.mapCanvas(), QGis.Polygon)
+        self.ellipseRubber.setColor(self.settings.value("rubberColor"))
+        self.ellipseRubber.setWidth(1)
+
+        # likelihood surface, around the initial point until a solution is found
+        self.mapCanvas = iface.mapCanvas()
+        self.surface = SurfaceCanvasItem(self.mapCanvas, QColor(255, 0, 0, 160))
+        self.surfaceCenter = initPoint
+        self.surfaceHalfSize = 100 * self.mapCanvas.mapUnitsPerPixel()
+        self.likelihoodSurface.toggled.connect(self.likelihoodSurfaceToggled)
 
         self.observationTableWidget.displayRows(observations)
-        self.observationTableWidget.itemChanged.connect(self.disbaleOKbutton)
+        self.observationTableWidget.observationsChanged.connect(self.disbaleOKbutton)
+        self.observationTableWidget.observationsChanged.connect(self.cancelIntersection)
+        self.observationTableWidget.observationsChanged.connect(self.updateSurface)
         self.doIntersection()
 
     def resetRubber(self, dummy=0):
         self.rubber.reset()
+        self.ellipseRubber.reset()
+        self.mapCanvas.scene().removeItem(self.surface)
+
+    def likelihoodSurfaceToggled(self, checked):
+        self.settings.setValue("likelihoodSurface", checked)
+        self.updateSurface()
+
+    def updateSurface(self):
+        # evaluated on a grid for all the checked observations, fast enough to follow the edits
+        observations = self.observationTableWidget.getObservations()
+        if not self.likelihoodSurface.isChecked() or len(observations) < 2:
+            self.surface.clear()
+            return
+        x, y, d = self.surfaceCenter.x(), self.surfaceCenter.y(), self.surfaceHalfSize
+        values = likelihood(misclosureSurface(observations, x-d, y-d, x+d, y+d, surfaceSize, surfaceSize))
+        self.surface.setSurface(values, QgsRectangle(x-d, y-d, x+d, y+d))
 
     def disbaleOKbutton(self):
         self.okButton.setDisabled(True)
 
+    def cancelIntersection(self, dummy=None):
+        # the result of the running computation is not relevant anymore
+        if self.thread is not None:
+            self.thread.cancel()
+            self.thread = None
+
     def doIntersection(self):
+        self.cancelIntersection()
         self.observations = []
         self.solution = None
         self.report = ""
+        self.intersection = None
         self.rubber.reset()
+        self.ellipseRubber.reset()
+        self.okButton.setEnabled(False)
 
         observations = self.observationTableWidget.getObservations()
         nObs = len(observations)
@@ -84,31 +134,58 @@ class IntersectionDialog(QDialog, Ui_Intersection, SettingDialog):
                                                                   "No intersection can be done "
                                                                   "with less than 2 observations."))
             return
-        if nObs == 2:
-            if observations[0]["type"] == "distance" and observations[1]["type"] == "distance":
-                intersection = TwoCirclesIntersection(observations, self.initPoint)
-            elif observations[0]["type"] == "orientation" and observations[1]["type"] == "orientation":
-                intersection = TwoOrientationIntersection(observations)
-            else:
-                intersection = DistanceOrientationIntersection(observations, self.initPoint)
-        else:
-            maxIter = self.advancedIntersecLSmaxIteration.value()
-            threshold = self.advancedIntersecLSconvergeThreshold.value()
-            intersection = LeastSquares(observations, self.initPoint, maxIter, threshold)
 
+        self.reportBrowser.setText(QCoreApplication.translate("IntersectIt", "Processing..."))
+        maxIter = self.advancedIntersecLSmaxIteration.value()
+        threshold = self.advancedIntersecLSconvergeThreshold.value()
+        gridSearchBudget = None
+        if self.advancedIntersecGridSearch.isChecked():
+            gridSearchBudget = self.settings.value("advancedIntersecGridSearchBudget") / 1000.
+        self.thread = IntersectionThread(observations, self.initPoint, maxIter, threshold, gridSearchBudget)
+        self.thread.solved.connect(self.intersectionSolved)
+        self.thread.finished.connect(self.threadFinished)
+        self.threads.append(self.thread)
+        self.thread.start()
+
+    def intersectionSolved(self, thread):
+        # drop the results of cancelled computations
+        if thread is not self.thread or thread.isCancelled():
+            return
+        self.thread = None
+        if thread.error is not None:
+            self.reportBrowser.setText(QCoreApplication.translate("IntersectIt", "Intersection failed: %s")
+                                       % thread.error)
+            return
+
+        intersection = thread.intersection
         self.reportBrowser.setText(intersection.report)
 
         if intersection.solution is not None:
             self.solution = intersection.solution
-            self.observations = observations
+            self.observations = thread.observations
             self.report = intersection.report
+            self.intersection = intersection
             self.okButton.setEnabled(True)
             self.rubber.setToGeometry(QgsGeometry().fromPoint(self.solution), None)
-
-
-
-
-
-
-
-
+            ellipse = getattr(intersection, "ellipse", None)
+            if ellipse is not None:
+                a, b, azimuth = ellipse
+                points = [toQgsPoint(p) for p in ellipsePoints(toPoint(self.solution), a, b, azimuth)]
+                self.ellipseRubber.setToGeometry(QgsGeometry().fromPolygon([points]), None)
+                self.surfaceHalfSize = max(3*a, 30 * self.mapCanvas.mapUnitsPerPixel())
+            self.surfaceCenter = self.solution
+            self.updateSurface()
+
+    def threadFinished(self):
+        # keep a reference to the threads until they are finished
+        thread = self.sender()
+        thread.wait()
+        if thread in self.threads:
+            self.threads.remove(thread)
+
+    def waitThreads(self, dummy=None):
+        # cancelled computations stop at next iteration, wait for them before the dialog is deleted
+        for thread in self.threads:
+            thread.cancel()
+            thread.wait()
+        self.threads = []
@@ -0,0 +1,63 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QThread, pyqtSignal
+
+from ..core.solver import intersect
+
+
+class IntersectionThread(QThread):
+    # computes an intersection outside of the GUI thread
+    # solved is emitted with the thread itself once finished (or cancelled)
+    solved = pyqtSignal(object)
+
+    def __init__(self, observations, initPoint, maxIter, threshold, gridSearchBudget=None):
+        QThread.__init__(self)
+        self.observations = observations
+        self.initPoint = initPoint
+        self.maxIter = maxIter
+        self.threshold = threshold
+        self.gridSearchBudget = gridSearchBudget
+        self.cancelled = False
+        self.intersection = None
+        self.error = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def isCancelled(self):
+        return self.cancelled
+
+    def run(self):
+        try:
+            self.intersection = intersect(self.observations, self.initPoint, self.maxIter, self.threshold,
+                                          self.isCancelled, self.gridSearchBudget)
+        except Exception as e:
+            self.error = str(e)
+        self.solved.emit(self)
@@ -27,7 +27,7 @@
 #
 #---------------------------------------------------------------------
 
-from PyQt4.QtGui import QDialog
+from PyQt4.QtGui import QDialog, QMessageBox
 from qgis.core import QGis
 
 from ..qgissettingmanager import SettingDialog
@@ -46,9 +46,16 @@ class MySettingsDialog(QDialog, Ui_Settings, SettingDialog):
         self.obsDistanceSnapping.setItemData(0, "no")
         self.obsDistanceSnapping.setItemData(1, "project")
         self.obsDistanceSnapping.setItemData(2, "all")
+        self.observationStorage.setItemData(0, "memory")
+        self.observationStorage.setItemData(1, "spatialite")
+        self.advancedIntersectionReportFormat.setItemData(0, "text")
+        self.advancedIntersectionReportFormat.setItemData(1, "json")
+        self.advancedIntersectionReportFormat.setItemData(2, "compressed")
 
         SettingDialog.__init__(self, self.settings)
 
+        self.calibratePrecisions.clicked.connect(self.calibrate)
+
         # distance combos
         self.distanceLayerCombo = VectorLayerCombo(self.dimensionDistanceLayer,
                                                    lambda: self.settings.value("dimensionDistanceLayer"),
@@ -84,3 +91,19 @@ class MySettingsDialog(QDialog, Ui_Settings, SettingDialog):
                                                                 "geomType": QGis.Point})
         self.reportFieldCombo = FieldCombo(self.reportField, self.advancedIntersectionLayerCombo,
                                            lambda: self.settings.value("reportField"))
+
+    def calibrate(self):
+        # Helmert variance components over the least-squares solutions cached during the session
+        from ..engine.solutioncache import solutions
+        from ..engine.variancecomponents import VarianceComponents
+        varianceComponents = VarianceComponents([solution.normals for solution in solutions.values()])
+        if not varianceComponents.converged:
+            QMessageBox.warning(self, "Intersect It", "The default precisions could not be calibrated: "
+                                                      "not enough advanced intersections with redundant observations"
+                                                      " in this session.")
+            return
+        self.obsDefaultPrecisionDistance.setValue(
+            varianceComponents.calibrated("distance", self.obsDefaultPrecisionDistance.value()))
+        self.obsDefaultPrecisionOrientation.setValue(
+            varianceComponents.calibrated("orientation", self.obsDefaultPrecisionOrientation.value()))
+        QMessageBox.information(self, "Intersect It", varianceComponents.report())
@@ -26,62 +26,133 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 #---------------------------------------------------------------------
-from PyQt4.QtCore import Qt
-from PyQt4.QtGui import QTableWidget, QTableWidgetItem, QAbstractItemView, QDoubleSpinBox, QItemDelegate
+from PyQt4.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt4.QtGui import QTableView, QAbstractItemView, QDoubleSpinBox, QItemDelegate, QAction, QHeaderView
+import numpy as np
 
+from ..engine.observations import featureDtype, packFeatures
+
+
+class ObservationModel(QAbstractTableModel):
+    # observations are kept in a packed array, only the visible rows are ever read by the view
+    headers = ("Type", "Observation", "Precision")
+
+    def __init__(self, parent=None):
+        QAbstractTableModel.__init__(self, parent)
+        self.observations = np.zeros(0, dtype=featureDtype)
+        self.enabled = np.zeros(0, dtype=bool)
+
+    def setObservations(self, features):
+        self.beginResetModel()
+        self.observations = packFeatures(features)
+        self.enabled = np.ones(len(self.observations), dtype=bool)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.observations)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 3
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def flags(self, index):
+        if index.column() == 0:
+            return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+        if index.column() == 2:
+            return Qt.ItemIsEnabled | Qt.ItemIsEditable
+        return Qt.ItemIsEnabled
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r, c = index.row(), index.column()
+        if c == 0:
+            if role == Qt.DisplayRole:
+                return self.observations["type"][r]
+            if role == Qt.CheckStateRole:
+                return Qt.Checked if self.enabled[r] else Qt.Unchecked
+        elif c == 1:
+            if role == Qt.DisplayRole:
+                return "%.4f" % self.observations["observation"][r]
+        elif c == 2:
+            if role == Qt.DisplayRole:
+                return "%.4f" % self.observations["precision"][r]
+            if role == Qt.EditRole:
+                return float(self.observations["precision"][r])
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        r, c = index.row(), index.column()
+        if c == 0 and role == Qt.CheckStateRole:
+            self.enabled[r] = value == Qt.Checked
+        elif c == 2 and role == Qt.EditRole:
+            self.observations["precision"][r] = float(value)
+        else:
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+    def setAllChecked(self, checked):
+        # bulk check, a single change is notified
+        if len(self.observations) == 0:
+            return
+        self.enabled[:] = checked
+        self.dataChanged.emit(self.index(0, 0), self.index(len(self.observations) - 1, 0))
+
+    def checkedObservations(self):
+        # packed array of the checked observations, as given to the solver
+        return self.observations[self.enabled]
+
+
+class ObservationTable(QTableView):
+    # emitted when an observation is checked, unchecked or its precision edited
+    observationsChanged = pyqtSignal()
 
-class ObservationTable(QTableWidget):
     def __init__(self, parent=None):
-        QTableWidget.__init__(self, parent)
+        QTableView.__init__(self, parent)
 
         self.setSelectionMode(QAbstractItemView.SingleSelection)
         self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.verticalHeader().setVisible(False)
+        self.verticalHeader().setResizeMode(QHeaderView.Fixed)
         self.verticalHeader().setDefaultSectionSize(25)
 
-        headersText = ("Type", "Observation", "Precision")
-        for c, headerText in enumerate(headersText):
-            self.insertColumn(c)
-            item = QTableWidgetItem(headerText)
-            self.setHorizontalHeaderItem(c, item)
+        self.observationModel = ObservationModel(self)
+        self.setModel(self.observationModel)
+        self.observationModel.dataChanged.connect(self.observationsChanged)
 
         spinDelegate = SpinBoxDelegate()
         self.setItemDelegateForColumn(2, spinDelegate)
 
+        # bulk check / uncheck
+        self.setContextMenuPolicy(Qt.ActionsContextMenu)
+        checkAllAction = QAction("Check all", self)
+        checkAllAction.triggered.connect(self.checkAll)
+        self.addAction(checkAllAction)
+        uncheckAllAction = QAction("Uncheck all", self)
+        uncheckAllAction.triggered.connect(self.uncheckAll)
+        self.addAction(uncheckAllAction)
+
     def displayRows(self, observations):
-        self.clearContents()
-        for r in range(self.rowCount() - 1, -1, -1):
-            self.removeRow(r)
-        for r, obs in enumerate(observations):
-            # obs is a QgsFeature, translate it to a dict
-            dataDict = {"type": obs["type"], "x": obs["x"], "y": obs["y"],
-                        "observation": obs["observation"], "precision": obs["precision"]}
-            self.insertRow(r)
-            # type
-            item = QTableWidgetItem(obs["type"])
-            item.setData(Qt.UserRole, dataDict)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked)
-            self.setItem(r, 0, item)
-            # observation
-            item = QTableWidgetItem("%.4f" % obs["observation"])
-            item.setFlags(Qt.ItemIsEnabled)
-            self.setItem(r, 1, item)
-            # precision
-            item = QTableWidgetItem("%.4f" % obs["precision"])
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsEditable)
-            self.setItem(r, 2, item)
+        self.observationModel.setObservations(observations)
         self.adjustSize()
 
+    def checkAll(self):
+        self.observationModel.setAllChecked(True)
+
+    def uncheckAll(self):
+        self.observationModel.setAllChecked(False)
+
     def getObservations(self):
-        observations = []
-        for r in range(self.rowCount()):
-            item = self.item(r, 0)
-            if item.checkState() == Qt.Checked:
-                obs = item.data(Qt.UserRole)
-                obs["precision"] = float(self.item(r, 2).text())
-                observations.append(obs)
-        return observations
+        return self.observationModel.checkedObservations()
 
 
 class SpinBoxDelegate(QItemDelegate):
@@ -28,14 +28,17 @@
 #---------------------------------------------------------------------
 
 from PyQt4.QtCore import Qt
-from qgis.core import QGis, QgsMapLayer, QgsTolerance, QgsSnapper, QgsFeature, QgsFeatureRequest
+from qgis.core import QGis, QgsMapLayer, QgsTolerance, QgsSnapper
 from qgis.gui import QgsRubberBand, QgsMapTool
 
 from ..core.orientation import Orientation
 from ..core.mysettings import MySettings
 from ..core.isfeaturerendered import isFeatureRendered
+from ..core.featurefetcher import fetchSnappedFeatures
+from ..engine.instrumentation import timing
 
 from orientationdialog import OrientationDialog
+from hoverpipeline import HoverPipeline
 
 
 class OrientationMapTool(QgsMapTool):
@@ -45,6 +48,8 @@ class OrientationMapTool(QgsMapTool):
         self.canvas = iface.mapCanvas()
         self.rubber = QgsRubberBand(self.canvas)
         QgsMapTool.__init__(self, self.canvas)
+        self.hover = HoverPipeline(self.hoverOrientation, self.displayOrientation,
+                                   self.settings.value("hoverFrameBudget"))
 
     def activate(self):
         QgsMapTool.activate(self)
@@ -52,17 +57,27 @@ class OrientationMapTool(QgsMapTool):
         self.rubber.setColor(self.settings.value("rubberColor"))
 
     def deactivate(self):
+        self.hover.clear()
         self.rubber.reset()
         QgsMapTool.deactivate(self)
 
     def canvasMoveEvent(self, mouseEvent):
-        orientation = self.getOrientation(mouseEvent.pos())
+        self.hover.push(mouseEvent.pos())
+
+    def hoverOrientation(self, pos):
+        orientation = self.getOrientation(pos)
+        if orientation is None:
+            return None, None
+        return (orientation.point.x(), orientation.point.y(), orientation.observation), orientation
+
+    def displayOrientation(self, orientation):
         if orientation is None:
             self.rubber.reset()
         else:
             self.rubber.setToGeometry(orientation.geometry(), None)
 
     def canvasPressEvent(self, mouseEvent):
+        self.hover.clear()
         if mouseEvent.button() != Qt.LeftButton:
             self.rubber.reset()
             return
@@ -98,13 +113,15 @@ class OrientationMapTool(QgsMapTool):
         snapper.setSnapLayers(snapperList)
         snapper.setSnapMode(QgsSnapper.SnapWithOneResult)
 
-        f = QgsFeature()
-        ok, snappingResults = snapper.snapPoint(pixPoint, [])
+        with timing("snapping"):
+            ok, snappingResults = snapper.snapPoint(pixPoint, [])
         if ok == 0:
+            # the orientation is computed from the snapped segment, the geometry is not needed
+            features = fetchSnappedFeatures(snappingResults, [], geometry=False, rendering=True)
+            rendered = set([(f.layer.id(), f.id()) for f in features
+                            if isFeatureRendered(self.canvas, f.layer, f)])
             for result in snappingResults:
-                if result.layer.getFeatures(QgsFeatureRequest().setFilterFid(result.snappedAtGeometry)).nextFeature(f) is False:
-                    continue
-                if not isFeatureRendered(self.canvas, result.layer, f):
+                if (result.layer.id(), result.snappedAtGeometry) not in rendered:
                     continue
                 vertices = (result.afterVertex, result.beforeVertex)
                 po = result.snappedVertex
@@ -27,11 +27,19 @@
 #
 #---------------------------------------------------------------------
 
-from qgis.core import QGis, QgsFeatureRequest, QgsFeature, QgsPoint, QgsGeometry, QgsMapLayerRegistry, QgsMapLayer, QgsTolerance, QgsSnapper
+from qgis.core import QGis, QgsFeature, QgsPoint, QgsGeometry, QgsMapLayerRegistry, QgsMapLayer, \
+    QgsTolerance, QgsSnapper, QgsRectangle
 from qgis.gui import QgsMapTool, QgsRubberBand, QgsMessageBar
 
 from ..core.mysettings import MySettings
 from ..core.isfeaturerendered import isFeatureRendered
+from ..core.linearintersection import linearGeometry, clipToWindow, intersectionPoints
+from ..core.featurefetcher import fetchSnappedFeatures
+from ..core.writebuffer import WriteBuffer
+from ..engine.instrumentation import timing
+from ..engine.intersections import closestPoint
+
+from hoverpipeline import HoverPipeline
 
 
 class SimpleIntersectionMapTool(QgsMapTool):
@@ -41,9 +49,13 @@ class SimpleIntersectionMapTool(QgsMapTool):
         QgsMapTool.__init__(self, self.mapCanvas)
         self.settings = MySettings()
         self.rubber = QgsRubberBand(self.mapCanvas)
+        self.hover = HoverPipeline(self.hoverFeatures, self.displayFeatures, self.settings.value("hoverFrameBudget"))
+        self.writeBuffer = WriteBuffer(iface)
 
     def deactivate(self):
+        self.hover.clear()
         self.rubber.reset()
+        self.writeBuffer.flush()
         self.mapCanvas.layersChanged.disconnect(self.updateSnapperList)
         self.mapCanvas.scaleChanged.disconnect(self.updateSnapperList)
         QgsMapTool.deactivate(self)
@@ -76,12 +88,20 @@ class SimpleIntersectionMapTool(QgsMapTool):
                         self.snapperList.append(snapLayer)
 
     def canvasMoveEvent(self, mouseEvent):
+        self.hover.push(mouseEvent.pos())
+
+    def hoverFeatures(self, pos):
+        features = self.getFeatures(pos)
+        return tuple((f.layer.id(), f.id()) for f in features), features
+
+    def displayFeatures(self, features):
         # put the observations within tolerance in the rubber band
         self.rubber.reset()
-        for f in self.getFeatures(mouseEvent.pos()):
+        for f in features:
             self.rubber.addGeometry(f.geometry(), None)
 
     def canvasPressEvent(self, mouseEvent):
+        self.hover.clear()
         self.rubber.reset()
         pos = mouseEvent.pos()
         features = self.getFeatures(pos)
@@ -104,59 +124,56 @@ class SimpleIntersectionMapTool(QgsMapTool):
         f.setFields(initFields)
         f.initAttributes(initFields.size())
         f.setGeometry(QgsGeometry().fromPoint(intersectionP))
-        layer.editBuffer().addFeature(f)
-        layer.triggerRepaint()
+        self.writeBuffer.add(layer, [f], editBuffer=True)
 
     def getFeatures(self, pixPoint):
         # do the snapping
         snapper = QgsSnapper(self.mapCanvas.mapRenderer())
         snapper.setSnapLayers(self.snapperList)
         snapper.setSnapMode(QgsSnapper.SnapWithResultsWithinTolerances)
-        ok, snappingResults = snapper.snapPoint(pixPoint, [])
-        # output snapped features
-        features = []
-        alreadyGot = []
-        for result in snappingResults:
-            featureId = result.snappedAtGeometry
-            f = QgsFeature()
-            if (result.layer.id(), featureId) not in alreadyGot:
-                if result.layer.getFeatures(QgsFeatureRequest().setFilterFid(featureId)).nextFeature(f) is False:
-                    continue
-                if not isFeatureRendered(self.mapCanvas, result.layer, f):
-                    continue
-                features.append(QgsFeature(f))
-                features[-1].layer = result.layer
-                alreadyGot.append((result.layer.id(), featureId))
-        return features
+        with timing("snapping"):
+            ok, snappingResults = snapper.snapPoint(pixPoint, [])
+        # output snapped and rendered features, only the geometry is needed
+        features = fetchSnappedFeatures(snappingResults, [], rendering=True)
+        return [f for f in features if isFeatureRendered(self.mapCanvas, f.layer, f)]
 
     def intersection(self, features, pos):
+        mousePoint = self.toMapCoordinates(pos)
+        # first, only intersect the parts of the features which are close to the cursor
+        radius = self.searchRadius()
+        window = QgsRectangle(mousePoint.x()-radius, mousePoint.y()-radius,
+                              mousePoint.x()+radius, mousePoint.y()+radius)
+        geometries = [clipToWindow(feature.geometry(), window) for feature in features]
+        intersections = [point for point in self.allIntersections(geometries)
+                         if mousePoint.sqrDist(point) <= radius*radius]
+        # if nothing has been found within the radius, a closer intersection can not exist outside the window
+        # so fall back on the full geometries
+        if len(intersections) == 0:
+            geometries = [linearGeometry(feature.geometry()) for feature in features]
+            intersections = self.allIntersections(geometries)
+        if len(intersections) == 0:
+            return QgsPoint(0, 0)
+        return closestPoint(mousePoint, intersections)
+
+    def allIntersections(self, geometries):
         # try all the combinations
-        nFeat = len(features)
+        nGeom = len(geometries)
         intersections = []
-        for i in range(nFeat-1):
-            for j in range(i+1,nFeat):
-                intersection = features[i].geometry().intersection(features[j].geometry())
-                intersectionMP = intersection.asMultiPoint()
-                intersectionP = intersection.asPoint()
-                if len(intersectionMP) == 0:
-                    intersectionMP = intersection.asPolyline()
-                if len(intersectionMP) == 0 and intersectionP == QgsPoint(0, 0):
+        for i in range(nGeom-1):
+            if geometries[i] is None:
+                continue
+            for j in range(i+1, nGeom):
+                if geometries[j] is None:
                     continue
-                if len(intersectionMP) > 1:
-                    mousePoint = self.toMapCoordinates(pos)
-                    intersectionP = intersectionMP[0]
-                    for point in intersectionMP[1:]:
-                        if mousePoint.sqrDist(point) < mousePoint.sqrDist(intersectionP):
-                            intersectionP = QgsPoint(point.x(), point.y())
-                if intersectionP != QgsPoint(0,0):
-                    intersections.append(intersectionP)
-        if len(intersections) == 0:
-            return QgsPoint(0,0)
-        intersectionP = intersections[0]
-        for point in intersections[1:]:
-            if mousePoint.sqrDist(point) < mousePoint.sqrDist(intersectionP):
-                intersectionP = QgsPoint(point.x(), point.y())
-        return intersectionP
+                intersections.extend(intersectionPoints(geometries[i], geometries[j]))
+        return intersections
+
+    def searchRadius(self):
+        # search radius in map units around the cursor
+        radius = 3 * self.settings.value("selectTolerance")
+        if self.settings.value("selectUnits") == "pixels":
+            radius *= self.mapCanvas.mapUnitsPerPixel()
+        return radius
 
     def checkLayer(self):
         # check output layer is defined
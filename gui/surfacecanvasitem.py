@@ -0,0 +1,71 @@
+#-----------------------------------------------------------
+#
+# Intersect It is a QGIS plugin to place observations (distance or orientation)
+# with their corresponding precision, intersect them using a least-squares solution
+# and save dimensions in a dedicated layer to produce maps.
+#
+# Copyright    : (C) 2013 Denis Rouzaud
+# Email        : denis.rouzaud@gmail.com
+#
+#-----------------------------------------------------------
+#
+# licensed under the terms of GNU GPL 2
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along
+# with this progsram; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+#---------------------------------------------------------------------
+
+from PyQt4.QtCore import QRectF
+from PyQt4.QtGui import QImage
+from qgis.core import QgsRectangle
+from qgis.gui import QgsMapCanvasItem
+import numpy as np
+
+
+class SurfaceCanvasItem(QgsMapCanvasItem):
+    # draws a grid as an image over a map extent
+    def __init__(self, canvas, color=None):
+        QgsMapCanvasItem.__init__(self, canvas)
+        self.color = color
+        self.image = None
+        self.pixels = None
+        self.setZValue(-1)
+
+    def setSurface(self, values, extent):
+        # values: ny x nx array in [0, 1], row 0 at the top of the extent, drawn as the transparency of the color
+        alpha = np.clip(values * self.color.alpha(), 0, 255).astype(np.uint32)
+        rgb = (self.color.red() << 16) | (self.color.green() << 8) | self.color.blue()
+        self.setPixels((alpha << 24) | rgb, extent)
+
+    def setPixels(self, argb, extent):
+        # argb: ny x nx array of 0xAARRGGBB colors
+        ny, nx = argb.shape
+        # the image does not copy the buffer, keep a reference to it
+        self.pixels = np.ascontiguousarray(argb, dtype=np.uint32)
+        self.image = QImage(self.pixels.data, nx, ny, QImage.Format_ARGB32)
+        self.setRect(extent)
+        self.update()
+
+    def clear(self):
+        self.image = None
+        self.pixels = None
+        self.setRect(QgsRectangle())
+        self.update()
+
+    def paint(self, painter, option=None, widget=None):
+        if self.image is None:
+            return
+        rect = self.boundingRect()
+        painter.drawImage(QRectF(0, 0, rect.width(), rect.height()), self.image)
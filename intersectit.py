@@ -28,29 +28,29 @@
 #---------------------------------------------------------------------
 
 
-from PyQt4.QtCore import QUrl, QCoreApplication, QFileInfo, QSettings, QTranslator
+from PyQt4.QtCore import Qt, QUrl, QCoreApplication, QFileInfo, QSettings, QTranslator
 from PyQt4.QtGui import QAction, QIcon, QDesktopServices
-from qgis.core import QgsApplication
+from qgis.core import QgsApplication, QgsMapLayerRegistry
 
-from core.memorylayers import MemoryLayers
-
-from gui.mysettingsdialog import MySettingsDialog
-from gui.dimensioneditmaptool import DimensionEditMapTool
-from gui.distancemaptool import DistanceMapTool
-from gui.orientationmaptool import OrientationMapTool
-from gui.advancedintersectionmaptool import AdvancedIntersectionMapTool
-from gui.simpleintersectionmaptool import SimpleIntersectionMapTool
+from core.mysettings import MySettings
+from engine import instrumentation
 
 import resources
 
+# map tools, dialogs and numpy are imported when first used to keep QGIS startup fast
+
 
 class IntersectIt ():
     def __init__(self, iface):
         self.iface = iface
         self.mapCanvas = iface.mapCanvas()
-        memLay = MemoryLayers(iface)
-        self.lineLayer = memLay.lineLayer
-        self.pointLayer = memLay.pointLayer
+        self.mapTools = {}
+        self.dopDialog = None
+        self.instrumentationPanel = None
+        # line layer whose edits are followed, with the memory layers following it
+        self.followedLayer = None
+        self.memoryLayers = None
+        instrumentation.setEnabled(MySettings().value("instrumentationEnabled"))
 
         # Initialise the translation environment.
         userPluginPath = QFileInfo(QgsApplication.qgisUserDbFilePath()).path()+"/python/plugins/intersectit"
@@ -80,8 +80,6 @@ class IntersectIt ():
         self.distanceAction = QAction(QIcon(":/plugins/intersectit/icons/distance.svg"),
                                       QCoreApplication.translate("IntersectIt", "place distance"), self.iface.mainWindow())
         self.distanceAction.setCheckable(True)
-        self.distanceMapTool = DistanceMapTool(self.iface)
-        self.distanceMapTool.setAction(self.distanceAction)
         self.toolBar.addAction(self.distanceAction)
         self.iface.addPluginToMenu("&Intersect It", self.distanceAction)
         # prolongation
@@ -89,8 +87,6 @@ class IntersectIt ():
                                          QCoreApplication.translate("IntersectIt", "place orientation"),
                                          self.iface.mainWindow())
         self.orientationAction.setCheckable(True)
-        self.orientationMapTool = OrientationMapTool(self.iface)
-        self.orientationMapTool.setAction(self.orientationAction)
         self.toolBar.addAction(self.orientationAction)
         self.iface.addPluginToMenu("&Intersect It", self.orientationAction)
         # separator
@@ -100,8 +96,6 @@ class IntersectIt ():
                                                 QCoreApplication.translate("IntersectIt", "simple intersection of 2 objects"),
                                                 self.iface.mainWindow())
         self.simpleIntersectionAction.setCheckable(True)
-        self.simpleIntersectionMapTool = SimpleIntersectionMapTool(self.iface)
-        self.simpleIntersectionMapTool.setAction(self.simpleIntersectionAction)
         self.toolBar.addAction(self.simpleIntersectionAction)
         self.iface.addPluginToMenu("&Intersect It", self.simpleIntersectionAction)
         # advanced intersection
@@ -109,10 +103,33 @@ class IntersectIt ():
                                                   QCoreApplication.translate("IntersectIt", "advanced intersection of 2+ observations"),
                                                   self.iface.mainWindow())
         self.advancedIntersectionAction.setCheckable(True)
-        self.advancedIntersectionMapTool = AdvancedIntersectionMapTool(self.iface)
-        self.advancedIntersectionMapTool.setAction(self.advancedIntersectionAction)
         self.toolBar.addAction(self.advancedIntersectionAction)
         self.iface.addPluginToMenu("&Intersect It", self.advancedIntersectionAction)
+        # batch intersection
+        self.batchIntersectionAction = QAction(QIcon(":/plugins/intersectit/icons/intersection_simple.svg"),
+                                               QCoreApplication.translate("IntersectIt", "batch intersection of 2 layers"),
+                                               self.iface.mainWindow())
+        self.batchIntersectionAction.triggered.connect(self.showBatchIntersection)
+        self.iface.addPluginToMenu("&Intersect It", self.batchIntersectionAction)
+        # batch advanced intersection
+        self.advancedBatchAction = QAction(QIcon(":/plugins/intersectit/icons/intersection_advanced.svg"),
+                                           QCoreApplication.translate("IntersectIt",
+                                                                      "batch advanced intersection of the observations"),
+                                           self.iface.mainWindow())
+        self.advancedBatchAction.triggered.connect(self.showAdvancedBatch)
+        self.iface.addPluginToMenu("&Intersect It", self.advancedBatchAction)
+        # report of the selected intersections
+        self.reportAction = QAction(QCoreApplication.translate("IntersectIt",
+                                                               "intersection report of the selected points"),
+                                    self.iface.mainWindow())
+        self.reportAction.triggered.connect(self.showReport)
+        self.iface.addPluginToMenu("&Intersect It", self.reportAction)
+        # intersection geometry
+        self.dopAction = QAction(QIcon(":/plugins/intersectit/icons/intersection_advanced.svg"),
+                                 QCoreApplication.translate("IntersectIt", "intersection geometry (DOP) heatmap"),
+                                 self.iface.mainWindow())
+        self.dopAction.triggered.connect(self.showDop)
+        self.iface.addPluginToMenu("&Intersect It", self.dopAction)
         # separator
         self.toolBar.addSeparator()
         # dimension distance edit
@@ -120,8 +137,6 @@ class IntersectIt ():
                                                QCoreApplication.translate("IntersectIt", "edit distance dimension"),
                                                self.iface.mainWindow())
         self.dimensionDistanceAction.setCheckable(True)
-        self.dimensionDistanceMapTool = DimensionEditMapTool(self.iface, "distance")
-        self.dimensionDistanceMapTool.setAction(self.dimensionDistanceAction)
         self.toolBar.addAction(self.dimensionDistanceAction)
         self.iface.addPluginToMenu("&Intersect It", self.dimensionDistanceAction)
         # dimension orientation edit
@@ -129,8 +144,6 @@ class IntersectIt ():
                                                   QCoreApplication.translate("IntersectIt", "edit orientation dimension"),
                                                   self.iface.mainWindow())
         self.dimensionOrientationAction.setCheckable(True)
-        self.dimensionOrientationMapTool = DimensionEditMapTool(self.iface, "orientation")
-        self.dimensionOrientationMapTool.setAction(self.dimensionOrientationAction)
         self.toolBar.addAction(self.dimensionOrientationAction)
         self.iface.addPluginToMenu("&Intersect It", self.dimensionOrientationAction)
         # separator
@@ -142,6 +155,24 @@ class IntersectIt ():
         self.cleanerAction.triggered.connect(self.cleanMemoryLayers)
         self.toolBar.addAction(self.cleanerAction)
         self.iface.addPluginToMenu("&Intersect It", self.cleanerAction)
+        # selective cleanup
+        self.cleanupAction = QAction(QIcon(":/plugins/intersectit/icons/eraser.svg"),
+                                     QCoreApplication.translate("IntersectIt", "erase some construction features"),
+                                     self.iface.mainWindow())
+        self.cleanupAction.triggered.connect(self.showCleanup)
+        self.iface.addPluginToMenu("&Intersect It", self.cleanupAction)
+        # journal replay
+        self.rebuildAction = QAction(QCoreApplication.translate("IntersectIt",
+                                                                "rebuild construction features from journal"),
+                                     self.iface.mainWindow())
+        self.rebuildAction.triggered.connect(self.rebuildFromJournal)
+        self.iface.addPluginToMenu("&Intersect It", self.rebuildAction)
+        # performance panel
+        self.instrumentationAction = QAction(QCoreApplication.translate("IntersectIt", "performance monitor"),
+                                             self.iface.mainWindow())
+        self.instrumentationAction.setCheckable(True)
+        self.instrumentationAction.toggled.connect(self.showInstrumentation)
+        self.iface.addPluginToMenu("&Intersect It", self.instrumentationAction)
         # help
         self.helpAction = QAction(QIcon(":/plugins/intersectit/icons/help.svg"),
                                   QCoreApplication.translate("IntersectIt", "help"), self.iface.mainWindow())
@@ -150,19 +181,43 @@ class IntersectIt ():
 
         self.toolBar.actionTriggered.connect(self.setMapTool)
 
+        # the line layer is followed when it is created, loaded with a project or already there (plugin reload)
+        QgsMapLayerRegistry.instance().layerWasAdded.connect(self.followLineLayer)
+        for layer in QgsMapLayerRegistry.instance().mapLayers().values():
+            self.followLineLayer(layer)
+
     def help(self):
         QDesktopServices().openUrl(QUrl("https://github.com/3nids/intersectit/wiki"))
 
     def unload(self):
+        # features still in the write buffers of the tools
+        for mapTool in self.mapTools.values():
+            writeBuffer = getattr(mapTool, "writeBuffer", None)
+            if writeBuffer is not None:
+                writeBuffer.flush()
+        QgsMapLayerRegistry.instance().layerWasAdded.disconnect(self.followLineLayer)
+        self.unfollowLineLayer()
         self.iface.removePluginMenu("&Intersect It", self.distanceAction)
         self.iface.removePluginMenu("&Intersect It", self.orientationAction)
         self.iface.removePluginMenu("&Intersect It", self.simpleIntersectionAction)
         self.iface.removePluginMenu("&Intersect It", self.advancedIntersectionAction)
+        self.iface.removePluginMenu("&Intersect It", self.batchIntersectionAction)
+        self.iface.removePluginMenu("&Intersect It", self.advancedBatchAction)
+        self.iface.removePluginMenu("&Intersect It", self.reportAction)
+        self.iface.removePluginMenu("&Intersect It", self.dopAction)
+        if self.dopDialog is not None:
+            self.dopDialog.close()
         self.iface.removePluginMenu("&Intersect It", self.dimensionDistanceAction)
         self.iface.removePluginMenu("&Intersect It", self.dimensionOrientationAction)
         self.iface.removePluginMenu("&Intersect It", self.uisettingsAction)
         self.iface.removePluginMenu("&Intersect It", self.cleanerAction)
+        self.iface.removePluginMenu("&Intersect It", self.cleanupAction)
+        self.iface.removePluginMenu("&Intersect It", self.rebuildAction)
+        self.iface.removePluginMenu("&Intersect It", self.instrumentationAction)
         self.iface.removePluginMenu("&Intersect It", self.helpAction)
+        if self.instrumentationPanel is not None:
+            self.iface.removeDockWidget(self.instrumentationPanel)
+            self.instrumentationPanel.deleteLater()
         self.iface.removeToolBarIcon(self.distanceAction)
         self.iface.removeToolBarIcon(self.orientationAction)
         self.iface.removeToolBarIcon(self.simpleIntersectionAction)
@@ -181,25 +236,138 @@ class IntersectIt ():
             return
 
     def setMapTool(self, action):
+        if action not in self.mapToolActions():
+            return
+        mapTool = self.mapTools.get(action)
+        if mapTool is None:
+            mapTool = self.createMapTool(action)
+            mapTool.setAction(action)
+            self.mapTools[action] = mapTool
+        self.mapCanvas.setMapTool(mapTool)
+
+    def mapToolActions(self):
+        return (self.distanceAction, self.orientationAction, self.simpleIntersectionAction,
+                self.advancedIntersectionAction, self.dimensionDistanceAction, self.dimensionOrientationAction)
+
+    def createMapTool(self, action):
         if action == self.distanceAction:
-            self.mapCanvas.setMapTool(self.distanceMapTool)
+            from gui.distancemaptool import DistanceMapTool
+            return DistanceMapTool(self.iface)
         if action == self.orientationAction:
-            self.mapCanvas.setMapTool(self.orientationMapTool)
+            from gui.orientationmaptool import OrientationMapTool
+            return OrientationMapTool(self.iface)
         if action == self.simpleIntersectionAction:
-            self.mapCanvas.setMapTool(self.simpleIntersectionMapTool)
+            from gui.simpleintersectionmaptool import SimpleIntersectionMapTool
+            return SimpleIntersectionMapTool(self.iface)
         if action == self.advancedIntersectionAction:
-            self.mapCanvas.setMapTool(self.advancedIntersectionMapTool)
+            from gui.advancedintersectionmaptool import AdvancedIntersectionMapTool
+            return AdvancedIntersectionMapTool(self.iface)
         if action == self.dimensionDistanceAction:
-            self.mapCanvas.setMapTool(self.dimensionDistanceMapTool)
+            from gui.dimensioneditmaptool import DimensionEditMapTool
+            return DimensionEditMapTool(self.iface, "distance")
         if action == self.dimensionOrientationAction:
-            self.mapCanvas.setMapTool(self.dimensionOrientationMapTool)
+            from gui.dimensioneditmaptool import DimensionEditMapTool
+            return DimensionEditMapTool(self.iface, "orientation")
+
+    def followLineLayer(self, layer):
+        if layer.id() != MySettings().value("memoryLineLayer"):
+            return
+        from core.memorylayers import MemoryLayers
+        if self.memoryLayers is None:
+            self.memoryLayers = MemoryLayers(self.iface)
+        # only one line layer at a time, connected once
+        self.unfollowLineLayer()
+        self.memoryLayers.followLineLayer(layer)
+        self.followedLayer = layer
+        layer.layerDeleted.connect(self.lineLayerDeleted)
+
+    def unfollowLineLayer(self):
+        if self.followedLayer is None:
+            return
+        self.followedLayer.layerDeleted.disconnect(self.lineLayerDeleted)
+        self.memoryLayers.unfollowLineLayer(self.followedLayer)
+        self.followedLayer = None
+
+    def lineLayerDeleted(self):
+        self.followedLayer = None
 
     def cleanMemoryLayers(self):
-        for layer in (self.lineLayer(), self.pointLayer()):
-            layer.selectAll()
-            ids = layer.selectedFeaturesIds()
-            layer.dataProvider().deleteFeatures(ids)
+        # only clean the existing layers, do not create them
+        from core.memorylayers import MemoryLayers
+        from core.cleanup import deleteAll
+        deleteAll(MemoryLayers(self.iface).existingLayers())
+
+    def showCleanup(self):
+        from gui.cleanupdialog import CleanupDialog
+        CleanupDialog(self.iface).exec_()
+
+    def rebuildFromJournal(self):
+        from qgis.gui import QgsMessageBar
+        from core.observationjournal import rebuildLayers
+        count = rebuildLayers(self.iface)
+        if count is None:
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                QCoreApplication.translate("IntersectIt",
+                                                                           "The observation journal is not enabled"
+                                                                           " or the project has not been saved."),
+                                                QgsMessageBar.WARNING, 3)
+            return
+        self.iface.messageBar().pushMessage("Intersect It",
+                                            QCoreApplication.translate("IntersectIt",
+                                                                       "%u observations loaded from the journal.")
+                                            % count, QgsMessageBar.INFO, 3)
         self.mapCanvas.refresh()
 
     def showSettings(self):
+        from gui.mysettingsdialog import MySettingsDialog
         MySettingsDialog().exec_()
+
+    def showBatchIntersection(self):
+        from gui.batchintersectiondialog import BatchIntersectionDialog
+        BatchIntersectionDialog(self.iface).exec_()
+
+    def showAdvancedBatch(self):
+        from gui.advancedbatchdialog import AdvancedBatchDialog
+        AdvancedBatchDialog(self.iface).exec_()
+
+    def showReport(self):
+        # reports are read from the report field of the selected points of the intersection layer
+        from qgis.core import QgsMapLayerRegistry
+        from qgis.gui import QgsMessageBar
+        settings = MySettings()
+        layer = QgsMapLayerRegistry.instance().mapLayer(settings.value("advancedIntersectionLayer"))
+        values = []
+        if layer is not None and layer.fieldNameIndex(settings.value("reportField")) != -1:
+            values = [f[settings.value("reportField")] for f in layer.selectedFeatures()]
+            values = [value for value in values if value]
+        if len(values) == 0:
+            self.iface.messageBar().pushMessage("Intersect It",
+                                                QCoreApplication.translate("IntersectIt",
+                                                                           "Select the points of the intersection"
+                                                                           " layer to display their report."),
+                                                QgsMessageBar.WARNING, 3)
+            return
+        from gui.reportdialog import ReportDialog
+        ReportDialog(values).exec_()
+
+    def showDop(self):
+        # the heatmap follows the canvas while the dialog is open
+        if self.dopDialog is None or not self.dopDialog.isVisible():
+            from gui.dopdialog import DopDialog
+            self.dopDialog = DopDialog(self.iface)
+            self.dopDialog.show()
+        self.dopDialog.raise_()
+
+    def showInstrumentation(self, visible):
+        if self.instrumentationPanel is None:
+            if not visible:
+                return
+            from gui.instrumentationpanel import InstrumentationPanel
+            self.instrumentationPanel = InstrumentationPanel(self.iface)
+            self.iface.addDockWidget(Qt.BottomDockWidgetArea, self.instrumentationPanel)
+            self.instrumentationPanel.visibilityChanged.connect(self.instrumentationVisibilityChanged)
+        self.instrumentationPanel.setVisible(visible)
+
+    def instrumentationVisibilityChanged(self):
+        # keep the menu entry checked while the panel is open (also when it is closed from its title bar)
+        self.instrumentationAction.setChecked(not self.instrumentationPanel.isHidden())